@@ -4,8 +4,7 @@ import logging
 from os import getenv
 from typing import Any
 
-from django.core.cache import cache  # type: ignore  # noqa: PGH003
-
+from redis import Redis  # type: ignore  # noqa: PGH003
 from redis.exceptions import RedisError  # type: ignore  # noqa: PGH003
 
 logger = logging.getLogger(__name__)
@@ -39,15 +38,15 @@ if USE_REDIS_FOR_CACHE and not IS_TESTING:
         },
     }
 
-    # Ping the cache to see if it's working
+    # Ping Redis itself to see if it's working. Going through django.core.cache here
+    # would set up the cache handler before the settings are loaded, freezing it on
+    # Django's default cache and leaving the aliases below undefined.
     try:
-        cache.set("ping", "pong")
-
-        if cache.get("ping") != "pong":
-            msg = "Cache is not working properly."
+        if not REDIS_URL:
+            msg = "REDIS_URL is not set."
             raise ValueError(msg)  # noqa: TRY301
 
-        cache.delete("ping")
+        Redis.from_url(REDIS_URL, socket_connect_timeout=5).ping()
 
         logger.info("Cache is working properly")
     except (ValueError, RedisError):
@@ -60,3 +59,66 @@ else:
     CACHES["default"] = {
         "BACKEND": "django.core.cache.backends.dummy.DummyCache",
     }
+
+# Shared tier of the spaCy embedding cache. Entries are keyed by model version,
+# so they never expire; on disk when Redis is not available.
+EMBEDDING_CACHE_DIR = getenv("EMBEDDING_CACHE_DIR", "/tmp/embedding-cache")  # noqa: S108
+EMBEDDING_CACHE_MAX_ENTRIES = int(getenv("EMBEDDING_CACHE_MAX_ENTRIES", "200000"))
+
+if IS_TESTING:
+    CACHES["embeddings"] = {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "embeddings",
+    }
+elif CACHES["default"]["BACKEND"] == "django_redis.cache.RedisCache":
+    CACHES["embeddings"] = {
+        "BACKEND": "django_redis.cache.RedisCache",
+        "LOCATION": REDIS_URL,
+        "KEY_PREFIX": "embeddings",
+        "TIMEOUT": None,
+        "OPTIONS": {
+            "CLIENT_CLASS": "django_redis.client.DefaultClient",
+        },
+    }
+else:
+    CACHES["embeddings"] = {
+        "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+        "LOCATION": EMBEDDING_CACHE_DIR,
+        "TIMEOUT": None,
+        "OPTIONS": {
+            "MAX_ENTRIES": EMBEDDING_CACHE_MAX_ENTRIES,
+        },
+    }
+
+# Shared cache of the aggregated scores of DSB user x DTTOT pairs. Entries are keyed by
+# the scored values, the weights and the model version, and expire after
+# PAIR_SCORE_CACHE_TIMEOUT seconds; the file cache also culls past MAX_ENTRIES. The
+# generation bumped by invalidate_pair_scores is kept in the database, not here.
+PAIR_SCORE_CACHE_DIR = getenv("PAIR_SCORE_CACHE_DIR", "/tmp/pair-score-cache")  # noqa: S108
+PAIR_SCORE_CACHE_MAX_ENTRIES = int(getenv("PAIR_SCORE_CACHE_MAX_ENTRIES", "1000000"))
+PAIR_SCORE_CACHE_TIMEOUT = int(getenv("PAIR_SCORE_CACHE_TIMEOUT", str(60 * 60 * 24 * 30)))
+
+if IS_TESTING:
+    CACHES["pair_scores"] = {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "pair_scores",
+    }
+elif CACHES["default"]["BACKEND"] == "django_redis.cache.RedisCache":
+    CACHES["pair_scores"] = {
+        "BACKEND": "django_redis.cache.RedisCache",
+        "LOCATION": REDIS_URL,
+        "KEY_PREFIX": "pair_scores",
+        "TIMEOUT": PAIR_SCORE_CACHE_TIMEOUT,
+        "OPTIONS": {
+            "CLIENT_CLASS": "django_redis.client.DefaultClient",
+        },
+    }
+else:
+    CACHES["pair_scores"] = {
+        "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+        "LOCATION": PAIR_SCORE_CACHE_DIR,
+        "TIMEOUT": PAIR_SCORE_CACHE_TIMEOUT,
+        "OPTIONS": {
+            "MAX_ENTRIES": PAIR_SCORE_CACHE_MAX_ENTRIES,
+        },
+    }
@@ -34,10 +34,12 @@ if not DATABASES["default"]:
         msg,
     )
 
-# Optional: external database configuration if needed
-EXTERNAL_DB_NAME = getenv("EXTERNAL_DB_NAME")
+# Optional: external database configuration if needed (the Danasaham core database
+# the DSB users are synced from). It is only read through the pooled SQLAlchemy engine
+# of app.dsb_user.utils.external_db, never through the Django ORM.
+EXTERNAL_DB_NAME = getenv("EXTERNAL_DB_DATABASE", default=getenv("EXTERNAL_DB_NAME"))
 EXTERNAL_DB_HOST = getenv("EXTERNAL_DB_HOST")
-EXTERNAL_DB_USER = getenv("EXTERNAL_DB_USER")
+EXTERNAL_DB_USER = getenv("EXTERNAL_DB_USERNAME", default=getenv("EXTERNAL_DB_USER"))
 EXTERNAL_DB_PORT = getenv("EXTERNAL_DB_PORT")
 EXTERNAL_DB_PASSWORD = getenv("EXTERNAL_DB_PASSWORD")
 EXTERNAL_DB_URL = getenv("EXTERNAL_DB_URL")
@@ -52,9 +54,25 @@ if all(
     ],
 ):
     DATABASES["external"] = {
-        "default": dj_database_url.parse(
-            EXTERNAL_DB_URL,
-            conn_max_age=CONN_MAX_AGE,
-            conn_health_checks=True,
-        ),
+        "ENGINE": "django.db.backends.postgresql",
+        "NAME": EXTERNAL_DB_NAME,
+        "USER": EXTERNAL_DB_USER,
+        "PASSWORD": EXTERNAL_DB_PASSWORD,
+        "HOST": EXTERNAL_DB_HOST,
+        "PORT": EXTERNAL_DB_PORT,
+        "CONN_MAX_AGE": CONN_MAX_AGE,
+        "CONN_HEALTH_CHECKS": True,
     }
+elif EXTERNAL_DB_URL and "${" not in EXTERNAL_DB_URL:
+    DATABASES["external"] = dj_database_url.parse(
+        EXTERNAL_DB_URL,
+        conn_max_age=CONN_MAX_AGE,
+        conn_health_checks=True,
+    )
+
+# Pool of the external database engine, one per worker process. The DSB user sync
+# runs its three source queries at once, so keep at least three connections.
+EXTERNAL_DB_POOL_SIZE = int(getenv("EXTERNAL_DB_POOL_SIZE", default="3"))
+EXTERNAL_DB_MAX_OVERFLOW = int(getenv("EXTERNAL_DB_MAX_OVERFLOW", default="2"))
+EXTERNAL_DB_POOL_TIMEOUT = int(getenv("EXTERNAL_DB_POOL_TIMEOUT", default="30"))
+EXTERNAL_DB_POOL_RECYCLE = int(getenv("EXTERNAL_DB_POOL_RECYCLE", default="1800"))
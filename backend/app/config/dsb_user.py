@@ -0,0 +1,17 @@
+from __future__ import annotations
+
+from os import getenv
+
+# DSB user sync settings
+# Only fetch the DSB users modified since the last sync from the Danasaham core database,
+# with a full sync every DSB_USER_FULL_SYNC_INTERVAL_HOURS to catch what that misses
+DSB_USER_INCREMENTAL_SYNC = getenv("DSB_USER_INCREMENTAL_SYNC", default="true").lower() == "true"
+DSB_USER_FULL_SYNC_INTERVAL_HOURS = int(getenv("DSB_USER_FULL_SYNC_INTERVAL_HOURS", "24"))
+# DSB user rows per bulk_create, bulk_update and relinking UPDATE of a sync
+DSB_USER_SYNC_BATCH_SIZE = int(getenv("DSB_USER_SYNC_BATCH_SIZE", "1000"))
+# Fetch the personal, publisher and corporate DSB users at once in a single task, on
+# separate pooled connections, instead of three chained tasks
+DSB_USER_CONCURRENT_SYNC = getenv("DSB_USER_CONCURRENT_SYNC", default="true").lower() == "true"
+# Stream every DSB user query through a server-side cursor and save it in chunks of this
+# many rows; 0 fetches each whole result instead, with the queries running side by side
+DSB_USER_SYNC_CHUNK_SIZE = int(getenv("DSB_USER_SYNC_CHUNK_SIZE", "10000"))
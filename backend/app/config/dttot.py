@@ -0,0 +1,40 @@
+from __future__ import annotations
+
+from os import getenv
+
+# DTTOT ingestion settings
+# "bulk" writes DttotDoc rows in chunks inside the document task,
+# "row" keeps the legacy one-Celery-task-per-row behaviour.
+DTTOT_INGESTION_MODE = getenv("DTTOT_INGESTION_MODE", "bulk").lower()
+DTTOT_INGESTION_CHUNK_SIZE = int(getenv("DTTOT_INGESTION_CHUNK_SIZE", "500"))
+# Read uploads in DTTOT_INGESTION_CHUNK_SIZE row chunks instead of loading them whole
+DTTOT_IMPORT_STREAMING = getenv("DTTOT_IMPORT_STREAMING", default="true").lower() == "true"
+# Reuse the parsed rows of the previous upload when the same file is uploaded again
+DTTOT_REUSE_DUPLICATE_UPLOADS = getenv("DTTOT_REUSE_DUPLICATE_UPLOADS", default="true").lower() == "true"
+# Score unchanged DTTOT entries only against changed DSB users, keeping the previous report rows
+DTTOT_SCORE_CHANGED_ONLY = getenv("DTTOT_SCORE_CHANGED_ONLY", default="true").lower() == "true"
+# Parsed strings kept in each worker's in-process embedding cache
+EMBEDDING_CACHE_LRU_SIZE = int(getenv("EMBEDDING_CACHE_LRU_SIZE", "50000"))
+# nlp.pipe settings of the scoring runs. n_process > 1 only applies outside daemonic
+# (Celery prefork) workers, e.g. with the solo or threads pool.
+DTTOT_NLP_BATCH_SIZE = int(getenv("DTTOT_NLP_BATCH_SIZE", "256"))
+DTTOT_NLP_N_PROCESS = int(getenv("DTTOT_NLP_N_PROCESS", "1"))
+# Only score the DSB users that share an identifier, a phonetic name key or enough
+# name n-grams with a DTTOT entry, within the birth year window
+DTTOT_CANDIDATE_BLOCKING = getenv("DTTOT_CANDIDATE_BLOCKING", default="true").lower() == "true"
+DTTOT_BLOCKING_NGRAM_OVERLAP = float(getenv("DTTOT_BLOCKING_NGRAM_OVERLAP", "0.4"))
+DTTOT_BLOCKING_BIRTH_YEAR_WINDOW = int(getenv("DTTOT_BLOCKING_BIRTH_YEAR_WINDOW", "2"))
+# Pruned pairs scored, but not saved, to estimate the recall of blocking
+DTTOT_BLOCKING_RECALL_SAMPLE = int(getenv("DTTOT_BLOCKING_RECALL_SAMPLE", "200"))
+# Fan the scoring of a document out as a Celery chord of DTTOT_SCORING_SHARD_SIZE entry
+# blocks per report type, instead of one task per report type
+DTTOT_SCORING_SHARDED = getenv("DTTOT_SCORING_SHARDED", default="true").lower() == "true"
+DTTOT_SCORING_SHARD_SIZE = int(getenv("DTTOT_SCORING_SHARD_SIZE", "100"))
+# Report rows buffered before each bulk_create of the scoring results
+DTTOT_REPORT_WRITE_BATCH_SIZE = int(getenv("DTTOT_REPORT_WRITE_BATCH_SIZE", "1000"))
+# Reuse the cached score of a pair whose scored DSB user and DTTOT values are unchanged
+DTTOT_PAIR_SCORE_CACHE = getenv("DTTOT_PAIR_SCORE_CACHE", default="true").lower() == "true"
+# Pairs are scored heaviest field first and abandoned once they cannot reach this score,
+# rows below it are not saved. Defaults to 0, which scores and saves every pair; deployments
+# that only need matches opt in with a floor at or under the 0.8 match score.
+DTTOT_SCORE_FLOOR = float(getenv("DTTOT_SCORE_FLOOR", "0"))
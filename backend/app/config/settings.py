@@ -20,5 +20,7 @@ include(
     "axes.py",
     "email.py",
     "jwt.py",
+    "dttot.py",
+    "dsb_user.py",
     scope=globals(),
 )
@@ -0,0 +1,154 @@
+"""Django command to benchmark the DTTOT data preparation steps."""
+
+from __future__ import annotations
+
+import random
+import time
+from typing import TYPE_CHECKING, Any
+
+import pandas as pd  #type: ignore  # noqa: PGH003
+from django.core.management.base import BaseCommand  #type: ignore  # noqa: PGH003
+
+from app.documents.utils.data_preparation import (  #type: ignore  # noqa: PGH003
+    CleaningSeparatingDeskripsi,
+    DTTOTDocumentProcessing,
+    ExtractNIKandPassportNumber,
+    FormattingColumn,
+)
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+
+NAME_WORDS = [
+    "Abu", "Bakar", "Muhammad", "Yusuf", "Abdul", "Rahman", "Siti", "Aisyah",
+    "John", "Doe", "Maria", "Smith", "bin", "Al", "Hasan", "Umar",
+]
+DESCRIPTION_TEXTS = [
+    "- pekerjaan: Karyawan Swasta",
+    "- diduga berada di Amerika sejak tahun 2019",
+    "Pendidikan SLTA/Sederajat",
+    "- didirikan pada tahun 1940 oleh Indriyana Nurhayati;",
+]
+DESCRIPTION_COLUMNS = 9
+NATIONALITIES = [
+    "Indonesia", "Malaysia", "Filipina", "Etiopia", "banglades", "Singapura",
+    "Indonesia; Malaysia", "Irak/Suriah", "Tanzania; officially the United Republic of Tanzania",
+]
+MONTH_NAMES = ["Januari", "Februari", "Mei", "Agustus", "Oktober", "Desember", "Apr", "Oct"]
+
+
+class Command(BaseCommand):
+    """Django command to benchmark the DTTOT data preparation steps."""
+
+    help = "Benchmark the DTTOT data preparation steps on a synthetic list"
+
+    def add_arguments(self, parser) -> None:  # noqa: ANN001
+        parser.add_argument("--rows", type=int, default=50_000)
+        parser.add_argument("--repeat", type=int, default=3)
+        parser.add_argument("--seed", type=int, default=0)
+        parser.add_argument(
+            "--stage",
+            action="append",
+            choices=sorted(self.stages()),
+            help="Stage to benchmark, can be given more than once (default: all).",
+        )
+
+    def stages(self) -> dict[str, Callable[[pd.DataFrame], pd.DataFrame]]:
+        """Return the benchmarked stages keyed by name."""
+        processing = DTTOTDocumentProcessing()
+        extractor = ExtractNIKandPassportNumber()
+        formatter = FormattingColumn()
+        return {
+            "names": lambda df: processing.extract_and_split_names(
+                df, "Nama", case_insensitive=False,
+            ),
+            "nik_passport": extractor.extract_nik_and_passport_number,
+            "descriptions": CleaningSeparatingDeskripsi().separating_cleaning_deskripsi,
+            "birth_dates": formatter.format_birth_date,
+            "birth_dates_rowwise": lambda df: self.format_birth_date_rowwise(formatter, df),
+            # A fresh formatter per run so the memoized lookups are not reused
+            "nationality": lambda df: FormattingColumn().format_nationality(df),
+        }
+
+    @staticmethod
+    def format_birth_date_rowwise(
+        formatter: FormattingColumn,
+        df: pd.DataFrame,
+    ) -> pd.DataFrame:
+        """Format birth dates row by row, the baseline for the vectorized ``format_birth_date``."""
+        for i in range(1, 4):
+            df[f"birth_date_{i}"] = ""
+        for index, row in df.iterrows():
+            for i, date_str in enumerate(formatter.extract_dates(row["Tgl Lahir"])[:3]):
+                df.at[index, f"birth_date_{i+1}"] = date_str  # noqa: PD008
+        return df
+
+    def handle(self, *args, **options) -> None:  # noqa: ANN002, ANN003, ARG002
+        rng = random.Random(options["seed"])  # noqa: S311
+        data_frame = self.build_data_frame(rng, options["rows"])
+        stages = self.stages()
+
+        for name in options["stage"] or sorted(stages):
+            timings = []
+            for _ in range(options["repeat"]):
+                started = time.perf_counter()
+                stages[name](data_frame.copy())
+                timings.append(time.perf_counter() - started)
+            best = min(timings)
+            self.stdout.write(
+                f"{name}: {len(data_frame)} rows, best of {len(timings)} "
+                f"{best:.3f}s ({len(data_frame) / best:,.0f} rows/sec)",
+            )
+
+    @staticmethod
+    def build_data_frame(rng: random.Random, rows: int) -> pd.DataFrame:
+        """Build a synthetic DTTOT list shaped like the uploaded documents."""
+
+        def name() -> str:
+            return " ".join(rng.choice(NAME_WORDS) for _ in range(rng.randint(1, 4)))
+
+        def full_name() -> str:
+            # Most entries carry a few aliases, a handful carry the maximum of 28
+            alias_count = 28 if rng.random() < 0.001 else rng.choice([0, 0, 1, 1, 2, 3])  # noqa: PLR2004
+            return " Alias ".join(name() for _ in range(alias_count + 1))
+
+        def description() -> str | None:
+            # Roughly one cell in ten carries a NIK and one in ten a passport number
+            roll = rng.random()
+            if roll < 0.1:  # noqa: PLR2004
+                return f"- NIK {rng.randrange(10**15, 10**16)};"
+            if roll < 0.2:  # noqa: PLR2004
+                prefix = rng.choice(["A", "PA", "B ", ""])
+                return f"- paspor {prefix}{rng.randrange(10**6, 10**8)}"
+            if roll < 0.25:  # noqa: PLR2004
+                return None
+            return rng.choice(DESCRIPTION_TEXTS)
+
+        def birth_dates() -> str:
+            day, year = rng.randint(1, 28), rng.randint(1940, 2005)
+            dates = [
+                f"{day} {rng.choice(MONTH_NAMES)} {year}",
+                f"{day:02d}/{rng.randint(1, 12):02d}/{year}",
+                f"{day:02d}-{rng.choice(MONTH_NAMES)[:3]}-{year % 100:02d}",
+            ]
+            return "00/00/0000" if rng.random() < 0.05 else " atau ".join(  # noqa: PLR2004
+                rng.sample(dates, rng.randint(1, 3)),
+            )
+
+        data: dict[str, Any] = {
+            "Nama": [full_name() for _ in range(rows)],
+            "Terduga": [rng.choice(["Orang", "Korporasi"]) for _ in range(rows)],
+            "Kode Densus": [f"EDD-{i:05d}" for i in range(rows)],
+            "Tgl Lahir": [birth_dates() for _ in range(rows)],
+            "WN": [rng.choice(NATIONALITIES) for _ in range(rows)],
+        }
+        for i in range(1, DESCRIPTION_COLUMNS + 1):
+            data[f"description_{i}"] = [description() for _ in range(rows)]
+        # The raw bullet list the description columns are split from
+        data["Deskripsi"] = [
+            "\n".join(
+                f"- {text}" for text in (description() for _ in range(rng.randint(0, 10))) if text
+            )
+            for _ in range(rows)
+        ]
+        return pd.DataFrame(data)
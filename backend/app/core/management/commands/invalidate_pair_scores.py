@@ -0,0 +1,29 @@
+"""Django command to drop the cached DSB user x DTTOT pair scores of a scoring model."""
+
+from __future__ import annotations
+
+from django.core.management.base import BaseCommand  #type: ignore  # noqa: PGH003
+
+from app.documents.utils.scoring import (  #type: ignore  # noqa: PGH003
+    SIMILARITY_MODEL,
+    invalidate_pair_scores,
+)
+
+
+class Command(BaseCommand):
+    """Django command to drop the cached pair scores of a scoring model."""
+
+    help = "Drop the cached DSB user x DTTOT pair scores of a scoring model, e.g. after retraining it"
+
+    def add_arguments(self, parser) -> None:  # noqa: ANN001
+        parser.add_argument(
+            "--model",
+            default=SIMILARITY_MODEL,
+            help=f"Name or path of the spaCy model (default: {SIMILARITY_MODEL}).",
+        )
+
+    def handle(self, *args, **options) -> None:  # noqa: ANN002, ANN003, ARG002
+        generation = invalidate_pair_scores(options["model"])
+        self.stdout.write(self.style.SUCCESS(
+            f"Pair scores of {options['model']} invalidated, now at generation {generation}",
+        ))
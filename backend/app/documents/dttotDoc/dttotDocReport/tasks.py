@@ -15,6 +15,10 @@ from app.documents.dttotDoc.dttotDocReportPersonal.models import (  #type: ignor
     DttotDocReportPersonal,
 )
 from app.documents.dttotDoc.dttotDocReportPublisher.models import DttotDocReportPublisher
+from app.documents.dttotDoc.utils import (  #type: ignore # noqa: PGH003
+    DTTOT_SCORING_ERROR_STATUS,
+    carry_over_report_rows,
+)
 from app.documents.models import Document  #type: ignore # noqa: PGH003
 
 MATCH_SIMILARITY_THRESHOLD = 0.8
@@ -88,6 +92,9 @@ def create_or_update_dttotdoc_report(
 def update_dttotdoc_report_score(document_id: str) -> None:
     """Update DTTOT Doc Report status based on associated similarity scores.
 
+    The rows of the previous report for pairs that were not scored again are carried
+    over first, so unchanged DTTOT entries count towards the status.
+
     Args:
         document_id (str): The ID of the document to update.
 
@@ -106,6 +113,9 @@ def update_dttotdoc_report_score(document_id: str) -> None:
         dttot_report = DttotDocReport.objects.get(document=document_id)
         dttot_doc_report_id = dttot_report.dttotdoc_report_id
 
+        # Unchanged entries keep the matches of the previous report
+        carry_over_report_rows(dttot_report)
+
         # Retrieve associated records
         dttot_report_personals = DttotDocReportPersonal.objects.filter(dttotdoc_report=dttot_doc_report_id)
         dttot_report_publishers = DttotDocReportPublisher.objects.filter(dttotdoc_report=dttot_doc_report_id)
@@ -131,3 +141,24 @@ def update_dttotdoc_report_score(document_id: str) -> None:
     except Exception as e:
         logger.exception("Error updating DTTOT Doc Report for document_id=%s: %s", document_id, str(e))
         raise
+
+
+@shared_task()
+def mark_dttot_scoring_failed(document_id: str) -> None:
+    """Mark the DTTOT Doc Report of a document whose scoring broke off.
+
+    Runs as the error callback of the scoring chord, whichever shard or the reducer
+    failed, so the report does not stay ``Initialized``.
+
+    Args:
+        document_id (str): The ID of the scored document.
+
+    Returns:
+        None
+
+    """
+    updated = DttotDocReport.objects.filter(document=document_id).update(status_doc=DTTOT_SCORING_ERROR_STATUS)
+    logger.error(
+        "Scoring of document_id=%s failed, marked %d DTTOT Doc Report with status_doc=%s",
+        document_id, updated, DTTOT_SCORING_ERROR_STATUS,
+    )
@@ -2,6 +2,7 @@ from __future__ import annotations
 
 import logging
 from datetime import date
+from typing import Any
 
 from celery import shared_task  #type: ignore # noqa: PGH003
 
@@ -9,9 +10,18 @@ from app.documents.dttotDoc.dttotDocReport.models import (
     DttotDocReport,  #type: ignore # noqa: PGH003
 )
 from app.documents.dttotDoc.dttotDocReportCorporate.utils.utils import (  #type: ignore # noqa: PGH003
-    save_report_data_row_by_row,
+    CORPORATE_SCORING,
 )
 from app.documents.dttotDoc.models import DttotDoc  #type: ignore # noqa: PGH003
+from app.documents.dttotDoc.utils import (  #type: ignore # noqa: PGH003
+    dttot_scoring_batches,
+    filter_changed_dsb_users,
+    previous_dttot_report,
+    save_scored_rows,
+    save_scored_shard_rows,
+    score_dttot_shard,
+)
+from app.documents.utils.blocking import BlockingKeys  #type: ignore # noqa: PGH003
 from app.dsb_user.dsb_user_corporate.models import (  #type: ignore # noqa: PGH003
     DsbUserCorporate,
 )
@@ -19,6 +29,133 @@ from app.dsb_user.dsb_user_corporate.models import (  #type: ignore # noqa: PGH0
 logger = logging.getLogger(__name__)
 
 SIMILARITY_THRESOLD = 0.9
+KODE_DENSUS_THRESHOLD = 0.8
+
+
+def build_corporate_data(dsb_user: DsbUserCorporate) -> dict[str, Any]:
+    """Prepare the corporate data of a DSB User Corporate that is scored against the DTTOT entries."""
+    return {
+        "corporate_company_name": dsb_user.corporate_company_name,
+        "corporate_phone_number": dsb_user.corporate_phone_number,
+        "corporate_nib": dsb_user.corporate_nib,
+        "corporate_npwp": dsb_user.corporate_npwp,
+        "corporate_siup": dsb_user.corporate_siup,
+        "corporate_skdp": dsb_user.corporate_skdp,
+        "corporate_domicile_address": dsb_user.corporate_domicile_address,
+        "corporate_user_name": dsb_user.user_name,
+        "corporate_user_phone_number": dsb_user.users_phone_number,
+        "corporate_description_scores": " ".join(
+            filter(None, [
+                dsb_user.corporate_company_name,
+                dsb_user.corporate_phone_number,
+                dsb_user.corporate_nib,
+                dsb_user.corporate_npwp,
+                dsb_user.corporate_siup,
+                dsb_user.corporate_skdp,
+                dsb_user.corporate_domicile_address,
+                dsb_user.user_name,
+                dsb_user.users_phone_number,
+            ]),
+        ),
+        "pengurus_corporate_name": dsb_user.pengurus_corporate_name,
+        "pengurus_corporate_phone_number": dsb_user.pengurus_corporate_phone_number,
+        "pengurus_corporate_id_number": dsb_user.pengurus_corporate_id_number,
+        "pengurus_corporate_place_of_birth": dsb_user.pengurus_corporate_place_of_birth,
+        "pengurus_corporate_date_of_birth": dsb_user.pengurus_corporate_date_of_birth.strftime("%Y-%m-%d") if isinstance(dsb_user.pengurus_corporate_date_of_birth, date) else dsb_user.pengurus_corporate_date_of_birth,
+        "pengurus_corporate_domicile_Address": dsb_user.pengurus_corporate_domicile_address,
+        "pengurus_corporate_description": " ".join(
+            filter(None, [
+                dsb_user.pengurus_corporate_name,
+                dsb_user.pengurus_corporate_phone_number,
+                dsb_user.pengurus_corporate_id_number,
+                dsb_user.pengurus_corporate_place_of_birth,
+                dsb_user.pengurus_corporate_date_of_birth.strftime("%Y-%m-%d") if isinstance(dsb_user.pengurus_corporate_date_of_birth, date) else dsb_user.pengurus_corporate_date_of_birth,
+                dsb_user.pengurus_corporate_domicile_address,
+            ]),
+        ),
+    }
+
+
+def build_corporate_blocking_keys(dsb_user: DsbUserCorporate) -> BlockingKeys:
+    """Prepare the blocking keys of a DSB User Corporate from the fields scored against DTTOT names and identifiers."""
+    return BlockingKeys(
+        names=(dsb_user.corporate_company_name, dsb_user.user_name, dsb_user.pengurus_corporate_name),
+        identifiers=(
+            dsb_user.corporate_phone_number,
+            dsb_user.corporate_nib,
+            dsb_user.corporate_npwp,
+            dsb_user.corporate_siup,
+            dsb_user.corporate_skdp,
+            dsb_user.users_phone_number,
+            dsb_user.pengurus_corporate_phone_number,
+            dsb_user.pengurus_corporate_id_number,
+        ),
+        birth_dates=(dsb_user.pengurus_corporate_date_of_birth,),
+    )
+
+
+def score_corporate_dttot_docs(
+    document_id: str,
+    dsb_users: list[DsbUserCorporate],
+    dttot_docs: list[DttotDoc],
+    recall_sample: int | None = None,
+) -> tuple[list[list[Any]], dict[str, float | int]]:
+    """Score DTTOT entries against the DSB User Corporates of a document, without saving the report rows."""
+    return score_dttot_shard(
+        f"corporate scoring of document {document_id}",
+        CORPORATE_SCORING,
+        [dsb_user.dsb_user_corporate_id for dsb_user in dsb_users],
+        [build_corporate_data(dsb_user) for dsb_user in dsb_users],
+        [build_corporate_blocking_keys(dsb_user) for dsb_user in dsb_users],
+        dttot_docs=dttot_docs,
+        match_score=KODE_DENSUS_THRESHOLD,
+        recall_sample=recall_sample,
+    )
+
+
+@shared_task()
+def score_corporate_shard(
+    document_id: str,
+    dttot_ids: list[str],
+    recall_sample: int,
+    changed_since: str | None = None,
+) -> dict[str, Any]:
+    """Score one block of DTTOT entries against the DSB User Corporates of a document.
+
+    Runs as one header task of the scoring chord and saves its own report rows, only
+    their count and the blocking summary go back to ``reduce_dttot_scoring``.
+
+    Args:
+    ----
+        document_id (str): The ID of the document being scored.
+        dttot_ids (list[str]): The DttotDoc IDs of the shard.
+        recall_sample (int): The most pruned pairs scored to estimate recall.
+        changed_since (str | None): Only score the DSB users created or changed since
+            this ISO datetime, every user when None.
+
+    Returns:
+    -------
+        dict[str, Any]: The ``report_type``, the number of report rows ``saved`` and
+            the blocking summary of the shard.
+
+    """
+    logger.info(
+        "Scoring %d DTTOT entries against the DSB User Corporates of document ID: %s",
+        len(dttot_ids),
+        document_id,
+    )
+    dsb_users = DsbUserCorporate.objects.filter(document=document_id)
+    if changed_since is not None:
+        dsb_users = filter_changed_dsb_users(dsb_users, changed_since)
+    rows, summary = score_corporate_dttot_docs(
+        document_id,
+        list(dsb_users),
+        list(DttotDoc.objects.filter(pk__in=dttot_ids).order_by("dttot_id")),
+        recall_sample,
+    )
+    saved = save_scored_shard_rows(document_id, rows, "corporate")
+    return {"report_type": "corporate", "saved": saved, "blocking": summary}
+
 
 @shared_task()
 def scoring_similarity_corporate(
@@ -60,81 +197,19 @@ def scoring_similarity_corporate(
             logger.error(msg)
             raise ValueError(msg)  # noqa: TRY301
 
-        total_iterations = len(dttot_docs) * len(dsb_user_corps)
-        current_iteration = 0
-
-        for dttot_doc in dttot_docs:
-            for dsb_user_corp in dsb_user_corps:
-                current_iteration += 1
-                progress = (current_iteration / total_iterations) * 100
-                logger.info(
-                    "Processing iteration %d/%d (%.2f%%) for DTTOT Doc ID: %s and DSB User Corporate ID: %s",
-                    current_iteration,
-                    total_iterations,
-                    progress,
-                    dttot_doc.dttot_id,
-                    dsb_user_corp.dsb_user_corporate_id,
-                )
-
-                # Prepare the corporate data
-                corporate_data = {
-                    "corporate_company_name": dsb_user_corp.corporate_company_name,
-                    "corporate_phone_number": dsb_user_corp.corporate_phone_number,
-                    "corporate_nib": dsb_user_corp.corporate_nib,
-                    "corporate_npwp": dsb_user_corp.corporate_npwp,
-                    "corporate_siup": dsb_user_corp.corporate_siup,
-                    "corporate_skdp": dsb_user_corp.corporate_skdp,
-                    "corporate_domicile_address": dsb_user_corp.corporate_domicile_address,
-                    "corporate_user_name": dsb_user_corp.user_name,
-                    "corporate_user_phone_number": dsb_user_corp.users_phone_number,
-                    "corporate_description_scores": " ".join(
-                        filter(None, [
-                            dsb_user_corp.corporate_company_name,
-                            dsb_user_corp.corporate_phone_number,
-                            dsb_user_corp.corporate_nib,
-                            dsb_user_corp.corporate_npwp,
-                            dsb_user_corp.corporate_siup,
-                            dsb_user_corp.corporate_skdp,
-                            dsb_user_corp.corporate_domicile_address,
-                            dsb_user_corp.user_name,
-                            dsb_user_corp.users_phone_number,
-                        ]),
-                    ),
-                    "pengurus_corporate_name": dsb_user_corp.pengurus_corporate_name,
-                    "pengurus_corporate_phone_number": dsb_user_corp.pengurus_corporate_phone_number,
-                    "pengurus_corporate_id_number": dsb_user_corp.pengurus_corporate_id_number,
-                    "pengurus_corporate_place_of_birth": dsb_user_corp.pengurus_corporate_place_of_birth,
-                    "pengurus_corporate_date_of_birth": dsb_user_corp.pengurus_corporate_date_of_birth.strftime("%Y-%m-%d") if isinstance(dsb_user_corp.pengurus_corporate_date_of_birth, date) else dsb_user_corp.pengurus_corporate_date_of_birth,
-                    "pengurus_corporate_domicile_Address": dsb_user_corp.pengurus_corporate_domicile_address,
-                    "pengurus_corporate_description": " ".join(
-                        filter(None, [
-                            dsb_user_corp.pengurus_corporate_name,
-                            dsb_user_corp.pengurus_corporate_phone_number,
-                            dsb_user_corp.pengurus_corporate_id_number,
-                            dsb_user_corp.pengurus_corporate_place_of_birth,
-                            dsb_user_corp.pengurus_corporate_date_of_birth.strftime("%Y-%m-%d") if isinstance(dsb_user_corp.pengurus_corporate_date_of_birth, date) else dsb_user_corp.pengurus_corporate_date_of_birth,
-                            dsb_user_corp.pengurus_corporate_domicile_address,
-                        ],
-                    ),
-                ),
-            }
-
-                # Save the corporate data
-                save_report_data_row_by_row(
-                    dttot_doc_report,
-                    dsb_user_corp.dsb_user_corporate_id,
-                    corporate_data,
-                    dttot_doc,
-                )
-                logger.info(
-                    "Processed iteration %d/%d (%.2f%%) for DTTOT Doc ID: %s and DSB User Corporate ID: %s",
-                    current_iteration,
-                    total_iterations,
-                    progress,
-                    dttot_doc.dttot_id,
-                    dsb_user_corp.dsb_user_corporate_id,
-                )
-
+        # Unchanged entries keep the rows of the previous report and are only scored
+        # against the DSB users created or changed since, the rest against every user
+        batches = dttot_scoring_batches(dsb_user_corps, dttot_docs, previous_dttot_report(document_id))
+        if not batches:
+            logger.info("No DTTOT entries or DSB users to score again for document ID: %s", document_id)
+            return "No DTTOT entries or DSB users to score again."
+
+        # Only score the DSB users that blocking keeps for each entry, then save the report rows
+        rows: list[list[Any]] = []
+        for batch_users, batch_docs in batches:
+            batch_rows, _ = score_corporate_dttot_docs(document_id, batch_users, batch_docs)
+            rows.extend(batch_rows)
+        save_scored_rows(dttot_doc_report, rows, "corporate")
         return "Successfulyy processed all records."  # noqa: TRY300
 
     except Exception:
@@ -2,6 +2,7 @@ from __future__ import annotations
 
 import logging
 from datetime import date
+from typing import Any
 
 from celery import shared_task  #type: ignore # noqa: PGH003
 
@@ -9,9 +10,18 @@ from app.documents.dttotDoc.dttotDocReport.models import (
     DttotDocReport,  #type: ignore # noqa: PGH003
 )
 from app.documents.dttotDoc.dttotDocReportPersonal.utils.utils import (  #type: ignore # noqa: PGH003
-    save_report_data_row_by_row,
+    PERSONAL_SCORING,
 )
 from app.documents.dttotDoc.models import DttotDoc  #type: ignore # noqa: PGH003
+from app.documents.dttotDoc.utils import (  #type: ignore # noqa: PGH003
+    dttot_scoring_batches,
+    filter_changed_dsb_users,
+    previous_dttot_report,
+    save_scored_rows,
+    save_scored_shard_rows,
+    score_dttot_shard,
+)
+from app.documents.utils.blocking import BlockingKeys  #type: ignore # noqa: PGH003
 from app.dsb_user.dsb_user_personal.models import (
     DsbUserPersonal,  #type: ignore # noqa: PGH003
 )
@@ -20,6 +30,109 @@ logger = logging.getLogger(__name__)
 
 KODE_DENSUS_THRESHOLD = 0.8
 
+
+def build_personal_data(dsb_user: DsbUserPersonal) -> dict[str, Any]:
+    """Prepare the personal data of a DSB User Personal that is scored against the DTTOT entries."""
+    birth_date = (
+        dsb_user.personal_birth_date.strftime("%Y-%m-%d")
+        if isinstance(dsb_user.personal_birth_date, date) else dsb_user.personal_birth_date
+    )
+    return {
+        "personal_nik": dsb_user.personal_nik,
+        "user_name": dsb_user.user_name,
+        "personal_phone_number": dsb_user.personal_phone_number,
+        "personal_spouse_name": dsb_user.personal_spouse_name,
+        "personal_mother_name": dsb_user.personal_mother_name,
+        "personal_domicile_address": dsb_user.personal_domicile_address,
+        "personal_birth_date": birth_date,
+        "personal_birth_place": dsb_user.personal_birth_place,
+        "personal_nationality": dsb_user.personal_nationality,
+        "personal_description": " ".join(filter(None, [
+            dsb_user.personal_nik,
+            dsb_user.user_name,
+            dsb_user.personal_phone_number,
+            dsb_user.personal_spouse_name,
+            dsb_user.personal_mother_name,
+            dsb_user.personal_domicile_address,
+            birth_date,
+            dsb_user.personal_birth_place,
+            dsb_user.personal_nationality,
+        ])),
+    }
+
+
+def build_personal_blocking_keys(dsb_user: DsbUserPersonal) -> BlockingKeys:
+    """Prepare the blocking keys of a DSB User Personal from the fields scored against DTTOT names and identifiers."""
+    return BlockingKeys(
+        names=(dsb_user.user_name, dsb_user.personal_spouse_name, dsb_user.personal_mother_name),
+        identifiers=(dsb_user.personal_nik, dsb_user.personal_phone_number),
+        birth_dates=(dsb_user.personal_birth_date,),
+    )
+
+
+def score_personal_dttot_docs(
+    document_id: str,
+    dsb_users: list[DsbUserPersonal],
+    dttot_docs: list[DttotDoc],
+    recall_sample: int | None = None,
+) -> tuple[list[list[Any]], dict[str, float | int]]:
+    """Score DTTOT entries against the DSB User Personals of a document, without saving the report rows."""
+    return score_dttot_shard(
+        f"personal scoring of document {document_id}",
+        PERSONAL_SCORING,
+        [dsb_user.dsb_user_personal_id for dsb_user in dsb_users],
+        [build_personal_data(dsb_user) for dsb_user in dsb_users],
+        [build_personal_blocking_keys(dsb_user) for dsb_user in dsb_users],
+        dttot_docs=dttot_docs,
+        match_score=KODE_DENSUS_THRESHOLD,
+        recall_sample=recall_sample,
+    )
+
+
+@shared_task()
+def score_personal_shard(
+    document_id: str,
+    dttot_ids: list[str],
+    recall_sample: int,
+    changed_since: str | None = None,
+) -> dict[str, Any]:
+    """Score one block of DTTOT entries against the DSB User Personals of a document.
+
+    Runs as one header task of the scoring chord and saves its own report rows, only
+    their count and the blocking summary go back to ``reduce_dttot_scoring``.
+
+    Args:
+    ----
+        document_id (str): The ID of the document being scored.
+        dttot_ids (list[str]): The DttotDoc IDs of the shard.
+        recall_sample (int): The most pruned pairs scored to estimate recall.
+        changed_since (str | None): Only score the DSB users created or changed since
+            this ISO datetime, every user when None.
+
+    Returns:
+    -------
+        dict[str, Any]: The ``report_type``, the number of report rows ``saved`` and
+            the blocking summary of the shard.
+
+    """
+    logger.info(
+        "Scoring %d DTTOT entries against the DSB User Personals of document ID: %s",
+        len(dttot_ids),
+        document_id,
+    )
+    dsb_users = DsbUserPersonal.objects.filter(document=document_id)
+    if changed_since is not None:
+        dsb_users = filter_changed_dsb_users(dsb_users, changed_since)
+    rows, summary = score_personal_dttot_docs(
+        document_id,
+        list(dsb_users),
+        list(DttotDoc.objects.filter(pk__in=dttot_ids).order_by("dttot_id")),
+        recall_sample,
+    )
+    saved = save_scored_shard_rows(document_id, rows, "personal")
+    return {"report_type": "personal", "saved": saved, "blocking": summary}
+
+
 @shared_task()
 def scoring_similarity_personal(
     document_id: str,
@@ -58,60 +171,19 @@ def scoring_similarity_personal(
             logger.error(msg)
             raise ValueError(msg)  # noqa: TRY301
 
-        total_iterations = len(dttot_docs) * len(dsb_user_personals)
-        current_iteration = 0
-
-        # Iterate over each dttotDoc and compare with each DSB User Personal
-        for dttot_doc in dttot_docs:
-            for dsb_user in dsb_user_personals:
-                current_iteration += 1
-                progress = (current_iteration / total_iterations) * 100
-                logger.info(
-                    "Processing iteration %d/%d (%.2f%%) for DTTOT Doc ID: %s and DSB User Personal ID: %s",
-                    current_iteration,
-                    total_iterations,
-                    progress,
-                    dttot_doc.dttot_id,
-                    dsb_user.dsb_user_personal_id,
-                )
-
-                # Prepare the personal data
-                personal_data = {
-                    "personal_nik": dsb_user.personal_nik,
-                    "user_name": dsb_user.user_name,
-                    "personal_phone_number": dsb_user.personal_phone_number,
-                    "personal_spouse_name": dsb_user.personal_spouse_name,
-                    "personal_mother_name": dsb_user.personal_mother_name,
-                    "personal_domicile_address": dsb_user.personal_domicile_address,
-                    "personal_birth_date": dsb_user.personal_birth_date.strftime("%Y-%m-%d") if isinstance(dsb_user.personal_birth_date, date) else dsb_user.personal_birth_date,
-                    "personal_birth_place": dsb_user.personal_birth_place,
-                    "personal_nationality": dsb_user.personal_nationality,
-                    "personal_description": " ".join(filter(None, [
-                        dsb_user.personal_nik,
-                        dsb_user.user_name,
-                        dsb_user.personal_phone_number,
-                        dsb_user.personal_spouse_name,
-                        dsb_user.personal_mother_name,
-                        dsb_user.personal_domicile_address,
-                        dsb_user.personal_birth_date.strftime("%Y-%m-%d") if isinstance(dsb_user.personal_birth_date, date) else dsb_user.personal_birth_date,
-                        dsb_user.personal_birth_place,
-                        dsb_user.personal_nationality,
-                    ])),
-                }
-
-                # Save the report data row by row
-                save_report_data_row_by_row(
-                    dttot_doc_report,
-                    dsb_user.dsb_user_personal_id,
-                    personal_data,
-                    dttot_doc,
-                )
-                logger.info(
-                    "Successfully processed and updated report for DTTOT Doc ID: %s and DSB User Personal ID: %s",
-                    dttot_doc.dttot_id,
-                    dsb_user.pk,
-                )
-
+        # Unchanged entries keep the rows of the previous report and are only scored
+        # against the DSB users created or changed since, the rest against every user
+        batches = dttot_scoring_batches(dsb_user_personals, dttot_docs, previous_dttot_report(document_id))
+        if not batches:
+            logger.info("No DTTOT entries or DSB users to score again for document ID: %s", document_id)
+            return "No DTTOT entries or DSB users to score again."
+
+        # Only score the DSB users that blocking keeps for each entry, then save the report rows
+        rows: list[list[Any]] = []
+        for batch_users, batch_docs in batches:
+            batch_rows, _ = score_personal_dttot_docs(document_id, batch_users, batch_docs)
+            rows.extend(batch_rows)
+        save_scored_rows(dttot_doc_report, rows, "personal")
         return "Successfully processed all records."  # noqa: TRY300
 
     except Exception as e:
@@ -2,6 +2,7 @@ from __future__ import annotations
 
 import logging
 from datetime import date
+from typing import Any
 
 from celery import shared_task  #type: ignore # noqa: PGH003
 
@@ -9,9 +10,18 @@ from app.documents.dttotDoc.dttotDocReport.models import (
     DttotDocReport,  #type: ignore # noqa: PGH003
 )
 from app.documents.dttotDoc.dttotDocReportPublisher.utils.utils import (  #type: ignore # noqa: PGH003
-    save_report_data_row_by_row,
+    PUBLISHER_SCORING,
 )
 from app.documents.dttotDoc.models import DttotDoc  #type: ignore # noqa: PGH003
+from app.documents.dttotDoc.utils import (  #type: ignore # noqa: PGH003
+    dttot_scoring_batches,
+    filter_changed_dsb_users,
+    previous_dttot_report,
+    save_scored_rows,
+    save_scored_shard_rows,
+    score_dttot_shard,
+)
+from app.documents.utils.blocking import BlockingKeys  #type: ignore # noqa: PGH003
 from app.dsb_user.dsb_user_publisher.models import (  #type: ignore # noqa: PGH003
     DsbUserPublisher,
 )
@@ -21,6 +31,118 @@ logger = logging.getLogger(__name__)
 KODE_DENSUS_THRESHOLD = 0.8
 
 
+def build_publisher_data(dsb_user: DsbUserPublisher) -> dict[str, Any]:
+    """Prepare the publisher data of a DSB User Publisher that is scored against the DTTOT entries."""
+    return {
+        "publisher_registered_name": dsb_user.publisher_registered_name,
+        "publisher_phone_number": dsb_user.publisher_phone_number,
+        "domicile_address_publisher_1": dsb_user.domicile_address_publisher_1,
+        "domicile_address_publisher_2": dsb_user.domicile_address_publisher_2,
+        "domicile_address_publisher_3_city": dsb_user.domicile_address_publisher_3_city,
+        "publisher_description": " ".join(filter(None, [
+            dsb_user.publisher_registered_name,
+            dsb_user.publisher_phone_number,
+            dsb_user.domicile_address_publisher_1,
+            dsb_user.domicile_address_publisher_2,
+            dsb_user.domicile_address_publisher_3_city,
+        ])),
+        "publisher_pengurus_names": dsb_user.publisher_pengurus_name,
+        "publisher_pengurus_id_number": dsb_user.publisher_pengurus_id_number,
+        "publisher_pengurus_phone_number": dsb_user.publisher_pengurus_phone_number,
+        "publisher_address_pengurus": dsb_user.publisher_address_pengurus,
+        "publisher_tgl_lahir_pengurus": dsb_user.publisher_tgl_lahir_pengurus.strftime("%Y-%m-%d") if isinstance(dsb_user.publisher_tgl_lahir_pengurus, date) else dsb_user.publisher_tgl_lahir_pengurus,
+        "publisher_tempat_lahir_pengurus": dsb_user.publisher_tempat_lahir_pengurus,
+        "pengurus_publisher_description": " ".join(
+            filter(
+                None, [
+                    dsb_user.publisher_pengurus_name,
+                    dsb_user.publisher_pengurus_id_number,
+                    dsb_user.publisher_pengurus_phone_number,
+                    dsb_user.publisher_address_pengurus,
+                    dsb_user.publisher_tgl_lahir_pengurus.strftime("%Y-%m-%d") if isinstance(dsb_user.publisher_tgl_lahir_pengurus, date) else dsb_user.publisher_tgl_lahir_pengurus,
+                    dsb_user.publisher_tempat_lahir_pengurus,
+                ],
+            ),
+        ),
+    }
+
+
+def build_publisher_blocking_keys(dsb_user: DsbUserPublisher) -> BlockingKeys:
+    """Prepare the blocking keys of a DSB User Publisher from the fields scored against DTTOT names and identifiers."""
+    return BlockingKeys(
+        names=(dsb_user.publisher_registered_name, dsb_user.publisher_pengurus_name),
+        identifiers=(
+            dsb_user.publisher_phone_number,
+            dsb_user.publisher_pengurus_id_number,
+            dsb_user.publisher_pengurus_phone_number,
+        ),
+        birth_dates=(dsb_user.publisher_tgl_lahir_pengurus,),
+    )
+
+
+def score_publisher_dttot_docs(
+    document_id: str,
+    dsb_users: list[DsbUserPublisher],
+    dttot_docs: list[DttotDoc],
+    recall_sample: int | None = None,
+) -> tuple[list[list[Any]], dict[str, float | int]]:
+    """Score DTTOT entries against the DSB User Publishers of a document, without saving the report rows."""
+    return score_dttot_shard(
+        f"publisher scoring of document {document_id}",
+        PUBLISHER_SCORING,
+        [dsb_user.dsb_user_publisher_id for dsb_user in dsb_users],
+        [build_publisher_data(dsb_user) for dsb_user in dsb_users],
+        [build_publisher_blocking_keys(dsb_user) for dsb_user in dsb_users],
+        dttot_docs=dttot_docs,
+        match_score=KODE_DENSUS_THRESHOLD,
+        recall_sample=recall_sample,
+    )
+
+
+@shared_task()
+def score_publisher_shard(
+    document_id: str,
+    dttot_ids: list[str],
+    recall_sample: int,
+    changed_since: str | None = None,
+) -> dict[str, Any]:
+    """Score one block of DTTOT entries against the DSB User Publishers of a document.
+
+    Runs as one header task of the scoring chord and saves its own report rows, only
+    their count and the blocking summary go back to ``reduce_dttot_scoring``.
+
+    Args:
+    ----
+        document_id (str): The ID of the document being scored.
+        dttot_ids (list[str]): The DttotDoc IDs of the shard.
+        recall_sample (int): The most pruned pairs scored to estimate recall.
+        changed_since (str | None): Only score the DSB users created or changed since
+            this ISO datetime, every user when None.
+
+    Returns:
+    -------
+        dict[str, Any]: The ``report_type``, the number of report rows ``saved`` and
+            the blocking summary of the shard.
+
+    """
+    logger.info(
+        "Scoring %d DTTOT entries against the DSB User Publishers of document ID: %s",
+        len(dttot_ids),
+        document_id,
+    )
+    dsb_users = DsbUserPublisher.objects.filter(document=document_id)
+    if changed_since is not None:
+        dsb_users = filter_changed_dsb_users(dsb_users, changed_since)
+    rows, summary = score_publisher_dttot_docs(
+        document_id,
+        list(dsb_users),
+        list(DttotDoc.objects.filter(pk__in=dttot_ids).order_by("dttot_id")),
+        recall_sample,
+    )
+    saved = save_scored_shard_rows(document_id, rows, "publisher")
+    return {"report_type": "publisher", "saved": saved, "blocking": summary}
+
+
 @shared_task()
 def scoring_similarity_publisher(
     document_id: str,
@@ -61,69 +183,19 @@ def scoring_similarity_publisher(
             logger.error(msg)
             raise ValueError(msg)  # noqa: TRY301
 
-        total_iterations = len(dttot_docs) * len(dsb_user_pubs)
-        current_iteration = 0
-
-        for dttot_doc in dttot_docs:
-            for dsb_user_pub in dsb_user_pubs:
-                current_iteration += 1
-                progress = (current_iteration / total_iterations) * 100
-                logger.info(
-                    "Processing iteration %d/%d (%.2f%%) for DTTOT Doc ID: %s and DSB User Publisher ID: %s",
-                    current_iteration,
-                    total_iterations,
-                    progress,
-                    dttot_doc.dttot_id,
-                    dsb_user_pub.dsb_user_publisher_id,
-                )
-
-                # Prepare the publisher data
-                publisher_data = {
-                    "publisher_registered_name": dsb_user_pub.publisher_registered_name,
-                    "publisher_phone_number": dsb_user_pub.publisher_phone_number,
-                    "domicile_address_publisher_1": dsb_user_pub.domicile_address_publisher_1,
-                    "domicile_address_publisher_2": dsb_user_pub.domicile_address_publisher_2,
-                    "domicile_address_publisher_3_city": dsb_user_pub.domicile_address_publisher_3_city,
-                    "publisher_description": " ".join(filter(None, [
-                        dsb_user_pub.publisher_registered_name,
-                        dsb_user_pub.publisher_phone_number,
-                        dsb_user_pub.domicile_address_publisher_1,
-                        dsb_user_pub.domicile_address_publisher_2,
-                        dsb_user_pub.domicile_address_publisher_3_city,
-                    ])),
-                    "publisher_pengurus_names": dsb_user_pub.publisher_pengurus_name,
-                    "publisher_pengurus_id_number": dsb_user_pub.publisher_pengurus_id_number,
-                    "publisher_pengurus_phone_number": dsb_user_pub.publisher_pengurus_phone_number,
-                    "publisher_address_pengurus": dsb_user_pub.publisher_address_pengurus,
-                    "publisher_tgl_lahir_pengurus": dsb_user_pub.publisher_tgl_lahir_pengurus.strftime("%Y-%m-%d") if isinstance(dsb_user_pub.publisher_tgl_lahir_pengurus, date) else dsb_user_pub.publisher_tgl_lahir_pengurus,
-                    "publisher_tempat_lahir_pengurus": dsb_user_pub.publisher_tempat_lahir_pengurus,
-                    "pengurus_publisher_description": " ".join(
-                        filter(
-                            None, [
-                                dsb_user_pub.publisher_pengurus_name,
-                                dsb_user_pub.publisher_pengurus_id_number,
-                                dsb_user_pub.publisher_pengurus_phone_number,
-                                dsb_user_pub.publisher_address_pengurus,
-                                dsb_user_pub.publisher_tgl_lahir_pengurus.strftime("%Y-%m-%d") if isinstance(dsb_user_pub.publisher_tgl_lahir_pengurus, date) else dsb_user_pub.publisher_tgl_lahir_pengurus,
-                                dsb_user_pub.publisher_tempat_lahir_pengurus,
-                            ],
-                        ),
-                    ),
-                }
-
-                # Save the publisher data
-                save_report_data_row_by_row(
-                    dttot_doc_report,
-                    dsb_user_pub.dsb_user_publisher_id,
-                    publisher_data,
-                    dttot_doc,
-                )
-                logger.info(
-                    "Successfully processed and updated report for DTTOT Doc ID: %s and DSB User Publisher ID: %s",
-                    dttot_doc.dttot_id,
-                    dsb_user_pub.pk,
-                )
-
+        # Unchanged entries keep the rows of the previous report and are only scored
+        # against the DSB users created or changed since, the rest against every user
+        batches = dttot_scoring_batches(dsb_user_pubs, dttot_docs, previous_dttot_report(document_id))
+        if not batches:
+            logger.info("No DTTOT entries or DSB users to score again for document ID: %s", document_id)
+            return "No DTTOT entries or DSB users to score again."
+
+        # Only score the DSB users that blocking keeps for each entry, then save the report rows
+        rows: list[list[Any]] = []
+        for batch_users, batch_docs in batches:
+            batch_rows, _ = score_publisher_dttot_docs(document_id, batch_users, batch_docs)
+            rows.extend(batch_rows)
+        save_scored_rows(dttot_doc_report, rows, "publisher")
         return "Successfully processed all records."  # noqa: TRY300
 
     except Exception as e:
@@ -836,6 +836,17 @@ class DttotDoc(models.Model):
         blank=True,
         null=True,
     )
+    dttot_content_hash = models.CharField(
+        _("DTTOT Normalized Content Hash"),
+        max_length=64,
+        blank=True,
+    )
+    dttot_change_status = models.CharField(
+        _("DTTOT Change Status against the previous list"),
+        max_length=20,
+        blank=True,
+        db_index=True,
+    )
 
     class Meta:
         db_table = "dttotdoc"
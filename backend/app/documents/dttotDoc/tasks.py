@@ -1,27 +1,45 @@
 from __future__ import annotations
 
 import logging
-from typing import Any
+from collections import defaultdict
+from typing import TYPE_CHECKING, Any
 
-from celery import chain, group, shared_task  #type: ignore  # noqa: PGH003
+from celery import chain, chord, group, shared_task  #type: ignore  # noqa: PGH003
+from django.conf import settings  #type: ignore  # noqa: PGH003
 
 from app.documents.dttotDoc.dttotDocReport.tasks import (  #type: ignore  # noqa: PGH003
     create_or_update_dttotdoc_report,
+    mark_dttot_scoring_failed,
     update_dttotdoc_report_score,
 )
 from app.documents.dttotDoc.dttotDocReportCorporate.tasks import (  #type: ignore  # noqa: PGH003
+    score_corporate_shard,
     scoring_similarity_corporate,
 )
 from app.documents.dttotDoc.dttotDocReportPersonal.tasks import (  #type: ignore  # noqa: PGH003
+    score_personal_shard,
     scoring_similarity_personal,
 )
 from app.documents.dttotDoc.dttotDocReportPublisher.tasks import (  #type: ignore  # noqa: PGH003
+    score_publisher_shard,
     scoring_similarity_publisher,
 )
-from app.documents.dttotDoc.utils import (
-    handle_dttot_document,  #type: ignore  # noqa: PGH003
+from app.documents.dttotDoc.models import DttotDoc  #type: ignore  # noqa: PGH003
+from app.documents.dttotDoc.utils import (  #type: ignore  # noqa: PGH003
+    DTTOT_DSB_USER_MODELS,
+    bulk_handle_dttot_documents,
+    filter_changed_dsb_users,
+    find_reusable_dttot_document,
+    handle_dttot_document,
+    previous_dttot_report,
+    reuse_dttot_document_results,
+    shard_dttot_ids,
+    split_dttot_docs_to_score,
 )
 from app.documents.models import Document  #type: ignore  # noqa: PGH003
+from app.documents.utils.blocking import (  #type: ignore  # noqa: PGH003
+    combine_blocking_summaries,
+)
 from app.documents.utils.data_preparation import (  #type: ignore  # noqa: PGH003
     CleaningSeparatingDeskripsi,
     DTTOTDocumentProcessing,
@@ -37,10 +55,43 @@ from app.dsb_user.dsb_user_personal.tasks import (  #type: ignore  # noqa: PGH00
 from app.dsb_user.dsb_user_publisher.tasks import (  #type: ignore  # noqa: PGH003
     process_dsb_user_publisher_document,
 )
+from app.dsb_user.tasks import process_dsb_user_documents  #type: ignore  # noqa: PGH003
 from app.user.models import User  #type: ignore  # noqa: PGH003
 
+if TYPE_CHECKING:
+    import pandas as pd  #type: ignore  # noqa: PGH003
+
 logger = logging.getLogger(__name__)
 
+# The shard task of every report type scored by the chord
+SCORING_SHARD_TASKS: dict[str, Any] = {
+    "personal": score_personal_shard,
+    "corporate": score_corporate_shard,
+    "publisher": score_publisher_shard,
+}
+
+
+def prepare_dttot_data_frame(
+    processor: DTTOTDocumentProcessing,
+    data_frame: pd.DataFrame,
+    formatter: FormattingColumn | None = None,
+    cleaner: CleaningSeparatingDeskripsi | None = None,
+) -> pd.DataFrame:
+    """Run the DTTOT preparation steps, in order, on an imported dataframe chunk.
+
+    Pass the same ``formatter`` and ``cleaner`` for every chunk of a document so
+    nationality lookups are reused and description overflows are counted per document.
+    """
+    data_frame = processor.extract_and_split_names(data_frame, "Nama", case_insensitive=False)
+    cleaner = cleaner or CleaningSeparatingDeskripsi()
+    data_frame = cleaner.separating_cleaning_deskripsi(data_frame)
+    extractor = ExtractNIKandPassportNumber()
+    data_frame = extractor.extract_nik_and_passport_number(data_frame)
+    formatter = formatter or FormattingColumn()
+    data_frame = formatter.format_birth_date(data_frame)
+    return formatter.format_nationality(data_frame)
+
+
 @shared_task()
 def process_dttot_document_row(
     row_data: dict[str, Any],
@@ -67,7 +118,7 @@ def process_dttot_document_row(
 def process_dttot_document(
     user_id: str,
     document_id: str,
-) -> None:
+) -> dict[str, Any] | None:
     try:
         # Retrieve the Document instance
         document = Document.objects.get(pk=document_id)
@@ -80,39 +131,218 @@ def process_dttot_document(
             msg = "The document_file attribute is not set or has no associated file"
             raise ValueError(msg)  # noqa: TRY301
 
-        # Perform all steps in sequence to ensure no overlap
+        # Stream the upload in chunks so peak memory stays bounded
         processor = DTTOTDocumentProcessing()
-        data_frame = processor.retrieve_data_as_dataframe(
-            document.document_file.path,
-            document.document_file_type.upper(),
-        )
-        data_frame = processor.extract_and_split_names(data_frame, "Nama", case_insensitive=False)
-        cleaner = CleaningSeparatingDeskripsi()
-        data_frame = cleaner.separating_cleaning_deskripsi(data_frame)
-        extractor = ExtractNIKandPassportNumber()
-        data_frame = extractor.extract_nik_and_passport_number(data_frame)
+        if settings.DTTOT_IMPORT_STREAMING:
+            raw_chunks = processor.import_document_chunks(
+                document.document_file.path,
+                document.document_file_type.upper(),
+                settings.DTTOT_INGESTION_CHUNK_SIZE,
+            )
+        else:
+            raw_chunks = iter([
+                processor.retrieve_data_as_dataframe(
+                    document.document_file.path,
+                    document.document_file_type.upper(),
+                ),
+            ])
         formatter = FormattingColumn()
-        data_frame = formatter.format_birth_date(data_frame)
-        data_frame = formatter.format_nationality(data_frame)
-
-        # Dispatch tasks to process each row
-        tasks = [
-            process_dttot_document_row.s(
-                document_id=document.pk,
-                row_data=row.to_dict(),
-                user_id=user.pk,
+        cleaner = CleaningSeparatingDeskripsi()
+        data_frames = (
+            prepare_dttot_data_frame(processor, chunk, formatter, cleaner)
+            for chunk in raw_chunks
+        )
+
+        if settings.DTTOT_INGESTION_MODE == "row":
+            # Dispatch tasks to process each row
+            for data_frame in data_frames:
+                tasks = [
+                    process_dttot_document_row.s(
+                        document_id=document.pk,
+                        row_data=row.to_dict(),
+                        user_id=user.pk,
+                    )
+                    for _, row in data_frame.iterrows()
+                ]
+                group(tasks).apply_async()
+            logger.info(
+                "Successfully dispatched row processing tasks for document ID %s, "
+                "%s rows with more than %s descriptions",
+                document_id, cleaner.overflow_rows, cleaner.max_descriptions,
             )
-            for _, row in data_frame.iterrows()
-        ]
-        group(tasks).apply_async()
+            return None
+
+        # Write the rows in chunks so the rest of the chain sees them stored
+        summary = bulk_handle_dttot_documents(
+            document=document,
+            data_frame=data_frames,
+            user_data=user.pk,
+            chunk_size=settings.DTTOT_INGESTION_CHUNK_SIZE,
+        )
+        summary["description_overflow_rows"] = cleaner.overflow_rows
         logger.info(
-            "Successfully dispatched row processing tasks for document ID %s",
-            document_id,
+            "Processed DTTOT document ID %s: %s rows, %s created, %s updated, %s invalid, "
+            "%s with more than %s descriptions, failed chunks %s",
+            document_id, summary["rows"], summary["created"], summary["updated"],
+            summary["invalid"], summary["description_overflow_rows"],
+            cleaner.max_descriptions, summary["failed_chunks"],
         )
+        return summary  # noqa: TRY300
     except Exception:
         logger.exception("Error processing document ID %s", document_id)
         raise
 
+@shared_task()
+def reuse_dttot_document(
+    user_id: str,
+    document_id: str,
+    previous_document_id: str,
+) -> dict[str, Any]:
+    """Reuse the parsed rows of an identical earlier upload, its scoring is carried over by the scoring tasks."""
+    try:
+        summary = reuse_dttot_document_results(
+            previous_document=Document.objects.get(pk=previous_document_id),
+            document=Document.objects.get(pk=document_id),
+            user_data=user_id,
+        )
+        logger.info(
+            "Reused DTTOT document ID %s for document ID %s: %s rows",
+            previous_document_id, document_id, summary["rows"],
+        )
+        return summary  # noqa: TRY300
+    except Exception:
+        logger.exception(
+            "Error reusing document ID %s for document ID %s",
+            previous_document_id, document_id,
+        )
+        raise
+
+@shared_task()
+def dispatch_dttot_scoring(document_id: str) -> int:
+    """Fan the scoring of a document out as a chord of DTTOT entry shards.
+
+    The DTTOT entries to score are split into ``settings.DTTOT_SCORING_SHARD_SIZE``
+    blocks and every block is scored against the personal, corporate and publisher
+    DSB users by its own task, so scoring spreads over every worker process.
+    Unchanged entries keep the rows of the previous report and their blocks are only
+    scored against the DSB users created or changed since it.
+    Every shard saves its own rows, ``reduce_dttot_scoring`` updates the report
+    status once every shard has finished and ``mark_dttot_scoring_failed`` marks the
+    report when a shard or the reducer fails.
+
+    Args:
+    ----
+        document_id (str): The ID of the document to score.
+
+    Returns:
+    -------
+        int: The number of shard tasks dispatched.
+
+    """
+    dttot_docs = DttotDoc.objects.filter(document=document_id)
+    if not dttot_docs.exists():
+        msg = f"DTTOT Doc data not found for document ID: {document_id}"
+        logger.error(msg)
+        raise ValueError(msg)
+
+    previous_report = previous_dttot_report(document_id)
+    to_score, unchanged = split_dttot_docs_to_score(dttot_docs, previous_report)
+    shards = shard_dttot_ids(
+        list(to_score.order_by("dttot_id").values_list("dttot_id", flat=True)),
+        settings.DTTOT_SCORING_SHARD_SIZE,
+    )
+    jobs: dict[str, list[tuple[list[str], str | None]]] = {
+        report_type: [(shard, None) for shard in shards] for report_type in SCORING_SHARD_TASKS
+    }
+    unchanged_shards = shard_dttot_ids(
+        list(unchanged.order_by("dttot_id").values_list("dttot_id", flat=True)),
+        settings.DTTOT_SCORING_SHARD_SIZE,
+    )
+    if unchanged_shards:
+        changed_since = previous_report.created_date.isoformat()
+        for report_type, report_jobs in jobs.items():
+            dsb_users = DTTOT_DSB_USER_MODELS[report_type].objects.filter(document=document_id)
+            if filter_changed_dsb_users(dsb_users, changed_since).exists():
+                report_jobs.extend((shard, changed_since) for shard in unchanged_shards)
+
+    # The recall sample is split over the shards so a run scores about the same sample
+    header = [
+        SCORING_SHARD_TASKS[report_type].si(
+            document_id,
+            shard,
+            -(-settings.DTTOT_BLOCKING_RECALL_SAMPLE // len(report_jobs)),
+            changed_since,
+        )
+        for report_type, report_jobs in jobs.items()
+        for shard, changed_since in report_jobs
+    ]
+    if not header:
+        logger.info("No DTTOT entries or DSB users to score again for document ID: %s", document_id)
+        update_dttotdoc_report_score.delay(document_id)
+        return 0
+
+    chord(header)(
+        reduce_dttot_scoring.s(document_id).on_error(mark_dttot_scoring_failed.si(document_id)),
+    )
+    logger.info(
+        "Dispatched %d scoring shards of up to %d DTTOT entries for document ID: %s",
+        len(header), settings.DTTOT_SCORING_SHARD_SIZE, document_id,
+    )
+    return len(header)
+
+@shared_task(acks_late=True)
+def reduce_dttot_scoring(
+    shard_results: list[dict[str, Any]],
+    document_id: str,
+) -> dict[str, int]:
+    """Combine the counts and blocking summaries of every scoring shard, then update the report status.
+
+    Args:
+    ----
+        shard_results (list[dict[str, Any]]): The results of the ``score_*_shard`` tasks.
+        document_id (str): The ID of the scored document.
+
+    Returns:
+    -------
+        dict[str, int]: The number of report rows saved per report type.
+
+    """
+    try:
+        saved: dict[str, int] = defaultdict(int)
+        summaries: dict[str, list[dict[str, Any]]] = defaultdict(list)
+        for result in shard_results:
+            saved[result["report_type"]] += result["saved"]
+            summaries[result["report_type"]].append(result["blocking"])
+
+        for report_type, report_summaries in summaries.items():
+            summary = combine_blocking_summaries(report_summaries)
+            logger.info(
+                "Saved %d %s report rows for document ID %s from %d shards "
+                "(pruning ratio %.4f, estimated recall %.4f)",
+                saved[report_type], report_type, document_id, len(report_summaries),
+                summary["pruning_ratio"], summary["recall"],
+            )
+
+        update_dttotdoc_report_score(document_id)
+        return dict(saved)
+    except Exception:
+        logger.exception("Error reducing the scoring shards of document ID %s", document_id)
+        raise
+
+def dsb_user_sync_tasks(
+    user_data_serializable: str,
+    document_data_serializable: str,
+) -> list:
+    """To get the tasks syncing the DSB users for a document, one task fetching all at once by default."""
+    if settings.DSB_USER_CONCURRENT_SYNC:
+        return [process_dsb_user_documents.si(user_data_serializable, document_data_serializable)]
+    return [
+        process_dsb_user_personal_document.si(user_data_serializable, document_data_serializable),
+        process_dsb_user_publisher_document.si(user_data_serializable, document_data_serializable),
+        process_dsb_user_corporate_document.si(user_data_serializable, document_data_serializable),
+    ]
+
+
 @shared_task()
 def initiate_document_processing(
     user_data_serializable: str,
@@ -124,16 +354,43 @@ def initiate_document_processing(
             f"[Celery] Starting document processing for user {user_data_serializable}, document {document_data_serializable}",  # noqa: G004
         )
 
+        # The sharded chord saves the rows and updates the report status itself
+        scoring = (
+            [dispatch_dttot_scoring.si(document_data_serializable)]
+            if settings.DTTOT_SCORING_SHARDED else [
+                scoring_similarity_personal.si(document_data_serializable),
+                scoring_similarity_corporate.si(document_data_serializable),
+                scoring_similarity_publisher.si(document_data_serializable),
+                update_dttotdoc_report_score.si(document_data_serializable),
+            ]
+        )
+
+        # An identical re-upload skips parsing, its entries are unchanged so they are
+        # only scored against the DSB users created or changed since the earlier upload
+        document = Document.objects.get(pk=document_data_serializable)
+        previous_document = (
+            find_reusable_dttot_document(document)
+            if settings.DTTOT_REUSE_DUPLICATE_UPLOADS else None
+        )
+        if previous_document is not None:
+            logger.info(
+                f"[Celery] Document {document_data_serializable} has the same contents as document {previous_document.pk}, reusing its results",  # noqa: G004
+            )
+            chain(
+                *dsb_user_sync_tasks(user_data_serializable, document_data_serializable),
+                reuse_dttot_document.si(
+                    user_data_serializable, document_data_serializable, previous_document.pk,
+                ),
+                create_or_update_dttotdoc_report.si(document_data_serializable),
+                *scoring,
+            )()
+            return
+
         chain(
             process_dttot_document.si(user_data_serializable, document_data_serializable),
-            process_dsb_user_personal_document.si(user_data_serializable, document_data_serializable),
-            process_dsb_user_publisher_document.si(user_data_serializable, document_data_serializable),
-            process_dsb_user_corporate_document.si(user_data_serializable, document_data_serializable),
+            *dsb_user_sync_tasks(user_data_serializable, document_data_serializable),
             create_or_update_dttotdoc_report.si(document_data_serializable),
-            scoring_similarity_personal.si(document_data_serializable),
-            scoring_similarity_corporate.si(document_data_serializable),
-            scoring_similarity_publisher.si(document_data_serializable),
-            update_dttotdoc_report_score.si(document_data_serializable),
+            *scoring,
         )()
 
     except Exception as e:
@@ -1,206 +1,1053 @@
 from __future__ import annotations
 
+import dataclasses
 import difflib
+import hashlib
 import logging
-from typing import Any
+import math
+import re
+from collections import Counter, defaultdict
+from datetime import datetime, timedelta
+from typing import TYPE_CHECKING, Any
 
+import pandas as pd  #type: ignore # noqa: PGH003
+from django.conf import settings  #type: ignore # noqa: PGH003
 from django.core.exceptions import (  #type: ignore # noqa: PGH003
     MultipleObjectsReturned,
     ObjectDoesNotExist,
 )
+from django.core.exceptions import ValidationError as DjangoValidationError  #type: ignore # noqa: PGH003
+from django.db import transaction  #type: ignore # noqa: PGH003
+from django.utils import timezone  #type: ignore # noqa: PGH003
 from rest_framework.exceptions import ValidationError  #type: ignore # noqa: PGH003
 
+from app.documents.dttotDoc.dttotDocReport.models import (  #type: ignore # noqa: PGH003
+    DttotDocReport,
+)
+from app.documents.dttotDoc.dttotDocReportCorporate.models import (  #type: ignore # noqa: PGH003
+    DttotDocReportCorporate,
+)
+from app.documents.dttotDoc.dttotDocReportPersonal.models import (  #type: ignore # noqa: PGH003
+    DttotDocReportPersonal,
+)
+from app.documents.dttotDoc.dttotDocReportPublisher.models import (  #type: ignore # noqa: PGH003
+    DttotDocReportPublisher,
+)
 from app.documents.dttotDoc.models import DttotDoc  #type: ignore # noqa: PGH003
 from app.documents.dttotDoc.serializers import (
     DttotDocSerializer,  #type: ignore # noqa: PGH003
 )
+from app.documents.models import Document  #type: ignore # noqa: PGH003
+from app.documents.utils.blocking import (  #type: ignore # noqa: PGH003
+    BlockingKeys,
+    CandidateBlocker,
+    blocking_summary,
+    sample_pruned_pairs,
+)
+from app.documents.utils.scoring import (  #type: ignore # noqa: PGH003
+    DTTOT_ALIAS_COUNT,
+    DTTOT_BIRTH_DATE_FIELDS,
+    DTTOT_IDENTIFIER_FIELDS,
+    DTTOT_NAME_FIELDS,
+    get_pair_score_cache,
+)
+from app.documents.utils.similarity import (  #type: ignore # noqa: PGH003
+    log_embedding_cache_stats,
+)
+from app.dsb_user.dsb_user_corporate.models import (  #type: ignore # noqa: PGH003
+    DsbUserCorporate,
+)
+from app.dsb_user.dsb_user_personal.models import (  #type: ignore # noqa: PGH003
+    DsbUserPersonal,
+)
+from app.dsb_user.dsb_user_publisher.models import (  #type: ignore # noqa: PGH003
+    DsbUserPublisher,
+)
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Iterable, Iterator, Sequence
+
+    from django.db.models import QuerySet  #type: ignore # noqa: PGH003
+
+    from app.documents.utils.scoring import ScoringEngine  #type: ignore # noqa: PGH003
 
 logger = logging.getLogger(__name__)
 
 MAGIC_COMPARISON_RATIO: float = 0.95
 
-def handle_dttot_document(document: Any, row_data: dict[str, Any], user_data: str) -> str:
-    try:
-        existing_kode_densus = set(
-            DttotDoc.objects.values_list("dttot_kode_densus", flat=True),
+# Model fields that are filled from the processed DTTOT dataframe columns.
+DTTOT_FIELD_SOURCES: dict[str, str] = {
+    "dttot_first_name": "first_name",
+    "dttot_middle_name": "middle_name",
+    "dttot_last_name": "last_name",
+    **{
+        field: column
+        for i in range(1, DTTOT_ALIAS_COUNT + 1)
+        for field, column in (
+            (f"dttot_alias_name_{i}", f"Alias_name_{i}"),
+            (f"dttot_alias_first_name_{i}", f"first_name_alias_{i}"),
+            (f"dttot_alias_middle_name_{i}", f"middle_name_alias_{i}"),
+            (f"dttot_alias_last_name_{i}", f"last_name_alias_{i}"),
+        )
+    },
+    "dttot_type": "Terduga",
+    "dttot_birth_place": "Tpt Lahir",
+    "dttot_birth_date_1": "birth_date_1",
+    "dttot_birth_date_2": "birth_date_2",
+    "dttot_birth_date_3": "birth_date_3",
+    "dttot_nationality_1": "WN_1",
+    "dttot_nationality_2": "WN_2",
+    "dttot_domicile_address": "Alamat",
+    **{f"dttot_description_{i}": f"description_{i}" for i in range(1, 10)},
+    "dttot_nik_ktp": "idNumber",
+    "dttot_passport_number": "passport_number",
+}
+
+# Fields refreshed on an existing DttotDoc when a row matches its kode densus.
+DTTOT_BULK_UPDATE_FIELDS: list[str] = [
+    "document", "last_update_by", "updated_at", "dttot_change_status",
+]
+# How an entry of the latest DTTOT list compares to the stored DttotDoc rows.
+DTTOT_CHANGE_ADDED = "added"
+DTTOT_CHANGE_CHANGED = "changed"
+DTTOT_CHANGE_UNCHANGED = "unchanged"
+DTTOT_CHANGE_REMOVED = "removed"
+DTTOT_CONTENT_FIELDS: list[str] = sorted(DTTOT_FIELD_SOURCES)
+DTTOT_CHANGED_UPDATE_FIELDS: list[str] = [
+    *DTTOT_BULK_UPDATE_FIELDS,
+    *DTTOT_CONTENT_FIELDS,
+    "dttot_content_hash",
+    "dttot_change_status",
+]
+# Report statuses set by update_dttotdoc_report_score once scoring has finished.
+DTTOT_FINISHED_REPORT_STATUSES: tuple[str, ...] = ("DONE", "FAILED")
+# Report status set when scoring broke off, it is not finished so the report is never
+# a previous report whose rows are carried over or reused.
+DTTOT_SCORING_ERROR_STATUS = "ERROR"
+DTTOT_REPORT_ROW_MODELS: dict[str, type[Any]] = {
+    "personal": DttotDocReportPersonal,
+    "corporate": DttotDocReportCorporate,
+    "publisher": DttotDocReportPublisher,
+}
+# The DSB user model scored by every report type.
+DTTOT_DSB_USER_MODELS: dict[str, type[Any]] = {
+    "personal": DsbUserPersonal,
+    "corporate": DsbUserCorporate,
+    "publisher": DsbUserPublisher,
+}
+# A pair already reported within this many days, with a kode densus above the ratio, is not saved again
+REPORT_ROW_DEDUP_DAYS: int = 60
+REPORT_ROW_SIMILARITY_RATIO: float = 0.9
+
+
+def build_dttot_doc_fields(row_data: dict[str, Any]) -> dict[str, Any]:
+    """Map a processed DTTOT row to DttotDoc model field values.
+
+    Args:
+    ----
+        row_data (dict[str, Any]): A row of the processed DTTOT dataframe.
+
+    Returns:
+    -------
+        dict[str, Any]: The DttotDoc field values keyed by model field name.
+
+    """
+    fields = {field: row_data.get(column) for field, column in DTTOT_FIELD_SOURCES.items()}
+    fields["dttot_kode_densus"] = row_data.get("Kode Densus", "")
+    return fields
+
+
+def _clean_field_value(value: Any) -> Any:
+    """Normalize a dataframe cell the way the DRF CharField would store it."""
+    if value is None or (isinstance(value, float) and math.isnan(value)):
+        return None
+    return str(value).strip()
+
+
+def dttot_content_hash(fields: dict[str, Any]) -> str:
+    """Hash the normalized content of a DTTOT entry, without its kode densus.
+
+    Values are compared case-insensitively with whitespace collapsed and empty
+    values treated as missing, so re-exported lists hash the same.
+    """
+    sha256_hash = hashlib.sha256()
+    for field in DTTOT_CONTENT_FIELDS:
+        value = _clean_field_value(fields.get(field))
+        normalized = re.sub(r"\s+", " ", value).casefold() if value else ""
+        sha256_hash.update(f"{field}={normalized}\x1f".encode())
+    return sha256_hash.hexdigest()
+
+
+def _stored_content_hash(dttot_doc: DttotDoc) -> str:
+    """Return the content hash of a stored entry, hashing rows saved before it was kept."""
+    if dttot_doc.dttot_content_hash:
+        return dttot_doc.dttot_content_hash
+    return dttot_content_hash(
+        {field: getattr(dttot_doc, field) for field in DTTOT_CONTENT_FIELDS},
+    )
+
+
+def _previous_dttot_document(document: Document) -> Document | None:
+    """Return the latest upload of the same type before ``document``."""
+    return (
+        Document.objects.filter(
+            document_type=document.document_type,
+            created_date__lte=document.created_date,
+        )
+        .exclude(pk=document.pk)
+        .order_by("-created_date")
+        .first()
+    )
+
+
+def previous_dttot_report(document_id: str) -> DttotDocReport | None:
+    """Return the finished report of the upload before ``document_id``, unchanged entries keep its rows.
+
+    None when ``settings.DTTOT_SCORE_CHANGED_ONLY`` is off or that upload has no
+    finished report, every entry is then scored against every DSB user.
+    """
+    if not settings.DTTOT_SCORE_CHANGED_ONLY:
+        return None
+    previous = _previous_dttot_document(Document.objects.get(pk=document_id))
+    if previous is None:
+        return None
+    return DttotDocReport.objects.filter(
+        document=previous,
+        status_doc__in=DTTOT_FINISHED_REPORT_STATUSES,
+    ).first()
+
+
+def split_dttot_docs_to_score(
+        dttot_docs: QuerySet,
+        previous_report: DttotDocReport | None,
+) -> tuple[QuerySet, QuerySet]:
+    """Split the entries of a document into those scored against every DSB user and the unchanged ones.
+
+    Without a ``previous_report`` there are no rows to keep and every entry is
+    scored against every DSB user.
+    """
+    if previous_report is None:
+        return dttot_docs, dttot_docs.none()
+    return (
+        dttot_docs.exclude(dttot_change_status=DTTOT_CHANGE_UNCHANGED),
+        dttot_docs.filter(dttot_change_status=DTTOT_CHANGE_UNCHANGED),
+    )
+
+
+def filter_changed_dsb_users(dsb_users: QuerySet, changed_since: datetime | str) -> QuerySet:
+    """Keep the DSB users created, or whose ``source_hash`` changed, since ``changed_since``.
+
+    The sync only sets ``updated_date`` on those rows, relinking an unchanged user
+    to the new document leaves it as it was.
+    """
+    if isinstance(changed_since, str):
+        changed_since = datetime.fromisoformat(changed_since)
+    return dsb_users.filter(updated_date__gte=changed_since)
+
+
+def dttot_scoring_batches(
+        dsb_users: QuerySet,
+        dttot_docs: QuerySet,
+        previous_report: DttotDocReport | None,
+) -> list[tuple[list[Any], list[DttotDoc]]]:
+    """Return the ``(DSB users, DTTOT entries)`` batches a report type scores for a document.
+
+    Added and changed entries are scored against every DSB user, unchanged entries
+    only against the users created or changed since ``previous_report``, the other
+    pairs are carried over by ``carry_over_report_rows``. Empty batches are left out.
+    """
+    to_score, unchanged = split_dttot_docs_to_score(dttot_docs, previous_report)
+    batches = [(dsb_users, to_score)]
+    if previous_report is not None:
+        batches.append(
+            (filter_changed_dsb_users(dsb_users, previous_report.created_date), unchanged),
+        )
+    return [
+        (list(users), list(docs.order_by("dttot_id")))
+        for users, docs in batches
+        if users.exists() and docs.exists()
+    ]
+
+
+def dttot_blocking_keys(dttot_doc: DttotDoc) -> BlockingKeys:
+    """Build the blocking keys of a DttotDoc from its names, identifiers and birth dates."""
+    return BlockingKeys(
+        names=(getattr(dttot_doc, field) for field in DTTOT_NAME_FIELDS),
+        identifiers=(getattr(dttot_doc, field) for field in DTTOT_IDENTIFIER_FIELDS),
+        birth_dates=(getattr(dttot_doc, field) for field in DTTOT_BIRTH_DATE_FIELDS),
+    )
+
+
+def block_dttot_candidates(
+        entity_keys: Sequence[BlockingKeys],
+        dttot_docs: Sequence[DttotDoc],
+) -> list[list[int]]:
+    """Find the entities worth scoring against every DttotDoc.
+
+    Args:
+    ----
+        entity_keys (Sequence[BlockingKeys]): The blocking keys of every DSB user.
+        dttot_docs (Sequence[DttotDoc]): The entries to score.
+
+    Returns:
+    -------
+        list[list[int]]: The positions of the candidate DSB users of every entry,
+            every user when ``settings.DTTOT_CANDIDATE_BLOCKING`` is off.
+
+    """
+    if not settings.DTTOT_CANDIDATE_BLOCKING:
+        return [list(range(len(entity_keys))) for _ in dttot_docs]
+    blocker = CandidateBlocker(
+        entity_keys,
+        min_ngram_overlap=settings.DTTOT_BLOCKING_NGRAM_OVERLAP,
+        birth_year_window=settings.DTTOT_BLOCKING_BIRTH_YEAR_WINDOW,
+    )
+    return [blocker.candidates(dttot_blocking_keys(dttot_doc)) for dttot_doc in dttot_docs]
+
+
+def report_blocking(  # noqa: PLR0913
+        label: str,
+        candidates: Sequence[Sequence[int]],
+        entity_count: int,
+        candidate_matches: int,
+        *,
+        match_score: float,
+        score_pair: Callable[[int, int], float],
+        sample_size: int | None = None,
+) -> dict[str, float | int]:
+    """Log the pruning ratio and the estimated recall of a blocked scoring run.
+
+    A sample of the pruned pairs, ``sample_size`` or ``settings.DTTOT_BLOCKING_RECALL_SAMPLE``
+    at most, is scored without being saved to estimate how many matches blocking missed.
+
+    Args:
+    ----
+        label (str): What was scored, for the log.
+        candidates (Sequence[Sequence[int]]): The candidate entities of every entry.
+        entity_count (int): The number of DSB users blocked against.
+        candidate_matches (int): Scored pairs at or above ``match_score``.
+        match_score (float): The score from which a pair counts as a match.
+        score_pair (Callable[[int, int], float]): Scores an ``(entity, dttot)`` position pair.
+        sample_size (int | None): The most pruned pairs to score, the setting when None.
+
+    Returns:
+    -------
+        dict[str, float | int]: The blocking summary of the run.
+
+    """
+    candidate_pairs = sum(map(len, candidates))
+    if sample_size is None:
+        sample_size = settings.DTTOT_BLOCKING_RECALL_SAMPLE
+    sampled = sample_pruned_pairs(candidates, entity_count, sample_size)
+    summary = blocking_summary(
+        total_pairs=len(candidates) * entity_count,
+        candidate_pairs=candidate_pairs,
+        candidate_matches=candidate_matches,
+        sampled_pairs=len(sampled),
+        sampled_matches=sum(score_pair(entity, dttot) >= match_score for entity, dttot in sampled),
+    )
+    logger.info(
+        "Blocking for %s scored %d of %d pairs (pruning ratio %.4f, estimated recall %.4f from %d sampled pairs)",
+        label,
+        summary["candidate_pairs"],
+        summary["total_pairs"],
+        summary["pruning_ratio"],
+        summary["recall"],
+        summary["sampled_pairs"],
+    )
+    return summary
+
+
+def shard_dttot_ids(
+        dttot_ids: Sequence[str],
+        shard_size: int,
+) -> list[list[str]]:
+    """Split the DttotDoc IDs to score into blocks of at most ``shard_size`` entries."""
+    shard_size = max(shard_size, 1)
+    return [list(dttot_ids[start:start + shard_size]) for start in range(0, len(dttot_ids), shard_size)]
+
+
+def score_dttot_shard(  # noqa: PLR0913
+        label: str,
+        engine: ScoringEngine,
+        user_ids: Sequence[str],
+        datas: Sequence[dict[str, Any]],
+        entity_keys: Sequence[BlockingKeys],
+        *,
+        dttot_docs: Sequence[DttotDoc],
+        match_score: float,
+        recall_sample: int | None = None,
+) -> tuple[list[list[Any]], dict[str, float | int]]:
+    """Score the DSB users blocking keeps for every DttotDoc of a shard, without saving them.
+
+    Args:
+    ----
+        label (str): What is scored, for the logs.
+        engine (ScoringEngine): The scoring engine of the report type.
+        user_ids (Sequence[str]): The ID of every DSB user.
+        datas (Sequence[dict[str, Any]]): The scored data of every DSB user.
+        entity_keys (Sequence[BlockingKeys]): The blocking keys of every DSB user.
+        dttot_docs (Sequence[DttotDoc]): The entries of the shard.
+        match_score (float): The score from which a pair counts as a match.
+        recall_sample (int | None): The most pruned pairs scored to estimate recall.
+
+    Returns:
+    -------
+        tuple[list[list[Any]], dict[str, float | int]]: A ``[user_id, dttot_id, score]``
+            row for every scored pair at or above ``DTTOT_SCORE_FLOOR``, and the blocking
+            summary of the shard.
+
+    """
+    candidates = block_dttot_candidates(entity_keys, dttot_docs)
+    # Pairs that cannot reach the floor are abandoned half-scored and not saved,
+    # the floor never goes above the match score so no match is lost
+    floor = min(settings.DTTOT_SCORE_FLOOR, match_score)
+
+    # Pairs whose scored values were scored before are not scored again
+    pair_cache = get_pair_score_cache(engine)
+    cached: dict[tuple[int, int], float] = {}
+    if pair_cache is not None:
+        entity_hashes = {
+            user_index: engine.entity_hash(datas[user_index]) for user_index in set().union(*candidates)
+        }
+        dttot_hashes = [engine.dttot_hash(dttot_doc) for dttot_doc in dttot_docs]
+        cached = pair_cache.get_many({
+            (user_index, dttot_index): (dttot_hashes[dttot_index], entity_hashes[user_index])
+            for dttot_index, user_indexes in enumerate(candidates)
+            for user_index in user_indexes
+        })
+    to_score = [
+        [user_index for user_index in user_indexes if (user_index, dttot_index) not in cached]
+        for dttot_index, user_indexes in enumerate(candidates)
+    ]
+    if floor <= 0:
+        # Without a floor every field is embedded anyway, so embed them in one pass
+        engine.prefetch(
+            [datas[user_index] for user_index in sorted(set().union(*to_score))],
+            [dttot_doc for dttot_doc, user_indexes in zip(dttot_docs, to_score, strict=True) if user_indexes],
+        )
+
+    rows: list[list[Any]] = []
+    candidate_matches = 0
+    for dttot_index, dttot_doc in enumerate(dttot_docs):
+        user_indexes = to_score[dttot_index]
+        scores = {
+            user_index: cached[user_index, dttot_index]
+            for user_index in candidates[dttot_index]
+            if (user_index, dttot_index) in cached
+        }
+        if user_indexes:
+            fresh = engine.score([datas[user_index] for user_index in user_indexes], [dttot_doc], floor)[:, 0]
+            scores.update(zip(user_indexes, map(float, fresh), strict=True))
+            if pair_cache is not None:
+                # Abandoned pairs are left out, their NaN only holds for this floor
+                pair_cache.set_many({
+                    (dttot_hashes[dttot_index], entity_hashes[user_index]): scores[user_index]
+                    for user_index in user_indexes
+                    if not math.isnan(scores[user_index])
+                })
+        for user_index in candidates[dttot_index]:
+            # NaN, an abandoned pair, fails both comparisons
+            candidate_matches += scores[user_index] >= match_score
+            if scores[user_index] >= floor:
+                rows.append([user_ids[user_index], dttot_doc.dttot_id, scores[user_index]])
+        logger.info(
+            "Scored DTTOT Doc %d/%d (%.2f%%) ID: %s against %d of %d DSB users (%d cached) for %s",
+            dttot_index + 1,
+            len(dttot_docs),
+            (dttot_index + 1) / len(dttot_docs) * 100,
+            dttot_doc.dttot_id,
+            len(candidates[dttot_index]),
+            len(user_ids),
+            len(candidates[dttot_index]) - len(user_indexes),
+            label,
+        )
+
+    summary = report_blocking(
+        label,
+        candidates,
+        len(user_ids),
+        candidate_matches,
+        match_score=match_score,
+        score_pair=lambda user_index, dttot_index: engine.score_pair(
+            datas[user_index], dttot_docs[dttot_index], floor,
+        ),
+        sample_size=recall_sample,
+    )
+    log_embedding_cache_stats(engine.nlp, label)
+    if pair_cache is not None:
+        logger.info("Pair score cache for %s: %d hits, %d misses", label, pair_cache.hits, pair_cache.misses)
+    return rows, summary
+
+
+class KodeDensusIndex:
+    """In-memory index returning kode densus values similar to a lookup value.
+
+    A candidate only passes ``SequenceMatcher.ratio() > threshold`` when its
+    length is close to the lookup value and it shares enough character
+    bigrams with it, so lookups only verify the few values that survive the
+    length buckets and the bigram count filter instead of the whole table.
+    """
+
+    QGRAM_SIZE: int = 2
+
+    def __init__(
+        self,
+        values: Iterable[str] = (),
+        threshold: float = MAGIC_COMPARISON_RATIO,
+    ) -> None:
+        self.threshold = threshold
+        self._values: dict[str, None] = {}
+        self._by_length: dict[int, dict[str, None]] = defaultdict(dict)
+        self._postings: dict[str, dict[str, int]] = defaultdict(dict)
+        for value in values:
+            self.add(value)
+
+    def __len__(self) -> int:
+        return len(self._values)
+
+    def __contains__(self, value: object) -> bool:
+        return value in self._values
+
+    @classmethod
+    def _qgrams(cls, value: str) -> Counter[str]:
+        size = cls.QGRAM_SIZE
+        return Counter(value[i:i + size] for i in range(len(value) - size + 1))
+
+    def add(self, value: str | None) -> None:
+        """Add a kode densus value to the index."""
+        if not isinstance(value, str) or value in self._values:
+            return
+        self._values[value] = None
+        self._by_length[len(value)][value] = None
+        for qgram, count in self._qgrams(value).items():
+            self._postings[qgram][value] = count
+
+    def discard(self, value: str | None) -> None:
+        """Remove a kode densus value from the index if it is present."""
+        if value not in self._values:
+            return
+        del self._values[value]
+        del self._by_length[len(value)][value]
+        for qgram in self._qgrams(value):
+            self._postings[qgram].pop(value, None)
+
+    def _length_range(self, length: int) -> range:
+        # ratio = 2 * matches / (len_a + len_b) and matches <= min(len_a, len_b)
+        low = math.floor(length * self.threshold / (2 - self.threshold)) + 1
+        high = math.ceil(length * (2 - self.threshold) / self.threshold) - 1
+        return range(max(low, 0), max(high, length) + 1)
+
+    def _candidates(self, value: str) -> Iterable[str]:
+        lengths = self._length_range(len(value))
+        qgrams = self._qgrams(value)
+        shared: Counter[str] = Counter()
+        for qgram, count in qgrams.items():
+            for candidate, candidate_count in self._postings.get(qgram, {}).items():
+                shared[candidate] += min(count, candidate_count)
+
+        for length in lengths:
+            bucket = self._by_length.get(length)
+            if not bucket:
+                continue
+            # Every insertion or deletion between the two values breaks at most
+            # QGRAM_SIZE bigrams, which bounds the bigrams they must share.
+            max_edits = math.ceil((1 - self.threshold) * (len(value) + length)) - 1
+            min_shared = (
+                max(len(value), length) - self.QGRAM_SIZE + 1
+                - max_edits * self.QGRAM_SIZE
+            )
+            if min_shared <= 0:
+                yield from bucket
+                continue
+            for candidate in bucket:
+                if shared[candidate] >= min_shared:
+                    yield candidate
+
+    def find(self, value: str | None) -> str | None:
+        """Return the most similar indexed value above the threshold, if any."""
+        if not isinstance(value, str):
+            return None
+        if value in self._values:
+            return value
+        best_value, best_ratio = None, self.threshold
+        for candidate in self._candidates(value):
+            ratio = difflib.SequenceMatcher(None, value, candidate).ratio()
+            if ratio > best_ratio:
+                best_value, best_ratio = candidate, ratio
+        return best_value
+
+
+class ReportRowWriter:
+    """Buffer the scored rows of one report type and ``bulk_create`` them in batches.
+
+    The rows of the report created in the last ``REPORT_ROW_DEDUP_DAYS`` days are
+    loaded once into a kode densus index per DSB user, so a pair that was already
+    reported, or added earlier in the same run, is skipped without a query.
+
+    Attributes
+    ----------
+        model (type[Any]): The report row model of the report type.
+        batch_size (int): The number of buffered rows that triggers a flush.
+        created (int): The rows written so far.
+        skipped (int): The rows skipped as already reported.
+
+    """
+
+    def __init__(
+        self,
+        dttotdoc_report: DttotDocReport,
+        report_type: str,
+        batch_size: int | None = None,
+    ) -> None:
+        self.dttotdoc_report = dttotdoc_report
+        self.model = DTTOT_REPORT_ROW_MODELS[report_type]
+        self.user_field = f"dsb_user_{report_type}"
+        self.kode_densus_field = f"kode_densus_{report_type}"
+        self.batch_size = batch_size or settings.DTTOT_REPORT_WRITE_BATCH_SIZE
+        self.created = 0
+        self.skipped = 0
+        self._pending: list[Any] = []
+        self._reported: dict[str, KodeDensusIndex] = defaultdict(
+            lambda: KodeDensusIndex(threshold=REPORT_ROW_SIMILARITY_RATIO),
         )
+        recent_rows = self.model.objects.filter(
+            dttotdoc_report=dttotdoc_report,
+            created_date__gte=timezone.now() - timedelta(days=REPORT_ROW_DEDUP_DAYS),
+        ).values_list(self.user_field, self.kode_densus_field)
+        for user_id, kode_densus in recent_rows.iterator():
+            self._reported[user_id].add(kode_densus)
+
+    def add(
+        self,
+        user_id: str,
+        score_match_similarity: float,
+        kode_densus: str | None,
+    ) -> bool:
+        """Buffer a scored pair unless it was already reported, return whether it was buffered."""
+        reported = self._reported[user_id]
+        if reported.find(kode_densus) is not None:
+            self.skipped += 1
+            return False
+
+        reported.add(kode_densus)
+        self._pending.append(self.model(**{
+            "dttotdoc_report": self.dttotdoc_report,
+            self.user_field: user_id,
+            self.kode_densus_field: kode_densus,
+            "score_match_similarity": score_match_similarity,
+        }))
+        if len(self._pending) >= self.batch_size:
+            self.flush()
+        return True
+
+    def flush(self) -> int:
+        """Write the buffered rows, return how many were written."""
+        if not self._pending:
+            return 0
+        self.model.objects.bulk_create(self._pending, batch_size=self.batch_size)
+        written = len(self._pending)
+        self.created += written
+        self._pending = []
+        return written
+
+
+def save_scored_rows(
+        dttotdoc_report: DttotDocReport,
+        rows: Iterable[Sequence[Any]],
+        report_type: str,
+) -> int:
+    """Save the ``[user_id, dttot_id, score]`` rows of a scoring run as report rows of ``report_type``.
+
+    Args:
+    ----
+        dttotdoc_report (DttotDocReport): The report of the scored document.
+        rows (Iterable[Sequence[Any]]): The scored pairs.
+        report_type (str): ``personal``, ``corporate`` or ``publisher``.
+
+    Returns:
+    -------
+        int: The number of report rows written, already reported pairs are skipped.
+
+    """
+    rows = list(rows)
+    kode_densus = dict(
+        DttotDoc.objects.filter(dttot_id__in={dttot_id for _, dttot_id, _ in rows})
+        .values_list("dttot_id", "dttot_kode_densus"),
+    )
+    writer = ReportRowWriter(dttotdoc_report, report_type)
+    for user_id, dttot_id, score in rows:
+        writer.add(user_id, score, kode_densus[dttot_id])
+    writer.flush()
+    logger.info(
+        "Saved %d %s report rows for DTTOT Doc Report %s, %d already reported",
+        writer.created, report_type, dttotdoc_report.pk, writer.skipped,
+    )
+    return writer.created
+
+
+def save_scored_shard_rows(
+        document_id: str,
+        rows: Iterable[Sequence[Any]],
+        report_type: str,
+) -> int:
+    """Save the rows of one scoring shard while the other shards of the document may be saving theirs.
+
+    The report is locked until the rows are written, so the shards write one after
+    the other and every writer's dedup index holds the rows the earlier shards saved.
+
+    Args:
+    ----
+        document_id (str): The ID of the scored document.
+        rows (Iterable[Sequence[Any]]): The ``[user_id, dttot_id, score]`` rows of the shard.
+        report_type (str): ``personal``, ``corporate`` or ``publisher``.
+
+    Returns:
+    -------
+        int: The number of report rows written, already reported pairs are skipped.
+
+    """
+    with transaction.atomic():
+        dttotdoc_report = DttotDocReport.objects.select_for_update().get(document=document_id)
+        return save_scored_rows(dttotdoc_report, rows, report_type)
+
+
+def _load_existing_dttot_docs() -> dict[str, DttotDoc]:
+    """Load every DttotDoc keyed by kode densus, keeping the first duplicate."""
+    existing: dict[str, DttotDoc] = {}
+    for dttot_doc in DttotDoc.objects.order_by("updated_at").iterator():
+        kode_densus = dttot_doc.dttot_kode_densus
+        if kode_densus is None:
+            continue
+        if kode_densus in existing:
+            logger.warning(
+                "Multiple DttotDoc entries found for kode_densus '%s', using the first one.",
+                kode_densus,
+            )
+            continue
+        existing[kode_densus] = dttot_doc
+    return existing
+
+
+def _iter_record_chunks(
+    data_frames: pd.DataFrame | Iterable[pd.DataFrame],
+    chunk_size: int,
+) -> Iterator[tuple[int, list[dict[str, Any]]]]:
+    """Yield the row offset and records of each chunk of the given dataframes."""
+    if isinstance(data_frames, pd.DataFrame):
+        data_frames = [data_frames]
+    start = 0
+    for data_frame in data_frames:
+        records = data_frame.to_dict(orient="records")
+        for offset in range(0, len(records), chunk_size):
+            chunk_records = records[offset:offset + chunk_size]
+            yield start, chunk_records
+            start += len(chunk_records)
+
+
+@dataclasses.dataclass
+class DttotChunkDiff:
+    """How the rows of one chunk of a DTTOT list compare to the stored DttotDoc entries.
+
+    Attributes
+    ----------
+        added (list[DttotDoc]): New entries to create.
+        changed (dict[str, DttotDoc]): Stored entries with new content, by ID.
+        unchanged (dict[str, DttotDoc]): Stored entries only moved to the document, by ID.
+        invalid (list[dict[str, Any]]): The row number and errors of every invalid row.
+        matched_kode_densus (set[str]): The stored kode densus matched by the chunk.
+
+    """
+
+    added: list[DttotDoc] = dataclasses.field(default_factory=list)
+    changed: dict[str, DttotDoc] = dataclasses.field(default_factory=dict)
+    unchanged: dict[str, DttotDoc] = dataclasses.field(default_factory=dict)
+    invalid: list[dict[str, Any]] = dataclasses.field(default_factory=list)
+    matched_kode_densus: set[str] = dataclasses.field(default_factory=set)
+
+
+class DttotListDiff:
+    """Classify the entries of a new DTTOT list as added, changed, unchanged or removed.
+
+    The stored entries are loaded once, keyed by kode densus, into a
+    ``KodeDensusIndex``. Every chunk is diffed against them by kode densus and
+    normalized content hash, entries added by the chunk join the index until the
+    chunk is rejected. Stored entries no chunk matched have been removed from the list.
+
+    Attributes
+    ----------
+        document (Any): The Document instance the rows belong to.
+        user_data (str): The ID of the user performing the import.
+        existing_docs (dict[str, DttotDoc]): The stored entries by kode densus.
+        matched_kode_densus (set[str]): The stored kode densus matched by accepted chunks.
+
+    """
+
+    def __init__(self, document: Any, user_data: str) -> None:
+        self.document = document
+        self.user_data = user_data
+        self.existing_docs = _load_existing_dttot_docs()
+        self.kode_densus_index = KodeDensusIndex(self.existing_docs)
+        self.matched_kode_densus: set[str] = set()
+
+    @staticmethod
+    def classify(existing_doc: DttotDoc | None, content_hash: str) -> str:
+        """Return how an entry compares to the stored entry with a similar kode densus."""
+        if existing_doc is None or existing_doc.dttot_change_status == DTTOT_CHANGE_REMOVED:
+            # A removed entry was not scored with the previous list, score it again
+            return DTTOT_CHANGE_ADDED
+        if content_hash != _stored_content_hash(existing_doc):
+            return DTTOT_CHANGE_CHANGED
+        return DTTOT_CHANGE_UNCHANGED
+
+    def diff_chunk(self, start: int, records: list[dict[str, Any]]) -> DttotChunkDiff:
+        """Diff the records of a chunk, starting at row ``start``, against the stored entries."""
+        diff = DttotChunkDiff()
+        now = timezone.now()
+        for offset, row_data in enumerate(records):
+            fields = {
+                name: _clean_field_value(value)
+                for name, value in build_dttot_doc_fields(row_data).items()
+            }
+            kode_densus = fields["dttot_kode_densus"] or ""
+            fields["dttot_kode_densus"] = kode_densus
+
+            matched = self.kode_densus_index.find(kode_densus)
+            existing_doc = self.existing_docs.get(matched) if matched is not None else None
+            if matched is not None and (
+                existing_doc is None
+                or matched in diff.matched_kode_densus
+                or matched in self.matched_kode_densus
+            ):
+                # Already written by an earlier row of this upload.
+                continue
+
+            content_hash = dttot_content_hash(fields)
+            status = self.classify(existing_doc, content_hash)
+            if existing_doc is not None:
+                diff.matched_kode_densus.add(matched)
+                existing_doc.document = self.document
+                existing_doc.last_update_by_id = self.user_data
+                existing_doc.updated_at = now
+                existing_doc.dttot_change_status = status
+                if status == DTTOT_CHANGE_UNCHANGED:
+                    diff.unchanged[existing_doc.pk] = existing_doc
+                    continue
+
+            dttot_doc = DttotDoc(
+                document=self.document,
+                last_update_by_id=self.user_data,
+                dttot_content_hash=content_hash,
+                dttot_change_status=status,
+                **fields,
+            )
+            try:
+                dttot_doc.clean_fields(exclude=["dttot_id", "document", "last_update_by"])
+            except DjangoValidationError as e:
+                diff.invalid.append({"row": start + offset, "errors": e.message_dict})
+                continue
+
+            if existing_doc is not None:
+                # Keep the stored kode densus, it may only be similar to the new one
+                for name in DTTOT_CONTENT_FIELDS:
+                    setattr(existing_doc, name, fields[name])
+                existing_doc.dttot_content_hash = content_hash
+                diff.changed[existing_doc.pk] = existing_doc
+                continue
+
+            diff.added.append(dttot_doc)
+            self.kode_densus_index.add(kode_densus)
+        return diff
+
+    def accept(self, diff: DttotChunkDiff) -> None:
+        """Record the entries matched by a chunk that was written."""
+        self.matched_kode_densus |= diff.matched_kode_densus
+
+    def reject(self, diff: DttotChunkDiff) -> None:
+        """Forget the entries added by a chunk that failed to write."""
+        for dttot_doc in diff.added:
+            self.kode_densus_index.discard(dttot_doc.dttot_kode_densus)
+
+    def removed_ids(self) -> list[str]:
+        """Return the IDs of the stored entries that no accepted chunk matched."""
+        return [
+            dttot_doc.pk
+            for kode_densus, dttot_doc in self.existing_docs.items()
+            if kode_densus not in self.matched_kode_densus
+        ]
+
+
+def bulk_handle_dttot_documents(
+    document: Any,
+    data_frame: pd.DataFrame | Iterable[pd.DataFrame],
+    user_data: str,
+    chunk_size: int | None = None,
+) -> dict[str, Any]:
+    """Create or update DttotDoc rows for a processed DTTOT dataframe in chunks.
+
+    Every chunk is diffed against the stored entries by a ``DttotListDiff`` and
+    written inside its own transaction with ``bulk_create`` and ``bulk_update`` so a
+    failing chunk does not roll back the chunks that were already stored.
+
+    Each entry is marked added, changed or unchanged in ``dttot_change_status``.
+    Changed entries get their new content, unchanged entries are only moved to
+    ``document``. When every chunk was written, stored entries missing from the
+    list are marked removed. Scoring skips the unchanged entries.
+
+    Args:
+    ----
+        document (Any): The Document instance the rows belong to.
+        data_frame (pd.DataFrame | Iterable[pd.DataFrame]): The processed DTTOT
+            dataframe, or the processed chunks of a streamed import.
+        user_data (str): The ID of the user performing the import.
+        chunk_size (int | None): Rows written per chunk, defaults to
+            ``settings.DTTOT_INGESTION_CHUNK_SIZE``.
+
+    Returns:
+    -------
+        dict[str, Any]: Totals and the per-chunk success/failure summary.
+
+    """
+    chunk_size = max(int(chunk_size or settings.DTTOT_INGESTION_CHUNK_SIZE), 1)
+    list_diff = DttotListDiff(document, user_data)
+
+    chunks: list[dict[str, Any]] = []
+    for chunk_number, (start, chunk_records) in enumerate(
+        _iter_record_chunks(data_frame, chunk_size), start=1,
+    ):
+        diff = list_diff.diff_chunk(start, chunk_records)
+        summary: dict[str, Any] = {
+            "chunk": chunk_number,
+            "rows": len(chunk_records),
+            "created": 0,
+            "updated": 0,
+            "changed": 0,
+            "unchanged": 0,
+            "invalid": diff.invalid,
+        }
+        try:
+            with transaction.atomic():
+                DttotDoc.objects.bulk_create(diff.added, batch_size=chunk_size)
+                DttotDoc.objects.bulk_update(
+                    list(diff.unchanged.values()),
+                    DTTOT_BULK_UPDATE_FIELDS,
+                    batch_size=chunk_size,
+                )
+                DttotDoc.objects.bulk_update(
+                    list(diff.changed.values()),
+                    DTTOT_CHANGED_UPDATE_FIELDS,
+                    batch_size=chunk_size,
+                )
+        except Exception as e:
+            logger.exception(
+                "Failed to write DTTOT chunk %s for document ID %s",
+                chunk_number, document.document_id,
+            )
+            summary.update({"status": "failed", "error": str(e)})
+            list_diff.reject(diff)
+        else:
+            list_diff.accept(diff)
+            summary.update({
+                "status": "success",
+                "created": len(diff.added),
+                "updated": len(diff.unchanged) + len(diff.changed),
+                "changed": len(diff.changed),
+                "unchanged": len(diff.unchanged),
+            })
+            logger.info(
+                "Wrote DTTOT chunk %s for document ID %s: %s created, %s changed, %s unchanged, %s invalid",
+                chunk_number, document.document_id,
+                len(diff.added), len(diff.changed), len(diff.unchanged), len(diff.invalid),
+            )
+        chunks.append(summary)
+
+    failed_chunks = [chunk["chunk"] for chunk in chunks if chunk["status"] == "failed"]
+    removed = 0
+    if not failed_chunks:
+        # Entries missing from a fully written list have been removed from it
+        removed_ids = list_diff.removed_ids()
+        for offset in range(0, len(removed_ids), chunk_size):
+            removed += DttotDoc.objects.filter(
+                pk__in=removed_ids[offset:offset + chunk_size],
+            ).update(dttot_change_status=DTTOT_CHANGE_REMOVED)
+
+    return {
+        "document_id": str(document.document_id),
+        "rows": sum(chunk["rows"] for chunk in chunks),
+        "created": sum(chunk["created"] for chunk in chunks),
+        "updated": sum(chunk["updated"] for chunk in chunks),
+        "changed": sum(chunk["changed"] for chunk in chunks),
+        "unchanged": sum(chunk["unchanged"] for chunk in chunks),
+        "removed": removed,
+        "invalid": sum(len(chunk["invalid"]) for chunk in chunks),
+        "failed_chunks": failed_chunks,
+        "chunks": chunks,
+    }
+
+
+def handle_dttot_document(
+    document: Any,
+    row_data: dict[str, Any],
+    user_data: str,
+    kode_densus_index: KodeDensusIndex | None = None,
+) -> str:
+    try:
+        if kode_densus_index is None:
+            kode_densus_index = KodeDensusIndex(
+                DttotDoc.objects.values_list("dttot_kode_densus", flat=True),
+            )
         kode_densus = row_data.get("Kode Densus", "")
         existing_dttot_doc = None
 
         # Check if an existing record with a similar kode_densus exists
-        for existing in existing_kode_densus:
-            if difflib.SequenceMatcher(None, kode_densus, existing).ratio() > MAGIC_COMPARISON_RATIO:
-                try:
-                    # attempt strict get
-                    existing_dttot_doc = DttotDoc.objects.get(dttot_kode_densus=existing)
-                except MultipleObjectsReturned:
-                    # log detail and pick the first one
-                    matching_docs = DttotDoc.objects.filter(dttot_kode_densus=existing)
-                    if matching_docs.exists():
-                        existing_dttot_doc = matching_docs.first()
-                        # Optional: log warning with document IDs
-                        logger.warning(
-                            f"Multiple DttotDoc entries found for kode_densus '{existing}', using the first one. IDs: {[str(doc.dttot_kode_densus) for doc in matching_docs]}",  # noqa: G004
-                        )
-                    else:
-                        msg = f"Unexpected error: MultipleObjectsReturned for '{existing}' but queryset returned nothing."
-                        raise ValidationError(  # noqa: B904
-                            msg,
-                        )
-                except ObjectDoesNotExist:
-                    existing_dttot_doc = None
-                break
+        existing = kode_densus_index.find(kode_densus)
+        if existing is not None:
+            try:
+                # attempt strict get
+                existing_dttot_doc = DttotDoc.objects.get(dttot_kode_densus=existing)
+            except MultipleObjectsReturned:
+                # log detail and pick the first one
+                matching_docs = DttotDoc.objects.filter(dttot_kode_densus=existing)
+                if matching_docs.exists():
+                    existing_dttot_doc = matching_docs.first()
+                    # Optional: log warning with document IDs
+                    logger.warning(
+                        f"Multiple DttotDoc entries found for kode_densus '{existing}', using the first one. IDs: {[str(doc.dttot_kode_densus) for doc in matching_docs]}",  # noqa: G004
+                    )
+                else:
+                    msg = f"Unexpected error: MultipleObjectsReturned for '{existing}' but queryset returned nothing."
+                    raise ValidationError(  # noqa: B904
+                        msg,
+                    )
+            except ObjectDoesNotExist:
+                existing_dttot_doc = None
+
+        fields = build_dttot_doc_fields(row_data)
+        content_hash = dttot_content_hash(fields)
 
         # If a similar record exists, update it
         if existing_dttot_doc:
             row_data["document"] = document.document_id
             row_data["last_update_by"] = user_data
+            row_data["dttot_change_status"] = DttotListDiff.classify(existing_dttot_doc, content_hash)
+            if content_hash != _stored_content_hash(existing_dttot_doc):
+                fields.pop("dttot_kode_densus")
+                row_data.update({**fields, "dttot_content_hash": content_hash})
             serializer = DttotDocSerializer(existing_dttot_doc,data=row_data)
         else:
             # Else, create a new record
             row_data.update({
                 "last_update_by": user_data,
                 "document": document.document_id,
-                "dttot_first_name": row_data.get("first_name"),
-                "dttot_middle_name": row_data.get("middle_name"),
-                "dttot_last_name": row_data.get("last_name"),
-                "dttot_alias_name_1": row_data.get("Alias_name_1"),
-                "dttot_alias_first_name_1": row_data.get("first_name_alias_1"),
-                "dttot_alias_middle_name_1": row_data.get("middle_name_alias_1"),
-                "dttot_alias_last_name_1": row_data.get("last_name_alias_1"),
-                "dttot_alias_name_2": row_data.get("Alias_name_2"),
-                "dttot_alias_first_name_2": row_data.get("first_name_alias_2"),
-                "dttot_alias_middle_name_2": row_data.get("middle_name_alias_2"),
-                "dttot_alias_last_name_2": row_data.get("last_name_alias_2"),
-                "dttot_alias_name_3": row_data.get("Alias_name_3"),
-                "dttot_alias_first_name_3": row_data.get("first_name_alias_3"),
-                "dttot_alias_middle_name_3": row_data.get("middle_name_alias_3"),
-                "dttot_alias_last_name_3": row_data.get("last_name_alias_3"),
-                "dttot_alias_name_4": row_data.get("Alias_name_4"),
-                "dttot_alias_first_name_4": row_data.get("first_name_alias_4"),
-                "dttot_alias_middle_name_4": row_data.get("middle_name_alias_4"),
-                "dttot_alias_last_name_4": row_data.get("last_name_alias_4"),
-                "dttot_alias_name_5": row_data.get("Alias_name_5"),
-                "dttot_alias_first_name_5": row_data.get("first_name_alias_5"),
-                "dttot_alias_middle_name_5": row_data.get("middle_name_alias_5"),
-                "dttot_alias_last_name_5": row_data.get("last_name_alias_5"),
-                "dttot_alias_name_6": row_data.get("Alias_name_6"),
-                "dttot_alias_first_name_6": row_data.get("first_name_alias_6"),
-                "dttot_alias_middle_name_6": row_data.get("middle_name_alias_6"),
-                "dttot_alias_last_name_6": row_data.get("last_name_alias_6"),
-                "dttot_alias_name_7": row_data.get("Alias_name_7"),
-                "dttot_alias_first_name_7": row_data.get("first_name_alias_7"),
-                "dttot_alias_middle_name_7": row_data.get("middle_name_alias_7"),
-                "dttot_alias_last_name_7": row_data.get("last_name_alias_7"),
-                "dttot_alias_name_8": row_data.get("Alias_name_8"),
-                "dttot_alias_first_name_8": row_data.get("first_name_alias_8"),
-                "dttot_alias_middle_name_8": row_data.get("middle_name_alias_8"),
-                "dttot_alias_last_name_8": row_data.get("last_name_alias_8"),
-                "dttot_alias_name_9": row_data.get("Alias_name_9"),
-                "dttot_alias_first_name_9": row_data.get("first_name_alias_9"),
-                "dttot_alias_middle_name_9": row_data.get("middle_name_alias_9"),
-                "dttot_alias_last_name_9": row_data.get("last_name_alias_9"),
-                "dttot_alias_name_10": row_data.get("Alias_name_10"),
-                "dttot_alias_first_name_10": row_data.get("first_name_alias_10"),
-                "dttot_alias_middle_name_10": row_data.get("middle_name_alias_10"),
-                "dttot_alias_last_name_10": row_data.get("last_name_alias_10"),
-                "dttot_alias_name_11": row_data.get("Alias_name_11"),
-                "dttot_alias_first_name_11": row_data.get("first_name_alias_11"),
-                "dttot_alias_middle_name_11": row_data.get("middle_name_alias_11"),
-                "dttot_alias_last_name_11": row_data.get("last_name_alias_11"),
-                "dttot_alias_name_12": row_data.get("Alias_name_12"),
-                "dttot_alias_first_name_12": row_data.get("first_name_alias_12"),
-                "dttot_alias_middle_name_12": row_data.get("middle_name_alias_12"),
-                "dttot_alias_last_name_12": row_data.get("last_name_alias_12"),
-                "dttot_alias_name_13": row_data.get("Alias_name_13"),
-                "dttot_alias_first_name_13": row_data.get("first_name_alias_13"),
-                "dttot_alias_middle_name_13": row_data.get("middle_name_alias_13"),
-                "dttot_alias_last_name_13": row_data.get("last_name_alias_13"),
-                "dttot_alias_name_14": row_data.get("Alias_name_14"),
-                "dttot_alias_first_name_14": row_data.get("first_name_alias_14"),
-                "dttot_alias_middle_name_14": row_data.get("middle_name_alias_14"),
-                "dttot_alias_last_name_14": row_data.get("last_name_alias_14"),
-                "dttot_alias_name_15": row_data.get("Alias_name_15"),
-                "dttot_alias_first_name_15": row_data.get("first_name_alias_15"),
-                "dttot_alias_middle_name_15": row_data.get("middle_name_alias_15"),
-                "dttot_alias_last_name_15": row_data.get("last_name_alias_15"),
-                "dttot_alias_name_16": row_data.get("Alias_name_16"),
-                "dttot_alias_first_name_16": row_data.get("first_name_alias_16"),
-                "dttot_alias_middle_name_16": row_data.get("middle_name_alias_16"),
-                "dttot_alias_last_name_16": row_data.get("last_name_alias_16"),
-                "dttot_alias_name_17": row_data.get("Alias_name_17"),
-                "dttot_alias_first_name_17": row_data.get("first_name_alias_17"),
-                "dttot_alias_middle_name_17": row_data.get("middle_name_alias_17"),
-                "dttot_alias_last_name_17": row_data.get("last_name_alias_17"),
-                "dttot_alias_name_18": row_data.get("Alias_name_18"),
-                "dttot_alias_first_name_18": row_data.get("first_name_alias_18"),
-                "dttot_alias_middle_name_18": row_data.get("middle_name_alias_18"),
-                "dttot_alias_last_name_18": row_data.get("last_name_alias_18"),
-                "dttot_alias_name_19": row_data.get("Alias_name_19"),
-                "dttot_alias_first_name_19": row_data.get("first_name_alias_19"),
-                "dttot_alias_middle_name_19": row_data.get("middle_name_alias_19"),
-                "dttot_alias_last_name_19": row_data.get("last_name_alias_19"),
-                "dttot_alias_name_20": row_data.get("Alias_name_20"),
-                "dttot_alias_first_name_20": row_data.get("first_name_alias_20"),
-                "dttot_alias_middle_name_20": row_data.get("middle_name_alias_20"),
-                "dttot_alias_last_name_20": row_data.get("last_name_alias_20"),
-                "dttot_alias_name_21": row_data.get("Alias_name_21"),
-                "dttot_alias_first_name_21": row_data.get("first_name_alias_21"),
-                "dttot_alias_middle_name_21": row_data.get("middle_name_alias_21"),
-                "dttot_alias_last_name_21": row_data.get("last_name_alias_21"),
-                "dttot_alias_name_22": row_data.get("Alias_name_22"),
-                "dttot_alias_first_name_22": row_data.get("first_name_alias_22"),
-                "dttot_alias_middle_name_22": row_data.get("middle_name_alias_22"),
-                "dttot_alias_last_name_22": row_data.get("last_name_alias_22"),
-                "dttot_alias_name_23": row_data.get("Alias_name_23"),
-                "dttot_alias_first_name_23": row_data.get("first_name_alias_23"),
-                "dttot_alias_middle_name_23": row_data.get("middle_name_alias_23"),
-                "dttot_alias_last_name_23": row_data.get("last_name_alias_23"),
-                "dttot_alias_name_24": row_data.get("Alias_name_24"),
-                "dttot_alias_first_name_24": row_data.get("first_name_alias_24"),
-                "dttot_alias_middle_name_24": row_data.get("middle_name_alias_24"),
-                "dttot_alias_last_name_24": row_data.get("last_name_alias_24"),
-                "dttot_alias_name_25": row_data.get("Alias_name_25"),
-                "dttot_alias_first_name_25": row_data.get("first_name_alias_25"),
-                "dttot_alias_middle_name_25": row_data.get("middle_name_alias_25"),
-                "dttot_alias_last_name_25": row_data.get("last_name_alias_25"),
-                "dttot_alias_name_26": row_data.get("Alias_name_26"),
-                "dttot_alias_first_name_26": row_data.get("first_name_alias_26"),
-                "dttot_alias_middle_name_26": row_data.get("middle_name_alias_26"),
-                "dttot_alias_last_name_26": row_data.get("last_name_alias_26"),
-                "dttot_alias_name_27": row_data.get("Alias_name_27"),
-                "dttot_alias_first_name_27": row_data.get("first_name_alias_27"),
-                "dttot_alias_middle_name_27": row_data.get("middle_name_alias_27"),
-                "dttot_alias_last_name_27": row_data.get("last_name_alias_27"),
-                "dttot_alias_name_28": row_data.get("Alias_name_28"),
-                "dttot_alias_first_name_28": row_data.get("first_name_alias_28"),
-                "dttot_alias_middle_name_28": row_data.get("middle_name_alias_28"),
-                "dttot_alias_last_name_28": row_data.get("last_name_alias_28"),
-                "dttot_type": row_data.get("Terduga"),
-                "dttot_kode_densus": kode_densus,
-                "dttot_birth_place": row_data.get("Tpt Lahir"),
-                "dttot_birth_date_1": row_data.get("birth_date_1"),
-                "dttot_birth_date_2": row_data.get("birth_date_2"),
-                "dttot_birth_date_3": row_data.get("birth_date_3"),
-                "dttot_nationality_1": row_data.get("WN_1"),
-                "dttot_nationality_2": row_data.get("WN_2"),
-                "dttot_domicile_address": row_data.get("Alamat"),
-                "dttot_description_1": row_data.get("description_1"),
-                "dttot_description_2": row_data.get("description_2"),
-                "dttot_description_3": row_data.get("description_3"),
-                "dttot_description_4": row_data.get("description_4"),
-                "dttot_description_5": row_data.get("description_5"),
-                "dttot_description_6": row_data.get("description_6"),
-                "dttot_description_7": row_data.get("description_7"),
-                "dttot_description_8": row_data.get("description_8"),
-                "dttot_description_9": row_data.get("description_9"),
-                "dttot_nik_ktp": row_data.get("idNumber"),
-                "dttot_passport_number": row_data.get("passport_number"),
+                **fields,
+                "dttot_content_hash": content_hash,
+                "dttot_change_status": DTTOT_CHANGE_ADDED,
             })
             serializer = DttotDocSerializer(data=row_data)
 
         if serializer.is_valid():
             instance = serializer.save()
+            kode_densus_index.add(instance.dttot_kode_densus)
             logger.info(
                 "Successfully saved row data for document ID %s, dttot ID %s",
                 document.document_id, instance.dttot_id,
@@ -217,3 +1064,157 @@ def handle_dttot_document(document: Any, row_data: dict[str, Any], user_data: st
         error_msg = f"Error processing row data for document ID {document.document_id}: {e}"
         logger.exception(error_msg)
         raise ValidationError(error_msg) from e
+
+
+def find_reusable_dttot_document(document: Document) -> Document | None:
+    """Return the earlier upload of the same file whose results ``document`` can reuse.
+
+    Only the latest DTTOT upload before ``document`` is considered, since every
+    upload moves the DttotDoc rows it contains onto itself. It is reusable when
+    its contents hash to the same value and its scoring has finished.
+
+    Args:
+    ----
+        document (Document): The newly uploaded document.
+
+    Returns:
+    -------
+        Document | None: The earlier document, or None when it must be processed.
+
+    """
+    if not document.content_hash:
+        return None
+
+    previous = _previous_dttot_document(document)
+    if previous is None or previous.content_hash != document.content_hash:
+        return None
+    if not DttotDocReport.objects.filter(
+        document=previous,
+        status_doc__in=DTTOT_FINISHED_REPORT_STATUSES,
+    ).exists():
+        return None
+    return previous
+
+
+def _copy_report_rows(
+    model: type[Any],
+    source_report: DttotDocReport,
+    target_report: DttotDocReport,
+    batch_size: int,
+    **filters: Any,
+) -> int:
+    """Copy the scored rows of one report model, matching ``filters``, from ``source_report`` to ``target_report``.
+
+    The copies keep the creation date of their rows, so a pair stays within the
+    dedup window of ``ReportRowWriter`` only as long as it was first reported.
+    """
+    fields = [
+        field.attname
+        for field in model._meta.concrete_fields  # noqa: SLF001
+        if not field.primary_key
+        and field.name != "dttotdoc_report"
+        and not getattr(field, "auto_now", False)
+    ]
+    values = list(model.objects.filter(dttotdoc_report=source_report, **filters).values(*fields))
+    rows = [model(dttotdoc_report=target_report, **row_values) for row_values in values]
+    model.objects.bulk_create(rows, batch_size=batch_size)
+
+    # bulk_create stamps the auto_now_add fields with the current time, put the originals back
+    created_fields = [
+        field.attname
+        for field in model._meta.concrete_fields  # noqa: SLF001
+        if getattr(field, "auto_now_add", False)
+    ]
+    if rows and created_fields:
+        for row, row_values in zip(rows, values, strict=True):
+            for name in created_fields:
+                setattr(row, name, row_values[name])
+        model.objects.bulk_update(rows, created_fields, batch_size=batch_size)
+    return len(rows)
+
+
+def reuse_dttot_document_results(
+    previous_document: Document,
+    document: Document,
+    user_data: str,
+) -> dict[str, Any]:
+    """Carry the parsed rows of an identical earlier upload over to ``document``.
+
+    The DttotDoc rows of ``previous_document`` are moved to ``document`` in one
+    update, as parsing the same file again would do, and marked unchanged. Scoring
+    then only scores them against the DSB users created or changed since the report
+    of ``previous_document`` and ``carry_over_report_rows`` copies its other rows.
+
+    Args:
+    ----
+        previous_document (Document): The earlier upload with the same contents.
+        document (Document): The newly uploaded document.
+        user_data (str): The ID of the user performing the import.
+
+    Returns:
+    -------
+        dict[str, Any]: A summary with the moved DttotDoc rows.
+
+    """
+    rows = DttotDoc.objects.filter(document=previous_document).update(
+        document=document,
+        last_update_by_id=user_data,
+        updated_at=timezone.now(),
+        dttot_change_status=DTTOT_CHANGE_UNCHANGED,
+    )
+    return {
+        "document_id": document.pk,
+        "reused_document_id": previous_document.pk,
+        "rows": rows,
+    }
+
+
+def carry_over_report_rows(dttotdoc_report: DttotDocReport) -> dict[str, int]:
+    """Copy the rows of the previous report for the pairs that were not scored again.
+
+    A pair of an unchanged entry and a DSB user that was neither created nor changed
+    since the previous report keeps its earlier row, see ``dttot_scoring_batches``.
+    Such rows already in ``dttotdoc_report`` are replaced, so a retried run copies
+    them once.
+
+    Args:
+    ----
+        dttotdoc_report (DttotDocReport): The report of the scored document.
+
+    Returns:
+    -------
+        dict[str, int]: The rows copied per report type, empty without a previous report.
+
+    """
+    previous_report = previous_dttot_report(dttotdoc_report.document_id)
+    if previous_report is None:
+        return {}
+
+    unchanged_kode_densus = DttotDoc.objects.filter(
+        document=dttotdoc_report.document_id,
+        dttot_change_status=DTTOT_CHANGE_UNCHANGED,
+    ).values("dttot_kode_densus")
+    copied: dict[str, int] = {}
+    with transaction.atomic():
+        for report_type, model in DTTOT_REPORT_ROW_MODELS.items():
+            unchanged_users = DTTOT_DSB_USER_MODELS[report_type].objects.filter(
+                document=dttotdoc_report.document_id,
+                updated_date__lt=previous_report.created_date,
+            ).values("pk")
+            filters = {
+                f"kode_densus_{report_type}__in": unchanged_kode_densus,
+                f"dsb_user_{report_type}__in": unchanged_users,
+            }
+            model.objects.filter(dttotdoc_report=dttotdoc_report, **filters).delete()
+            copied[report_type] = _copy_report_rows(
+                model,
+                previous_report,
+                dttotdoc_report,
+                settings.DTTOT_REPORT_WRITE_BATCH_SIZE,
+                **filters,
+            )
+    logger.info(
+        "Carried over report rows %s from DTTOT Doc Report %s to %s",
+        copied, previous_report.pk, dttotdoc_report.pk,
+    )
+    return copied
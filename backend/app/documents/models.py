@@ -11,6 +11,8 @@ from django.db import models  #type: ignore  # noqa: PGH003
 from django.utils.timezone import now  #type: ignore  # noqa: PGH003
 from django.utils.translation import gettext_lazy as _  #type: ignore  # noqa: PGH003
 
+CONTENT_HASH_CHUNK_SIZE = 64 * 2**10
+
 
 def encrypt_filename(filename: str) -> str:
     """Use SHA-256 to hash the filename and preserve the original file extension.
@@ -31,12 +33,39 @@ def encrypt_filename(filename: str) -> str:
     return encrypted_filename + file_extension
 
 
+def compute_content_hash(
+    file: Any, chunk_size: int = CONTENT_HASH_CHUNK_SIZE,
+) -> str:
+    """Use SHA-256 to hash the contents of a file, reading it in chunks.
+
+    Unlike ``encrypt_filename``, the hash identifies what was uploaded, so the same
+    spreadsheet uploaded twice gets the same hash whatever it was called.
+
+    Args:
+    ----
+        file (File): The uploaded or stored file to hash.
+        chunk_size (int): The number of bytes read at a time.
+
+    Returns:
+    -------
+        str: The hexadecimal SHA-256 digest of the file contents.
+
+    """
+    sha256_hash = hashlib.sha256()
+    for chunk in file.chunks(chunk_size):
+        sha256_hash.update(chunk)
+    # Leave the file readable from the start for the caller
+    file.seek(0)
+    return sha256_hash.hexdigest()
+
+
 def save_file_to_instance(
     instance: Any, uploaded_file: Any,
 ) -> None:
     """Save an uploaded file to a Document instance.
 
-    The file is saved to the instance's document_file field.
+    The file is saved to the instance's document_file field, and the
+    SHA-256 of its contents to the instance's content_hash field.
 
     Args:
     ----
@@ -52,6 +81,7 @@ def save_file_to_instance(
         filename = uploaded_file.name
         encrypted_filename = encrypt_filename(filename)
         file_path = document_directory_path(instance, encrypted_filename)
+        instance.content_hash = compute_content_hash(uploaded_file)
         file_content = uploaded_file.read()
 
         content_file = ContentFile(file_content, name=os.path.basename(file_path))  # noqa: PTH119
@@ -108,6 +138,12 @@ class Document(models.Model):
         verbose_name=_("Document ID"),
     )
     document_file_type = models.CharField(max_length=50, blank=True)
+    content_hash = models.CharField(
+        max_length=64,
+        blank=True,
+        db_index=True,
+        verbose_name=_("Content SHA-256"),
+    )
     document_type = models.CharField(max_length=50)
     last_update_date = models.DateTimeField(auto_now=True)
     created_by = models.ForeignKey(
@@ -233,3 +269,21 @@ class Document(models.Model):
         return self.document_type in [
             "DTTOT Report",
         ]
+
+
+class PairScoreGeneration(models.Model):
+    model = models.CharField(
+        _("Scoring Model Key"),
+        primary_key=True,
+        max_length=255,
+    )
+    generation = models.PositiveIntegerField(_("Pair Score Generation"), default=0)
+    updated_date = models.DateTimeField(_("Entry Update Date"), auto_now=True)
+
+    class Meta:
+        db_table = "pair_score_generation"
+        verbose_name = _("Pair Score Generation")
+        verbose_name_plural = _("Pair Score Generations")
+
+    def __str__(self) -> str:
+        return f"{self.model} - {self.generation}"
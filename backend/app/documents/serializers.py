@@ -47,6 +47,7 @@ class DocumentSerializer(serializers.ModelSerializer):
         read_only_fields: ClassVar = [
             "created_date",
             "document_id",
+            "content_hash",
             "last_update_date",
             "last_update_by",
             "created_by",
@@ -0,0 +1,284 @@
+from __future__ import annotations
+
+import random
+import re
+import unicodedata
+from collections import Counter, defaultdict
+from typing import TYPE_CHECKING
+
+from app.documents.utils.identifiers import (  #type: ignore # noqa: PGH003
+    IdentifierIndex,
+    normalize_identifier,
+)
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable, Sequence
+
+NGRAM_SIZE = 3
+BIRTH_YEAR_PATTERN = re.compile(r"(?<!\d)(1[89]\d{2}|20\d{2})(?!\d)")
+
+# Old (Van Ophuijsen) and Arabic-transliteration spellings folded onto one form,
+# applied in order: Soeharto/Suharto, Djoko/Joko/Yoko, Tjahjo/Cahyo, Achmad/Ahmad, ...
+PHONETIC_REPLACEMENTS: tuple[tuple[str, str], ...] = (
+    ("oe", "u"),
+    ("dj", "j"),
+    ("tj", "c"),
+    ("sj", "sy"),
+    ("ch", "h"),
+    ("kh", "h"),
+    ("ph", "f"),
+    ("q", "k"),
+    ("x", "ks"),
+    ("v", "f"),
+    ("z", "s"),
+    ("j", "y"),
+)
+PHONETIC_DROPPED = frozenset("aeiouh")
+
+
+def _fold(value: str) -> str:
+    """To lowercase a string and strip its accents."""
+    decomposed = unicodedata.normalize("NFKD", value.casefold())
+    return "".join(char for char in decomposed if not unicodedata.combining(char))
+
+
+def phonetic_key(token: str) -> str:
+    """To build the phonetic key of one name token.
+
+    Spelling variants are folded, then the first letter is kept followed by the
+    remaining consonants, without vowels or ``h`` and with repeats collapsed:
+    ``Muhammad``, ``Mohamad`` and ``Muhamad`` all become ``md``.
+    """
+    letters = "".join(char for char in _fold(token) if char.isalpha())
+    for old, new in PHONETIC_REPLACEMENTS:
+        letters = letters.replace(old, new)
+    if len(letters) < 2:  # noqa: PLR2004
+        return ""
+
+    key = [letters[0]]
+    for char in letters[1:]:
+        if char not in PHONETIC_DROPPED and char != key[-1]:
+            key.append(char)
+    return "".join(key)
+
+
+def name_ngrams(name: str, size: int = NGRAM_SIZE) -> frozenset[str]:
+    """To split a name into its character n-grams, padded so word edges count."""
+    words = "".join(char if char.isalpha() else " " for char in _fold(name)).split()
+    padded = f" {' '.join(words)} "
+    if not words:
+        return frozenset()
+    return frozenset(padded[i:i + size] for i in range(len(padded) - size + 1))
+
+
+def birth_years(values: Iterable[object]) -> frozenset[int]:
+    """To pick the four-digit birth years out of dates in any format."""
+    years: set[int] = set()
+    for value in values:
+        if value:
+            years.update(int(year) for year in BIRTH_YEAR_PATTERN.findall(str(value)))
+    return frozenset(years)
+
+
+class BlockingKeys:
+    """To hold the blocking keys of one entity or DTTOT entry.
+
+    Attributes
+    ----------
+        identifiers (frozenset[str]): Normalized NIK, passport and other identifier numbers.
+        phonetic (frozenset[str]): Phonetic keys of every name token.
+        ngrams (list[frozenset[str]]): Character n-grams of every name, one set per name.
+        years (frozenset[int]): Birth years.
+
+    """
+
+    def __init__(
+            self,
+            names: Iterable[str | None] = (),
+            identifiers: Iterable[str | None] = (),
+            birth_dates: Iterable[object] = (),
+        ) -> None:
+        """To normalize the raw values of an entity into blocking keys."""
+        names = list(dict.fromkeys(name for name in names if name))
+        self.identifiers = frozenset(filter(None, map(normalize_identifier, identifiers)))
+        self.phonetic = frozenset(
+            filter(None, (phonetic_key(token) for name in names for token in name.split())),
+        )
+        self.ngrams = [grams for grams in map(name_ngrams, names) if grams]
+        self.years = birth_years(birth_dates)
+
+
+class CandidateBlocker:
+    """To find the entities worth scoring against a DTTOT entry without scoring them all.
+
+    An entity is a candidate when an identifier matches the entry's, exactly or one
+    edit away, or when a name matches (a shared phonetic key, or enough shared
+    character n-grams between two names) and their birth years, when both are known,
+    lie within the window.
+
+    Attributes
+    ----------
+        records (Sequence[BlockingKeys]): The blocking keys of every indexed entity.
+        min_ngram_overlap (float): Share of the shorter name's n-grams both names must have.
+        birth_year_window (int): Largest birth year difference of a name match.
+
+    """
+
+    def __init__(
+            self,
+            records: Sequence[BlockingKeys],
+            min_ngram_overlap: float = 0.4,
+            birth_year_window: int = 2,
+        ) -> None:
+        """To build the inverted indexes of the entities' blocking keys."""
+        self.records = records
+        self.min_ngram_overlap = min_ngram_overlap
+        self.birth_year_window = birth_year_window
+        self._by_identifier = IdentifierIndex([record.identifiers for record in records])
+        self._by_phonetic: dict[str, list[int]] = defaultdict(list)
+        self._by_ngram: dict[str, list[tuple[int, int]]] = defaultdict(list)
+        for position, record in enumerate(records):
+            for key in record.phonetic:
+                self._by_phonetic[key].append(position)
+            for name_position, grams in enumerate(record.ngrams):
+                for gram in grams:
+                    self._by_ngram[gram].append((position, name_position))
+
+    def _years_match(
+            self,
+            years: frozenset[int],
+            other: frozenset[int],
+        ) -> bool:
+        if not years or not other:
+            return True
+        return any(abs(year - other_year) <= self.birth_year_window for year in years for other_year in other)
+
+    def candidates(
+            self,
+            keys: BlockingKeys,
+        ) -> list[int]:
+        """To find the positions of the indexed entities that may match the given keys.
+
+        Args:
+        ----
+            keys (BlockingKeys): The blocking keys of a DTTOT entry.
+
+        Returns:
+        -------
+            list[int]: The sorted positions of the candidate entities.
+
+        """
+        found: set[int] = set()
+        for identifier in keys.identifiers:
+            found.update(self._by_identifier.match(identifier))
+
+        by_name: set[int] = set()
+        for key in keys.phonetic:
+            by_name.update(self._by_phonetic.get(key, ()))
+        for grams in keys.ngrams:
+            shared = Counter(
+                match for gram in grams for match in self._by_ngram.get(gram, ())
+            )
+            for (position, name_position), count in shared.items():
+                smaller = min(len(grams), len(self.records[position].ngrams[name_position]))
+                if count >= self.min_ngram_overlap * smaller:
+                    by_name.add(position)
+
+        found.update(
+            position for position in by_name - found
+            if self._years_match(keys.years, self.records[position].years)
+        )
+        return sorted(found)
+
+
+def sample_pruned_pairs(
+        candidates: Sequence[Sequence[int]],
+        entity_count: int,
+        sample_size: int,
+        seed: int | None = None,
+    ) -> list[tuple[int, int]]:
+    """To draw a uniform sample of the pairs blocking pruned.
+
+    Args:
+    ----
+        candidates (Sequence[Sequence[int]]): The candidate entities of every DTTOT entry.
+        entity_count (int): The number of entities blocked against.
+        sample_size (int): The most pairs to draw.
+        seed (int | None): Seed of the sampling, for repeatable runs.
+
+    Returns:
+    -------
+        list[tuple[int, int]]: ``(entity, dttot)`` position pairs that were not candidates.
+
+    """
+    kept = [set(positions) for positions in candidates]
+    pruned = len(kept) * entity_count - sum(map(len, kept))
+    if sample_size <= 0 or pruned <= 0:
+        return []
+    if pruned <= sample_size:
+        return [
+            (entity, dttot)
+            for dttot, positions in enumerate(kept)
+            for entity in range(entity_count)
+            if entity not in positions
+        ]
+
+    generator = random.Random(seed)  # noqa: S311
+    sampled: set[tuple[int, int]] = set()
+    while len(sampled) < sample_size:
+        dttot = generator.randrange(len(kept))
+        entity = generator.randrange(entity_count)
+        if entity not in kept[dttot]:
+            sampled.add((entity, dttot))
+    return sorted(sampled)
+
+
+def blocking_summary(
+        total_pairs: int,
+        candidate_pairs: int,
+        candidate_matches: int,
+        sampled_pairs: int,
+        sampled_matches: int,
+    ) -> dict[str, float | int]:
+    """To estimate how much blocking pruned and how many matches it kept.
+
+    Recall is estimated by scoring a sample of the pruned pairs: the matches found in
+    the sample, scaled to every pruned pair, are the matches blocking probably missed.
+
+    Args:
+    ----
+        total_pairs (int): Every entity x DTTOT pair.
+        candidate_pairs (int): The pairs that were scored.
+        candidate_matches (int): The scored pairs at or above the match score.
+        sampled_pairs (int): The pruned pairs scored to estimate recall.
+        sampled_matches (int): The sampled pairs at or above the match score.
+
+    Returns:
+    -------
+        dict[str, float | int]: The pair counts, ``pruning_ratio`` and estimated ``recall``.
+
+    """
+    pruned_pairs = total_pairs - candidate_pairs
+    missed = sampled_matches / sampled_pairs * pruned_pairs if sampled_pairs else 0.0
+    found = candidate_matches + missed
+    return {
+        "total_pairs": total_pairs,
+        "candidate_pairs": candidate_pairs,
+        "pruned_pairs": pruned_pairs,
+        "pruning_ratio": pruned_pairs / total_pairs if total_pairs else 0.0,
+        "candidate_matches": candidate_matches,
+        "sampled_pairs": sampled_pairs,
+        "sampled_matches": sampled_matches,
+        "recall": candidate_matches / found if found else 1.0,
+    }
+
+
+def combine_blocking_summaries(summaries: Iterable[dict[str, float | int]]) -> dict[str, float | int]:
+    """To add up the blocking summaries of the shards of one scoring run."""
+    summaries = list(summaries)
+    return blocking_summary(
+        **{
+            key: sum(summary[key] for summary in summaries)
+            for key in ("total_pairs", "candidate_pairs", "candidate_matches", "sampled_pairs", "sampled_matches")
+        },
+    )
@@ -1,10 +1,19 @@
 from __future__ import annotations
 
 import re
-from typing import Any, Literal
+from bisect import bisect_right
+from itertools import accumulate
+from typing import TYPE_CHECKING, Any, Literal
 from zipfile import BadZipFile
 
+import numpy as np  #type: ignore # noqa: PGH003
 import pandas as pd  #type: ignore # noqa: PGH003
+from openpyxl import load_workbook  #type: ignore # noqa: PGH003
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Iterator
+
+FULL_NAME_SPLIT_PATTERN = re.compile(r"(?i)\s*alias\s*")
 
 
 class DTTOTDocumentProcessing:
@@ -42,6 +51,109 @@ class DTTOTDocumentProcessing:
             msg = "File is not a zip file"
             raise ValueError(msg) from e
 
+    def import_document_chunks(
+            self,
+            file_path: str,
+            document_format: str,
+            chunk_size: int,
+        ) -> Iterator[pd.DataFrame]:
+        """To import a document in fixed-size DataFrame chunks.
+
+        CSV files are read with ``pd.read_csv(chunksize=...)`` and XLSX files are
+        iterated row by row through a read-only openpyxl workbook, so only one
+        chunk is held in memory at a time. XLS files cannot be streamed by xlrd
+        and are read whole before being sliced into chunks.
+
+        Args:
+        ----
+            file_path (str): The path to the document file.
+            document_format (str): The format of the document ('CSV', 'XLS', or 'XLSX').
+            chunk_size (int): The number of rows in each chunk.
+
+        Returns:
+        -------
+            Iterator[pd.DataFrame]: The document rows as consecutive DataFrame chunks.
+
+        Raises:
+        ------
+            ValueError: If the document format is unsupported or the file is not a zip file.
+
+        """
+        try:
+            if document_format == "CSV":
+                yield from pd.read_csv(file_path, chunksize=chunk_size)
+            elif document_format == "XLS":
+                data_frame = pd.read_excel(file_path, engine="xlrd")
+                for start in range(0, len(data_frame), chunk_size):
+                    yield data_frame.iloc[start:start + chunk_size].copy()
+            elif document_format == "XLSX":
+                yield from self._iter_xlsx_chunks(file_path, chunk_size)
+            else:
+                msg = f"Unsupported document format: {document_format}"
+                raise ValueError(msg)
+        except BadZipFile as e:
+            # Raise an exception if the file is not a zip file
+            msg = "File is not a zip file"
+            raise ValueError(msg) from e
+
+    def _iter_xlsx_chunks(
+            self,
+            file_path: str,
+            chunk_size: int,
+        ) -> Iterator[pd.DataFrame]:
+        """To iterate the first worksheet of an XLSX file in DataFrame chunks.
+
+        Cells are converted the way ``pd.read_excel`` does it: empty cells become
+        NaN, integral floats become ints and fully empty rows are skipped.
+
+        Args:
+        ----
+            file_path (str): The path to the XLSX file.
+            chunk_size (int): The number of rows in each chunk.
+
+        Returns:
+        -------
+            Iterator[pd.DataFrame]: The worksheet rows as consecutive DataFrame chunks.
+
+        """
+        def convert_cell(value: Any) -> Any:
+            if value is None:
+                return np.nan
+            if isinstance(value, float) and value.is_integer():
+                return int(value)
+            return value
+
+        workbook = load_workbook(file_path, read_only=True, data_only=True)
+        try:
+            rows = workbook.worksheets[0].iter_rows(values_only=True)
+            header = next(rows, None)
+            if header is None:
+                return
+            columns = [
+                f"Unnamed: {i}" if column is None else column
+                for i, column in enumerate(header)
+            ]
+            start = 0
+            chunk: list[list[Any]] = []
+            for row in rows:
+                if all(value is None for value in row):
+                    continue
+                values = [convert_cell(value) for value in row[:len(columns)]]
+                values.extend([np.nan] * (len(columns) - len(values)))
+                chunk.append(values)
+                if len(chunk) == chunk_size:
+                    yield pd.DataFrame(
+                        chunk, columns=columns, index=range(start, start + len(chunk)),
+                    )
+                    start += len(chunk)
+                    chunk = []
+            if chunk:
+                yield pd.DataFrame(
+                    chunk, columns=columns, index=range(start, start + len(chunk)),
+                )
+        finally:
+            workbook.close()
+
     def retrieve_data_as_dataframe(
             self,
             file_path: str,
@@ -61,6 +173,45 @@ class DTTOTDocumentProcessing:
         """
         return self.import_document(file_path, document_format)
 
+    @staticmethod
+    def _split_name_columns(
+            names: list[Any],
+            split_name: Callable[[str], tuple[str, str, str]],
+            split_aliases: Callable[[str], list[str]],
+        ) -> dict[str, Any]:
+        """To split every name and its aliases into the name component columns."""
+        full_names = [
+            FULL_NAME_SPLIT_PATTERN.split(name, 1)[0] if isinstance(name, str) else ""
+            for name in names
+        ]
+        aliases = [split_aliases(name) for name in names]
+
+        # Find the maximum number of aliases in any row to determine the number of fields
+        max_aliases = max(map(len, aliases), default=0)
+
+        # Fill alias components position by position, leaving missing aliases as ""
+        alias_values = np.full((len(names), max_aliases * 4), "", dtype=object)
+        for row, row_aliases in enumerate(aliases):
+            for i, alias in enumerate(row_aliases):
+                alias_values[row, i * 4:i * 4 + 4] = (alias, *split_name(alias))
+
+        first_names, middle_names, last_names = (
+            zip(*map(split_name, full_names), strict=True) if names else ((), (), ())
+        )
+        columns: dict[str, Any] = {
+            "full_name": full_names,
+            "first_name": list(first_names),
+            "middle_name": list(middle_names),
+            "last_name": list(last_names),
+            "aliases": aliases,
+        }
+        for i in range(max_aliases):
+            columns[f"Alias_name_{i+1}"] = alias_values[:, i * 4]
+            columns[f"first_name_alias_{i+1}"] = alias_values[:, i * 4 + 1]
+            columns[f"middle_name_alias_{i+1}"] = alias_values[:, i * 4 + 2]
+            columns[f"last_name_alias_{i+1}"] = alias_values[:, i * 4 + 3]
+        return columns
+
     def extract_and_split_names(
             self,
             df: pd.DataFrame,
@@ -124,6 +275,8 @@ class DTTOTDocumentProcessing:
 
             """
             # Check if the name is a string
+            if not isinstance(name, str):
+                return []
             if case_insensitive:
                 name = name.lower()
                 return name.split(" alias ")[1:] if " alias " in name else []
@@ -135,38 +288,18 @@ class DTTOTDocumentProcessing:
                     aliases = parts[1:] if len(parts) > 1 else []
                 return aliases
 
-        # Initialize the full name column
-        df["full_name"] = df[name_column].apply(
-           lambda x: re.split(r"(?i)\s*alias\s*", x, 1)[0] if isinstance(x, str) else "",  # noqa: B034
-        )
+        # Split every name and its aliases in a single pass over the column
+        columns = self._split_name_columns(df[name_column].tolist(), split_name, split_aliases)
 
-        # Extract first, middle, and last names from the full_name
-        df[["first_name", "middle_name", "last_name"]] = (
-            df["full_name"].apply(split_name).tolist()
+        # Attach all new columns at once instead of inserting them one by one
+        return pd.concat(
+            [
+                df.drop(columns=[column for column in columns if column in df.columns]),
+                pd.DataFrame(columns, index=df.index, dtype=object),
+            ],
+            axis=1,
         )
 
-        # Extract all aliases from the name column
-        df["aliases"] = df[name_column].apply(split_aliases)
-
-        # Find the maximum number of aliases in any row to determine the number of fields
-        max_aliases = df["aliases"].str.len().max()
-
-        # Process each alias and split into name components
-        for i in range(max_aliases):
-            alias_col = f"Alias_name_{i+1}"
-            df[alias_col] = df["aliases"].apply(
-                lambda aliases: aliases[i] if len(aliases) > i else "",  # noqa: B023
-            )
-            df[
-                [
-                    f"first_name_alias_{i+1}",
-                    f"middle_name_alias_{i+1}",
-                    f"last_name_alias_{i+1}",
-                ]
-            ] = df[alias_col].apply(split_name).tolist()
-
-        return df
-
 
 class ExtractNIKandPassportNumber:
     """To accurately identify and extract numerical and alphanumeric sequences.
@@ -181,6 +314,9 @@ class ExtractNIKandPassportNumber:
                                        passport numbers, which may include up to two
                                        letters followed by six or more digits, with an
                                        optional space between letters and digits.
+        identifier_regex (re.Pattern): Matches both NIK and passport numbers so a
+                                       single scan of a description column finds and
+                                       strips every one of them.
 
     """
 
@@ -198,6 +334,10 @@ class ExtractNIKandPassportNumber:
         self.passport_regex = re.compile(
             r"(\b[A-Z]{0,2}\s*\d{6,}\b)",
         )  # Pattern for passport numbers with a capture group
+        self.identifier_regex = re.compile(
+            r"\b(?P<prefix>[A-Z]{0,2}\s*)(?P<digits>\d{6,})\b",
+        )  # Both shapes in one pattern, 16 digits after a word boundary are a NIK
+        self.cell_separator = "\x00"  # Neither a word nor a space character
 
     def extract_nik_and_passport_number(
             self,
@@ -212,8 +352,10 @@ class ExtractNIKandPassportNumber:
         Returns:
         -------
             pd.DataFrame: The modified DataFrame with NIK and passport numbers extracted
-                          and description texts cleaned.
-
+                          and description texts cleaned. ``idNumber`` and
+                          ``passport_number`` hold the first match of the last
+                          column that has one, ``id_numbers`` and
+                          ``passport_numbers`` hold every match in column order.
 
         """
         # Ensure all description columns
@@ -222,33 +364,146 @@ class ExtractNIKandPassportNumber:
         if not description_columns:
             return df  # Return early if no description columns are found
 
-        # Initialize columns to hold extracted NIK and passport numbers
-        df["idNumber"] = ""
-        df["passport_number"] = ""
+        id_numbers: list[list[str]] = [[] for _ in range(len(df))]
+        passport_numbers: list[list[str]] = [[] for _ in range(len(df))]
+        last_id_number = [""] * len(df)
+        last_passport_number = [""] * len(df)
 
-        # Apply regex to all description columns at once
+        # Scan each column once, collecting and stripping all matches together
         for column in description_columns:
-            df["idNumber"] = (
-                df[column]
-                .str.extract(self.nik_regex, expand=False)
-                .fillna(df["idNumber"])
-            )
-            df["passport_number"] = (
-                df[column]
-                .str.extract(self.passport_regex, expand=False)
-                .fillna(df["passport_number"])
-            )
-
-            # Clean the description text
-            df[column] = (
-                df[column]
-                .str.replace(self.nik_regex, "", regex=True)
-                .str.replace(self.passport_regex, "", regex=True)
-                .str.strip()
-            )
+            values = df[column].tolist()
+            cleaned, matches = self._scan_descriptions(values)
+            for row, (niks, passports) in matches.items():
+                # A later column overrides the numbers found in earlier ones
+                if niks:
+                    last_id_number[row] = niks[0]
+                    id_numbers[row].extend(niks)
+                if passports:
+                    last_passport_number[row] = passports[0]
+                    passport_numbers[row].extend(passports)
+            df[column] = pd.Series(cleaned, index=df.index, dtype=object)
+
+        df["idNumber"] = last_id_number
+        df["passport_number"] = last_passport_number
+        df["id_numbers"] = id_numbers
+        df["passport_numbers"] = passport_numbers
 
         return df
 
+    def _scan_descriptions(
+            self,
+            values: list[Any],
+        ) -> tuple[list[Any], dict[int, tuple[list[str], list[str]]]]:
+        """To find and remove every NIK and passport number in a single scan of a column.
+
+        The cells are joined with a separator that can neither be part of a match nor
+        create a word boundary, so the regex runs once over the whole column instead
+        of once per cell and per pattern.
+
+        Args:
+        ----
+            values (list[Any]): The cells of a description column.
+
+        Returns:
+        -------
+            tuple: The cleaned cells, and the NIK and passport numbers found in each
+                row that has any, in the order they appear.
+
+        """
+        texts = [value if isinstance(value, str) else "" for value in values]
+        joined = self.cell_separator.join(texts)
+        if joined.count(self.cell_separator) >= len(texts):
+            # A cell contains the separator itself, fall back to scanning cell by cell
+            scanned = [self._scan_description(text) for text in texts]
+            cleaned = [
+                text if isinstance(value, str) else value
+                for value, (text, _, _) in zip(values, scanned, strict=True)
+            ]
+            matches = {
+                row: (niks, passports)
+                for row, (_, niks, passports) in enumerate(scanned)
+                if niks or passports
+            }
+            return cleaned, matches
+
+        starts = list(accumulate((len(text) + 1 for text in texts[:-1]), initial=0))
+        spans: dict[int, list[tuple[int, int]]] = {}
+        matches: dict[int, tuple[list[str], list[str]]] = {}
+        for match in self.identifier_regex.finditer(joined):
+            row = bisect_right(starts, match.start()) - 1
+            if row not in matches:
+                matches[row], spans[row] = ([], []), []
+            start, end = self._classify_match(match, *matches[row])
+            spans[row].append((start - starts[row], end - starts[row]))
+
+        cleaned = [
+            value.strip() if isinstance(value, str) else value
+            for value in values
+        ]
+        for row, row_spans in spans.items():
+            text, position, parts = texts[row], 0, []
+            for start, end in row_spans:
+                parts.append(text[position:start])
+                position = end
+            parts.append(text[position:])
+            cleaned[row] = "".join(parts).strip()
+        return cleaned, matches
+
+    def _classify_match(
+            self,
+            match: re.Match[str],
+            niks: list[str],
+            passports: list[str],
+        ) -> tuple[int, int]:
+        """To record a match as a NIK or passport number and return the span to remove.
+
+        Sixteen digits starting on a word boundary are a NIK, in which case only the
+        digits are removed. Anything else matched is a passport number.
+
+        Args:
+        ----
+            match (re.Match[str]): A match of ``identifier_regex``.
+            niks (list[str]): The NIK numbers found so far.
+            passports (list[str]): The passport numbers found so far.
+
+        Returns:
+        -------
+            tuple[int, int]: The start and end of the text to remove.
+
+        """
+        prefix, digits = match.group("prefix"), match.group("digits")
+        if len(digits) == 16 and (not prefix or prefix[-1].isspace()):  # noqa: PLR2004
+            niks.append(digits)
+            return match.span("digits")
+        passports.append(match.group())
+        return match.span()
+
+    def _scan_description(
+            self,
+            text: str,
+        ) -> tuple[str, list[str], list[str]]:
+        """To find and remove every NIK and passport number in a single scan of the text.
+
+        Args:
+        ----
+            text (str): The input text to be scanned.
+
+        Returns:
+        -------
+            tuple[str, list[str], list[str]]: The cleaned text, the NIK numbers and
+                the passport numbers in the order they appear.
+
+        """
+        niks: list[str] = []
+        passports: list[str] = []
+        position, parts = 0, []
+        for match in self.identifier_regex.finditer(text):
+            start, end = self._classify_match(match, niks, passports)
+            parts.append(text[position:start])
+            position = end
+        parts.append(text[position:])
+        return "".join(parts).strip(), niks, passports
+
     def _detect_description_columns(
             self,
             df: pd.DataFrame,
@@ -281,9 +536,7 @@ class ExtractNIKandPassportNumber:
             str: The cleaned text.
 
         """
-        text = self.nik_regex.sub("", text)
-        text = self.passport_regex.sub("", text)
-        return text.strip()
+        return self._scan_description(text)[0]
 
 
 class CleaningSeparatingDeskripsi:
@@ -292,6 +545,8 @@ class CleaningSeparatingDeskripsi:
     Attributes
     ----------
         split_regex (str): A regular expression pattern used to split the 'Deskripsi' column into multiple 'description_{seqNumber}' columns.
+        max_descriptions (int): The maximum number of 'description_{seqNumber}' columns, matching the DTTOT description fields.
+        overflow_rows (int): The number of rows, over every call, with more items than `max_descriptions`.
 
     Methods
     -------
@@ -299,9 +554,14 @@ class CleaningSeparatingDeskripsi:
 
     """
 
+    max_descriptions = 9
+
     def __init__(self) -> None:
         """To initialize the CleaningSeparatingDeskripsi instance."""
         self.split_regex = r"\n\s*(?:-\s+|\d+\.\s+|\*\s+)?(?=[^;\.,]*[;\.,]?\s*(?:-\s+|\d+\.\s+|\*\s+|$))"
+        # The split only drops a bullet when its lookahead matches, the first item never
+        self.bullet_regex = r"^(?:-\s+|\d+\.\s+|\*\s+)"
+        self.overflow_rows = 0
 
     def separating_cleaning_deskripsi(
             self,
@@ -309,6 +569,10 @@ class CleaningSeparatingDeskripsi:
         ) -> pd.DataFrame:
         """To separate bullet points or numbered items in the 'Deskripsi' column into individual 'description_{seqNumber}' columns based on the maximum count of items found in the column and to remove the original 'Deskripsi' column afterward.
 
+        The column is split and expanded in one columnar pass. Rows with more items
+        than `max_descriptions` keep their first `max_descriptions` items and are
+        counted in `overflow_rows`.
+
         Args:
         ----
             df (pd.DataFrame): The input DataFrame with a 'Deskripsi' column.
@@ -320,19 +584,49 @@ class CleaningSeparatingDeskripsi:
 
         """
         df["Deskripsi"] = df["Deskripsi"].fillna("").astype(str)
-        max_items = self._find_max_descriptions(df["Deskripsi"])
+        items = self._split_descriptions(df["Deskripsi"])
+        positions = items.groupby(level=0).cumcount().to_numpy()
+        counts = np.bincount(items.index.to_numpy(), minlength=len(df))
+
+        self.overflow_rows += int((counts > self.max_descriptions).sum())
+        max_items = min(int(counts.max(initial=0)), self.max_descriptions)
+
+        # Scatter the items of every row into a rows x columns matrix at once
+        kept = positions < max_items
+        matrix = np.full((len(df), max_items), None, dtype=object)
+        matrix[items.index.to_numpy()[kept], positions[kept]] = items.to_numpy()[kept]
 
         description_cols = [f"description_{i+1}" for i in range(max_items)]
-        for col in description_cols:
-            df[col] = None
+        descriptions = pd.DataFrame(matrix, index=df.index, columns=description_cols)
+        return pd.concat(
+            [df.drop(columns=["Deskripsi", *df.columns.intersection(description_cols)]), descriptions],
+            axis=1,
+        )
+
+    def _split_descriptions(
+            self,
+            descriptions: pd.Series,
+        ) -> pd.Series:
+        """To split every description into its stripped, non-empty items, without their leading bullet.
+
+        Args:
+        ----
+            descriptions (pd.Series): The 'Deskripsi' column of the DataFrame.
 
-        for index, row in df.iterrows():
-            descriptions = self._extract_descriptions(row["Deskripsi"])
-            for i, desc in enumerate(descriptions):
-                if i < max_items:
-                    df.at[index, f"description_{i+1}"] = desc  # noqa: PD008
+        Returns:
+        -------
+            pd.Series: One item per entry, indexed by the row position it came from.
 
-        return df.drop(columns=["Deskripsi"])
+        """
+        items = (
+            descriptions.reset_index(drop=True)
+            .str.strip()
+            .str.split(self.split_regex, regex=True)
+            .explode()
+            .str.strip()
+            .str.replace(self.bullet_regex, "", regex=True)
+        )
+        return items[items.fillna("") != ""]
 
     def _find_max_descriptions(
             self,
@@ -349,10 +643,8 @@ class CleaningSeparatingDeskripsi:
             int: The maximum count of descriptions found in any single row.
 
         """
-        counts = descriptions.apply(
-            lambda text: len(re.split(self.split_regex, text.strip())) - 1,
-        )
-        return counts.max()
+        items = self._split_descriptions(descriptions)
+        return int(items.index.value_counts().max()) if len(items) else 0
 
     def _extract_descriptions(
             self,
@@ -369,8 +661,137 @@ class CleaningSeparatingDeskripsi:
             list: A list of extracted descriptions.
 
         """
-        descriptions = re.split(self.split_regex, text.strip())
-        return [desc.strip() for desc in descriptions if desc.strip()]
+        descriptions = (re.sub(self.bullet_regex, "", desc.strip()) for desc in re.split(self.split_regex, text.strip()))
+        return [desc for desc in descriptions if desc]
+
+
+class NationalityResolver:
+    """To resolve raw nationality names to the standardized names of a country dictionary.
+
+    Exact (case-insensitive) names are answered from a hash index. Other names are
+    looked up in a BK-tree over the dictionary keys, which only visits keys within
+    the Levenshtein distance that can still reach the similarity threshold.
+    Every resolved name is memoized since uploads repeat the same few values.
+
+    Attributes
+    ----------
+        similarity_threshold (float): The minimum similarity percentage for a fuzzy match.
+
+    """
+
+    def __init__(
+            self,
+            country_dict: dict[str, str],
+            similarity_threshold: float = 85,
+        ) -> None:
+        """To build the exact and fuzzy indexes over the country dictionary."""
+        self.similarity_threshold = similarity_threshold
+        self._exact: dict[str, str] = {}
+        self._order: dict[str, int] = {}
+        for position, (key, standardized_name) in enumerate(country_dict.items()):
+            # The first key wins ties, like the original linear scan
+            self._exact.setdefault(key.lower(), standardized_name)
+            self._order.setdefault(key.lower(), position)
+
+        self._tree: list[Any] | None = None
+        for key in self._exact:
+            self._insert(key)
+        self._cache: dict[str, str] = {}
+
+    @staticmethod
+    def levenshtein_distance(
+            str1: str,
+            str2: str,
+        ) -> int:
+        """To calculate the Levenshtein distance between two strings."""
+        if len(str1) < len(str2):
+            str1, str2 = str2, str1
+        previous = list(range(len(str2) + 1))
+        for i, char1 in enumerate(str1, start=1):
+            current = [i]
+            for j, char2 in enumerate(str2, start=1):
+                current.append(min(
+                    previous[j] + 1,  # Deletion
+                    current[j - 1] + 1,  # Insertion
+                    previous[j - 1] + (char1 != char2),  # Substitution
+                ))
+            previous = current
+        return previous[-1]
+
+    def _insert(
+            self,
+            key: str,
+        ) -> None:
+        """To insert a key into the BK-tree."""
+        if self._tree is None:
+            self._tree = [key, {}]
+            return
+        node = self._tree
+        while True:
+            distance = self.levenshtein_distance(key, node[0])
+            child = node[1].get(distance)
+            if child is None:
+                node[1][distance] = [key, {}]
+                return
+            node = child
+
+    def _search(
+            self,
+            name: str,
+            radius: int,
+        ) -> list[tuple[str, int]]:
+        """To find every key within ``radius`` edits of the name."""
+        found: list[tuple[str, int]] = []
+        stack = [self._tree] if self._tree is not None else []
+        while stack:
+            key, children = stack.pop()
+            distance = self.levenshtein_distance(name, key)
+            if distance <= radius:
+                found.append((key, distance))
+            stack.extend(
+                child
+                for child_distance, child in children.items()
+                if distance - radius <= child_distance <= distance + radius
+            )
+        return found
+
+    def resolve(
+            self,
+            country_name: str,
+        ) -> str:
+        """To standardize a country name, returning it unchanged when nothing is similar enough.
+
+        Args:
+        ----
+            country_name (str): The raw country name to standardize.
+
+        Returns:
+        -------
+            str: The standardized country name, or the input name.
+
+        """
+        if country_name in self._cache:
+            return self._cache[country_name]
+
+        name = country_name.lower()
+        resolved = self._exact.get(name)
+        if resolved is None:
+            # similarity >= threshold means distance <= (1 - threshold) * the longer
+            # length, and the key can be at most len(name) / threshold long
+            ratio = 1 - self.similarity_threshold / 100
+            radius = int(len(name) * ratio / (1 - ratio)) + 1
+            best_score, best_order = -1.0, len(self._order)
+            for key, distance in self._search(name, radius):
+                max_len = max(len(name), len(key))
+                score = ((max_len - distance) / max_len) * 100
+                order = self._order[key]
+                if score > best_score or (score == best_score and order < best_order):
+                    best_score, best_order, resolved = score, order, self._exact[key]
+            if best_score < self.similarity_threshold:
+                resolved = country_name
+
+        self._cache[country_name] = resolved
+        return resolved
 
 
 class FormattingColumn:
@@ -697,15 +1118,29 @@ class FormattingColumn:
         for i in range(1, 4):
             df[f"birth_date_{i}"] = ""
 
-        for index, row in df.iterrows():
-            # Skip formatting if 'Tgl lahir' is "00/00/0000"
-            if row["Tgl Lahir"] == "00/00/0000":
-                continue
-            dates = self.extract_dates(row["Tgl Lahir"])
-            for i, date_str in enumerate(dates):
-                if i >= 3:  # noqa: PLR2004
-                    break
-                df.at[index, f"birth_date_{i+1}"] = date_str  # noqa: PD008
+        # Skip formatting if 'Tgl lahir' is "00/00/0000" or not a string
+        birth_dates = df["Tgl Lahir"].astype(object)
+        is_text = birth_dates.map(lambda value: isinstance(value, str)).astype(bool)
+        birth_dates = birth_dates[is_text & birth_dates.ne("00/00/0000")]
+        if birth_dates.empty:
+            return df
+
+        matches = birth_dates.str.extractall(self.date_pattern)
+        matches = matches[matches.index.get_level_values("match") < 3]  # noqa: PLR2004
+        if matches.empty:
+            return df
+
+        day = matches["day"].fillna(matches["day2"])
+        month = matches["month"].fillna(matches["month2"])
+        year = matches["year"].fillna(matches["year2"])
+
+        # Month names come from the lookup table, numeric months are zero-padded
+        month_number = month.str.lower().map(self.months_dict).fillna(month.str.zfill(2))
+        formatted = self._adjust_years(year) + "/" + month_number + "/" + day.str.zfill(2)
+
+        # One column per extractall match; pivot_table would aggregate the date strings
+        for match_number, dates in formatted.unstack("match").items():  # noqa: PD010
+            df.loc[dates.index, f"birth_date_{match_number + 1}"] = dates.fillna("")
 
         return df
 
@@ -779,6 +1214,28 @@ class FormattingColumn:
             return f"19{year}" if int(year) > 22 else f"20{year}"  # noqa: PLR2004
         return year
 
+    def _adjust_years(
+            self,
+            years: pd.Series,
+        ) -> pd.Series:
+        """To adjust two-digit years to four-digit years with the same cutoff as ``_adjust_year``.
+
+        Args:
+        ----
+            years (pd.Series): The year components of the dates.
+
+        Returns:
+        -------
+            pd.Series: The adjusted four-digit years.
+
+        """
+        two_digit = years.str.len() == 2  # noqa: PLR2004
+        century = pd.Series(
+            np.where(pd.to_numeric(years, errors="coerce") > 22, "19", "20"),  # noqa: PLR2004
+            index=years.index,
+        )
+        return years.mask(two_digit, century + years)
+
     def format_nationality(
             self,
             df: pd.DataFrame,
@@ -797,16 +1254,20 @@ class FormattingColumn:
         # Initialize new columns for the potentially split nationalities
         df["WN_1"], df["WN_2"] = "", ""
 
-        for index, row in df.iterrows():
-            nationalities = self._clean_and_split_nationality(row["WN"])
-            if len(nationalities) > 0:
-                df.at[index, "WN_1"] = self._standardize_country_name(  # noqa: PD008
-                    nationalities[0],
-                )
-            if len(nationalities) > 1:
-                df.at[index, "WN_2"] = self._standardize_country_name(  # noqa: PD008
-                    nationalities[1],
-                )
+        # Resolve each distinct raw value once and map the results back
+        resolved: dict[str, tuple[str, str]] = {}
+        for value in df["WN"].dropna().unique():
+            nationalities = [
+                self._standardize_country_name(nationality)
+                for nationality in self._clean_and_split_nationality(value)[:2]
+            ]
+            resolved[value] = (*nationalities, "", "")[:2]
+
+        if resolved:
+            wn = df["WN"].map(resolved)
+            has_value = wn.notna()
+            df.loc[has_value, "WN_1"] = wn[has_value].str[0]
+            df.loc[has_value, "WN_2"] = wn[has_value].str[1]
 
         return df
 
@@ -864,17 +1325,15 @@ class FormattingColumn:
                 score; otherwise, the input name.
 
         """
-        best_score: float = 0
-        best_match = None
-        for key, standardized_name in self.country_dict.items():
-            score = self._calculate_similarity(country_name.lower(), key.lower())
-            if score > best_score:
-                best_score = score
-                best_match = standardized_name
-
-        if best_score >= 85:  # noqa: PLR2004
-            return best_match
-        return country_name
+        return self._get_nationality_resolver().resolve(country_name)
+
+    def _get_nationality_resolver(self) -> NationalityResolver:
+        """To build the nationality resolver over `country_dict` on first use."""
+        resolver = getattr(self, "_nationality_resolver", None)
+        if resolver is None:
+            resolver = NationalityResolver(self.country_dict)
+            self._nationality_resolver = resolver
+        return resolver
 
 
 def process_data(
@@ -0,0 +1,151 @@
+from __future__ import annotations
+
+from collections import defaultdict
+from typing import TYPE_CHECKING
+
+import numpy as np  #type: ignore # noqa: PGH003
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable, Sequence
+
+# Identifiers shorter than this (after normalization) are placeholders, not identifiers
+MIN_IDENTIFIER_LENGTH = 5
+IDENTIFIER_EXACT_SCORE = 1.0
+# One inserted, deleted or mistyped character, e.g. a NIK copied with a typo
+IDENTIFIER_NEAR_MATCH_SCORE = 0.9
+
+
+def normalize_identifier(value: str | None) -> str:
+    """To reduce an identifier to its upper-case letters and digits, empty when too short."""
+    if not value:
+        return ""
+    normalized = "".join(char for char in str(value).upper() if char.isalnum())
+    return normalized if len(normalized) >= MIN_IDENTIFIER_LENGTH else ""
+
+
+def _deletions(identifier: str) -> set[str]:
+    """To list the strings one deleted character away from an identifier."""
+    return {identifier[:i] + identifier[i + 1:] for i in range(len(identifier))}
+
+
+def within_one_edit(first: str, second: str) -> bool:
+    """To check whether two strings are at most one insertion, deletion or substitution apart."""
+    if abs(len(first) - len(second)) > 1:
+        return False
+    if len(first) > len(second):
+        first, second = second, first
+    for i, (char, other) in enumerate(zip(first, second, strict=False)):
+        if char != other:
+            if len(first) == len(second):
+                return first[i + 1:] == second[i + 1:]
+            return first[i:] == second[i + 1:]
+    return True
+
+
+def identifier_score(
+        first: str | None,
+        second: str | None,
+    ) -> float:
+    """To score two identifiers: 1.0 when equal, 0.9 one edit apart, otherwise 0.0."""
+    first = normalize_identifier(first)
+    second = normalize_identifier(second)
+    if not first or not second:
+        return 0.0
+    if first == second:
+        return IDENTIFIER_EXACT_SCORE
+    return IDENTIFIER_NEAR_MATCH_SCORE if within_one_edit(first, second) else 0.0
+
+
+class IdentifierIndex:
+    """To find the entries holding an identifier, or one a single edit away, without scanning them.
+
+    Every identifier is hashed as is and as each of its one-deletion variants. Any
+    identifier one edit away from a lookup value shares one of those keys with it, so
+    a lookup costs a few hash probes per character whatever the number of entries.
+
+    Attributes
+    ----------
+        size (int): The number of indexed entries.
+
+    """
+
+    def __init__(
+            self,
+            identifiers: Sequence[Iterable[str | None]],
+        ) -> None:
+        """To index the identifiers of every entry by its position."""
+        self.size = len(identifiers)
+        self._exact: dict[str, set[int]] = defaultdict(set)
+        self._deleted: dict[str, set[str]] = defaultdict(set)
+        for position, values in enumerate(identifiers):
+            for value in values:
+                identifier = normalize_identifier(value)
+                if not identifier:
+                    continue
+                self._exact[identifier].add(position)
+                for deleted in _deletions(identifier):
+                    self._deleted[deleted].add(identifier)
+
+    def match(
+            self,
+            value: str | None,
+        ) -> dict[int, float]:
+        """To find the entries matching an identifier.
+
+        Args:
+        ----
+            value (str | None): The raw identifier to look up.
+
+        Returns:
+        -------
+            dict[int, float]: The best ``identifier_score`` of every matching entry.
+
+        """
+        identifier = normalize_identifier(value)
+        if not identifier:
+            return {}
+        scores = dict.fromkeys(self._exact.get(identifier, ()), IDENTIFIER_EXACT_SCORE)
+
+        near = set(self._deleted.get(identifier, ()))
+        for deleted in _deletions(identifier):
+            if deleted in self._exact:
+                near.add(deleted)
+            near.update(self._deleted.get(deleted, ()))
+        near.discard(identifier)
+        for other in near:
+            if within_one_edit(identifier, other):
+                for position in self._exact[other]:
+                    scores.setdefault(position, IDENTIFIER_NEAR_MATCH_SCORE)
+        return scores
+
+
+def identifier_similarity(
+        value: str | None,
+        others: Iterable[str | None],
+    ) -> list[float]:
+    """To score an identifier against every non-empty value of an entry, like ``calculate_token_similarity``."""
+    return [identifier_score(value, other) for other in others if other]
+
+
+def identifier_similarity_matrix(
+        values: Sequence[str | None],
+        dttot_groups: Sequence[Sequence[str | None]],
+    ) -> np.ndarray:
+    """To score the identifier of every entity against the identifiers of every DTTOT entry.
+
+    Args:
+    ----
+        values (Sequence[str | None]): The identifier of every entity.
+        dttot_groups (Sequence[Sequence[str | None]]): The identifiers of every DTTOT entry.
+
+    Returns:
+    -------
+        np.ndarray: A ``len(values) x len(dttot_groups)`` score matrix, mostly zeros.
+
+    """
+    index = IdentifierIndex(dttot_groups)
+    result = np.zeros((len(values), len(dttot_groups)), dtype=np.float32)
+    for row, value in enumerate(values):
+        for position, score in index.match(value).items():
+            result[row, position] = score
+    return result
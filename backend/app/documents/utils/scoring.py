@@ -0,0 +1,440 @@
+from __future__ import annotations
+
+import functools
+import hashlib
+import json
+import logging
+import math
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Any, TypeVar
+
+import numpy as np  #type: ignore # noqa: PGH003
+from django.conf import settings  #type: ignore # noqa: PGH003
+from django.core.cache import InvalidCacheBackendError, caches  #type: ignore # noqa: PGH003
+from django.db import transaction  #type: ignore # noqa: PGH003
+
+from app.documents.models import PairScoreGeneration  #type: ignore # noqa: PGH003
+from app.documents.utils.identifiers import (  #type: ignore # noqa: PGH003
+    identifier_similarity,
+    identifier_similarity_matrix,
+    normalize_identifier,
+)
+from app.documents.utils.similarity import (  #type: ignore # noqa: PGH003
+    entity_similarity_matrix,
+    load_similarity_pipeline,
+    model_key,
+    normalize_embedding_string,
+    prefetch_embeddings,
+    token_similarities,
+)
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator, Mapping, Sequence
+
+logger = logging.getLogger(__name__)
+
+PairLabel = TypeVar("PairLabel")
+
+# The spaCy model every report type scores with
+SIMILARITY_MODEL = "xx_ent_wiki_sm"
+PAIR_SCORE_CACHE_ALIAS = "pair_scores"
+# Slack on the score floor for float32 rounding of the accumulated scores
+FLOOR_TOLERANCE = 1e-6
+DTTOT_ALIAS_COUNT: int = 28
+
+# DttotDoc field groups an entity field is compared against
+DTTOT_NAME_FIELDS: list[str] = [
+    "dttot_first_name", "dttot_middle_name", "dttot_last_name",
+    *(
+        f"dttot_alias_{part}_{i}"
+        for i in range(1, DTTOT_ALIAS_COUNT + 1)
+        for part in ("name", "first_name", "middle_name", "last_name")
+    ),
+]
+DTTOT_IDENTIFIER_FIELDS: list[str] = ["dttot_nik_ktp", "dttot_passport_number"]
+DTTOT_ADDRESS_FIELDS: list[str] = ["dttot_domicile_address"]
+DTTOT_BIRTH_PLACE_FIELDS: list[str] = ["dttot_birth_place"]
+DTTOT_BIRTH_DATE_FIELDS: list[str] = ["dttot_birth_date_1", "dttot_birth_date_2", "dttot_birth_date_3"]
+DTTOT_NATIONALITY_FIELDS: list[str] = ["dttot_nationality_1", "dttot_nationality_2"]
+DTTOT_DESCRIPTION_FIELDS: list[str] = [f"dttot_description_{i}" for i in range(1, 10)]
+
+
+@functools.cache
+def get_similarity_pipeline(name: str = SIMILARITY_MODEL) -> Any:
+    """To load a scoring pipeline once per process, shared by every report type."""
+    return load_similarity_pipeline(name)
+
+
+def calculate_similarity(str1: str | None, str2: str | None) -> float:
+    """To calculate the similarity of two whole strings."""
+    if not str1 or not str2:
+        return 0.0
+    doc1, doc2 = get_similarity_pipeline().pipe((str1, str2))
+    return doc1.similarity(doc2)
+
+
+def calculate_token_similarity(str1: str | None, str2: str | None) -> list[float]:
+    """To calculate the similarity of every token pair of two strings."""
+    return token_similarities(get_similarity_pipeline(), str1, str2)
+
+
+@dataclass(frozen=True)
+class FieldSpec:
+    """How one entity field is scored against a DTTOT entry.
+
+    ``key`` names the score, the entity value is read from ``source`` (the key
+    without ``_scores`` by default) and compared against every ``dttot_fields``
+    value, keeping the best. Identifier fields are matched as identifier numbers,
+    the others by spaCy token similarity.
+    """
+
+    key: str
+    dttot_fields: Sequence[str]
+    weight: float
+    identifier: bool = False
+    source: str = field(default="")
+
+    def __post_init__(self) -> None:
+        if not self.source:
+            object.__setattr__(self, "source", self.key.removesuffix("_scores"))
+
+
+class ScoringEngine:
+    """To score the entities of one report type against DTTOT entries.
+
+    Attributes
+    ----------
+        fields (list[FieldSpec]): The scored fields, in aggregation order.
+        weights (dict[str, float]): The weight of every score key.
+        identifier_fields (frozenset[str]): The score keys matched as identifier numbers.
+
+    """
+
+    def __init__(
+            self,
+            fields: Sequence[FieldSpec],
+            model: str = SIMILARITY_MODEL,
+        ) -> None:
+        """To set up an engine over declarative field specs."""
+        self.fields = list(fields)
+        self.model = model
+        self.weights = {spec.key: spec.weight for spec in self.fields}
+        self.identifier_fields = frozenset(spec.key for spec in self.fields if spec.identifier)
+        self._text_fields = [spec for spec in self.fields if not spec.identifier]
+        # Heaviest first, so the upper bound of a pair drops as fast as possible
+        self._by_weight = sorted(self.fields, key=lambda spec: -spec.weight)
+        self._dttot_fields = list(dict.fromkeys(
+            (dttot_field, spec.identifier) for spec in self.fields for dttot_field in spec.dttot_fields
+        ))
+
+    @property
+    def nlp(self) -> Any:
+        """The shared pipeline of the engine's model, loaded on first use."""
+        return get_similarity_pipeline(self.model)
+
+    @functools.cached_property
+    def fingerprint(self) -> str:
+        """A hash of the field specs, the weights and the model version, part of every pair score key."""
+        specs = [
+            [spec.key, spec.source, list(spec.dttot_fields), spec.weight, spec.identifier]
+            for spec in self.fields
+        ]
+        return _digest([model_key(self.nlp), specs])[:16]
+
+    def entity_hash(self, entity: dict[str, Any]) -> str:
+        """To hash the normalized values of an entity that the engine scores."""
+        return _digest([_normalize_value(entity.get(spec.source), spec.identifier) for spec in self.fields])
+
+    def dttot_hash(self, dttot: Any) -> str:
+        """To hash the normalized values of a DTTOT entry that the engine scores."""
+        return _digest([
+            _normalize_value(getattr(dttot, dttot_field), identifier)
+            for dttot_field, identifier in self._dttot_fields
+        ])
+
+    def similarity_scores(
+            self,
+            entity: dict[str, Any],
+            dttot: Any,
+        ) -> dict[str, list[float]]:
+        """To score one entity against one DTTOT entry, every value of every field.
+
+        Args:
+        ----
+            entity (dict[str, Any]): The entity data, keyed by the specs' ``source``.
+            dttot (Any): The DttotDoc entry.
+
+        Returns:
+        -------
+            dict[str, list[float]]: The score of every non-empty DTTOT value, per score key.
+
+        """
+        scores: dict[str, list[float]] = {}
+        for spec in self.fields:
+            values = [getattr(dttot, dttot_field) for dttot_field in spec.dttot_fields]
+            if spec.identifier:
+                scores[spec.key] = identifier_similarity(entity.get(spec.source), values)
+            else:
+                scores[spec.key] = [
+                    max(token_similarities(self.nlp, entity.get(spec.source, ""), value))
+                    for value in values if value
+                ]
+        return scores
+
+    def aggregate(
+            self,
+            similarity_scores: dict[str, list[float]],
+        ) -> float:
+        """To weigh the best score of every field into one score."""
+        return sum(
+            max(similarity_scores[key], default=0.0) * weight for key, weight in self.weights.items()
+        )
+
+    def score_pair(
+            self,
+            entity: dict[str, Any],
+            dttot: Any,
+            floor: float = 0.0,
+        ) -> float:
+        """To score one pair field by field, heaviest first, abandoning it below the floor.
+
+        Every field scores at most 1.0, so after each field the pair can still gain the
+        weight of the fields left. Once that bound falls below ``floor`` the rest is skipped.
+
+        Args:
+        ----
+            entity (dict[str, Any]): The entity data, keyed by the specs' ``source``.
+            dttot (Any): The DttotDoc entry.
+            floor (float): The lowest score worth computing, 0.0 scores every field.
+
+        Returns:
+        -------
+            float: The aggregated score, NaN when the pair was abandoned.
+
+        """
+        total = 0.0
+        remaining = sum(self.weights.values())
+        for spec in self._by_weight:
+            values = [getattr(dttot, dttot_field) for dttot_field in spec.dttot_fields]
+            if spec.identifier:
+                scores = identifier_similarity(entity.get(spec.source), values)
+            else:
+                scores = [
+                    max(token_similarities(self.nlp, entity.get(spec.source, ""), value))
+                    for value in values if value
+                ]
+            total += max(scores, default=0.0) * spec.weight
+            remaining -= spec.weight
+            if total + remaining < floor - FLOOR_TOLERANCE:
+                return math.nan
+        return total
+
+    def score(
+            self,
+            entities: Sequence[dict[str, Any]],
+            dttots: Sequence[Any],
+            floor: float = 0.0,
+        ) -> np.ndarray:
+        """To score every entity against every DTTOT entry at once.
+
+        Fields are scored as one matrix each, heaviest first, giving the same scores as
+        ``aggregate`` over ``similarity_scores`` for each pair. Once a pair's score plus
+        the weight of the fields left falls below ``floor`` it is abandoned: the
+        remaining fields are not computed for entities or entries without a live pair.
+
+        Args:
+        ----
+            entities (Sequence[dict[str, Any]]): The data of every entity.
+            dttots (Sequence[Any]): The DttotDoc entries.
+            floor (float): The lowest score worth computing, 0.0 scores every field.
+
+        Returns:
+        -------
+            np.ndarray: A ``len(entities) x len(dttots)`` matrix of aggregated scores,
+                NaN for abandoned pairs.
+
+        """
+        scores = np.zeros((len(entities), len(dttots)), dtype=np.float32)
+        alive = np.ones(scores.shape, dtype=bool)
+        remaining = sum(self.weights.values())
+        for spec in self._by_weight:
+            rows = np.flatnonzero(alive.any(axis=1))
+            columns = np.flatnonzero(alive.any(axis=0))
+            if not rows.size:
+                break
+            strings = [entities[row].get(spec.source) for row in rows]
+            values = [[getattr(dttots[column], dttot_field) for dttot_field in spec.dttot_fields] for column in columns]
+            if spec.identifier:
+                field_scores = identifier_similarity_matrix(strings, values)
+            else:
+                field_scores = entity_similarity_matrix(self.nlp, strings, values)
+            scores[np.ix_(rows, columns)] += spec.weight * field_scores
+            remaining -= spec.weight
+            if floor > 0:
+                alive &= scores + remaining >= floor - FLOOR_TOLERANCE
+        scores[~alive] = np.nan
+        return scores
+
+    def text_strings(
+            self,
+            entities: Sequence[dict[str, Any]],
+            dttots: Sequence[Any],
+        ) -> Iterator[Any]:
+        """To list the values the spaCy scored fields will parse."""
+        for spec in self._text_fields:
+            for entity in entities:
+                yield entity.get(spec.source)
+            for dttot in dttots:
+                for dttot_field in spec.dttot_fields:
+                    yield getattr(dttot, dttot_field)
+
+    def prefetch(
+            self,
+            entities: Sequence[dict[str, Any]],
+            dttots: Sequence[Any],
+        ) -> None:
+        """To parse every string ``score`` will need in one batched ``nlp.pipe`` pass."""
+        prefetch_embeddings(self.nlp, self.text_strings(entities, dttots))
+
+
+def _normalize_value(value: Any, identifier: bool) -> str | None:  # noqa: FBT001
+    """To reduce a scored value to what its score depends on."""
+    if identifier:
+        return normalize_identifier(value) or None
+    if not value:
+        return None
+    return normalize_embedding_string(str(value)) or None
+
+
+def _digest(values: Any) -> str:
+    """To hash JSON serializable values."""
+    encoded = json.dumps(values, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    return hashlib.sha256(encoded).hexdigest()
+
+
+def pair_score_generation(model: str) -> int:
+    """To get the generation of a model's pair scores, 0 until they are first invalidated."""
+    return (
+        PairScoreGeneration.objects.filter(model=model)
+        .values_list("generation", flat=True)
+        .first()
+    ) or 0
+
+
+class PairScoreCache:
+    """To remember the aggregated score of entity x DTTOT pairs whose scored values did not change.
+
+    A pair is keyed by the engine fingerprint, which covers the field specs, the weights
+    and the model version, and by the hashes of the normalized entity and DTTOT values,
+    so reprocessing a document or a list that keeps most entries skips their scoring.
+    Every key also holds the model's generation: ``invalidate_pair_scores`` bumps it and
+    the earlier entries are never read again. The generation is a database row, not a
+    cache entry, so it is shared by every host and survives the cache evicting or
+    culling entries, which expire after ``PAIR_SCORE_CACHE_TIMEOUT`` seconds and, with
+    the file backend, past its ``MAX_ENTRIES``. It is read once per cache, so a scoring
+    shard keeps one generation and the next shard's cache sees an invalidation.
+
+    Attributes
+    ----------
+        engine (ScoringEngine): The engine whose scores are cached.
+        hits (int): Pairs answered by the cache.
+        misses (int): Pairs that had to be scored.
+
+    """
+
+    def __init__(
+            self,
+            engine: ScoringEngine,
+            shared: Any,
+        ) -> None:
+        """To set up the pair score cache of one engine over a Django cache."""
+        self.engine = engine
+        self.shared = shared
+        self.hits = 0
+        self.misses = 0
+
+    @functools.cached_property
+    def prefix(self) -> str:
+        """The key prefix of the engine's pairs, its generation read once per cache."""
+        generation = pair_score_generation(model_key(self.engine.nlp))
+        return f"pair_score:{generation}:{self.engine.fingerprint}"
+
+    def get_many(
+            self,
+            pairs: Mapping[PairLabel, tuple[str, str]],
+        ) -> dict[PairLabel, float]:
+        """To get the cached scores of pairs.
+
+        Args:
+        ----
+            pairs (Mapping[PairLabel, tuple[str, str]]): The ``(dttot_hash, entity_hash)``
+                of every pair, by any label.
+
+        Returns:
+        -------
+            dict[PairLabel, float]: The cached score of every pair found, by label.
+
+        """
+        if not pairs:
+            return {}
+        try:
+            prefix = self.prefix
+            keys = {f"{prefix}:{dttot_hash}:{entity_hash}": label for label, (dttot_hash, entity_hash) in pairs.items()}
+            cached = self.shared.get_many(list(keys))
+        except Exception:  # noqa: BLE001
+            logger.warning("Pair score cache is not reachable", exc_info=True)
+            cached = {}
+        self.hits += len(cached)
+        self.misses += len(pairs) - len(cached)
+        return {keys[key]: score for key, score in cached.items()}
+
+    def set_many(
+            self,
+            scores: Mapping[tuple[str, str], float],
+        ) -> None:
+        """To cache the scores of pairs, keyed by their ``(dttot_hash, entity_hash)``."""
+        if not scores:
+            return
+        try:
+            prefix = self.prefix
+            self.shared.set_many({
+                f"{prefix}:{dttot_hash}:{entity_hash}": float(score)
+                for (dttot_hash, entity_hash), score in scores.items()
+            })
+        except Exception:  # noqa: BLE001
+            logger.warning("Pair score cache is not reachable", exc_info=True)
+
+
+def get_pair_score_cache(engine: ScoringEngine) -> PairScoreCache | None:
+    """To get the pair score cache of an engine, None when it is disabled or not configured."""
+    if not settings.DTTOT_PAIR_SCORE_CACHE:
+        return None
+    try:
+        shared = caches[PAIR_SCORE_CACHE_ALIAS]
+    except InvalidCacheBackendError:
+        return None
+    return PairScoreCache(engine, shared)
+
+
+def invalidate_pair_scores(model: str = SIMILARITY_MODEL) -> int:
+    """To drop the cached pair scores of a scoring model, e.g. after it was retrained.
+
+    The generation lives in the database, so every host stops reading the earlier
+    entries, whichever cache backend holds them.
+
+    Args:
+    ----
+        model (str): The name or path of the spaCy model.
+
+    Returns:
+    -------
+        int: The new generation of the model's pair scores.
+
+    """
+    with transaction.atomic():
+        row, _ = PairScoreGeneration.objects.select_for_update().get_or_create(
+            model=model_key(get_similarity_pipeline(model)),
+        )
+        row.generation += 1
+        row.save(update_fields=["generation", "updated_date"])
+    return row.generation
@@ -0,0 +1,443 @@
+from __future__ import annotations
+
+import hashlib
+import logging
+import multiprocessing
+import unicodedata
+import weakref
+from typing import TYPE_CHECKING, Any
+
+import numpy as np  #type: ignore # noqa: PGH003
+import spacy  #type: ignore # noqa: PGH003
+from cachetools import LRUCache  #type: ignore # noqa: PGH003
+from django.conf import settings  #type: ignore # noqa: PGH003
+from django.core.cache import caches  #type: ignore # noqa: PGH003
+from django.core.cache.backends.base import InvalidCacheBackendError  #type: ignore # noqa: PGH003
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable, Sequence
+
+logger = logging.getLogger(__name__)
+
+# Left-hand tokens compared against every right-hand token at once.
+SIMILARITY_BLOCK_TOKENS = 1024
+# Cache alias of the embeddings shared by every worker, see app.config.cache
+EMBEDDING_CACHE_ALIAS = "embeddings"
+# Components that produce the token vectors; every other one is disabled for scoring
+SIMILARITY_PIPES: tuple[str, ...] = ("tok2vec", "transformer")
+
+# The token orth ids and normalized token vectors of one parsed string
+Embedding = tuple[np.ndarray, np.ndarray]
+
+
+def load_similarity_pipeline(name: str) -> Any:
+    """To load a spaCy pipeline with only the components the token vectors come from.
+
+    Token and doc similarity only read the vectors, so the NER of ``xx_ent_wiki_sm``
+    and any other annotating component is disabled.
+    """
+    nlp = spacy.load(name)
+    nlp.select_pipes(disable=[pipe for pipe in nlp.pipe_names if pipe not in SIMILARITY_PIPES])
+    return nlp
+
+
+def normalize_embedding_string(string: str) -> str:
+    """To normalize a string before it is parsed, so equal names share one embedding."""
+    return " ".join(unicodedata.normalize("NFC", string).split())
+
+
+def model_key(nlp: Any) -> str:
+    """To name a spaCy pipeline by its language, name and version, for cache keys."""
+    return f"{nlp.lang}_{nlp.meta.get('name')}-{nlp.meta.get('version')}"
+
+
+def _embed(doc: Any) -> Embedding:
+    """To take the orth ids and L2-normalized vectors of the tokens of a parsed string."""
+    orths = np.asarray([token.orth for token in doc], dtype=np.uint64)
+    vectors = [token.vector for token in doc]
+    norms = [token.vector_norm for token in doc]
+    vectors = np.vstack(
+        [vector / norm if norm else np.zeros_like(vector) for vector, norm in zip(vectors, norms, strict=True)],
+    ).astype(np.float32) if vectors else np.zeros((0, 0), np.float32)
+    return orths, vectors
+
+
+class EmbeddingCache:
+    """To parse every string once per spaCy model, across scoring runs and workers.
+
+    Embeddings are content addressed by the model name and version and the normalized
+    string. Lookups go to an in-process LRU first, then to the shared ``embeddings``
+    cache (Redis, or disk when Redis is not available), and only then parse the string.
+
+    Attributes
+    ----------
+        model (str): The name and version of the spaCy model, part of every key.
+        memory_hits (int): Lookups answered by the in-process LRU.
+        shared_hits (int): Lookups answered by the shared cache.
+        misses (int): Strings that had to be parsed.
+
+    """
+
+    def __init__(
+            self,
+            nlp: Any,
+            maxsize: int,
+            shared: Any | None = None,
+            batch_size: int = 256,
+            n_process: int = 1,
+        ) -> None:
+        """To set up the cache tiers of one spaCy pipeline and how missing strings are parsed."""
+        self.nlp = nlp
+        self.batch_size = batch_size
+        self.n_process = n_process
+        self.model = model_key(nlp)
+        self.shared = shared
+        self._memory: LRUCache = LRUCache(maxsize=maxsize)
+        self.memory_hits = 0
+        self.shared_hits = 0
+        self.misses = 0
+
+    def key(self, string: str) -> str:
+        """To build the cache key of a normalized string."""
+        digest = hashlib.sha256(string.encode("utf-8")).hexdigest()
+        return f"embedding:{self.model}:{digest}"
+
+    def get_many(
+            self,
+            strings: Iterable[str],
+        ) -> dict[str, Embedding]:
+        """To get the embeddings of normalized strings, parsing only the ones no tier holds.
+
+        Args:
+        ----
+            strings (Iterable[str]): Normalized, non-empty strings.
+
+        Returns:
+        -------
+            dict[str, Embedding]: The orth ids and normalized vectors of every string.
+
+        """
+        found: dict[str, Embedding] = {}
+        missing: dict[str, str] = {}
+        for string in strings:
+            if string in found or string in missing:
+                continue
+            key = self.key(string)
+            embedding = self._memory.get(key)
+            if embedding is None:
+                missing[key] = string
+            else:
+                self.memory_hits += 1
+                found[string] = embedding
+
+        if missing and self.shared is not None:
+            try:
+                shared = self.shared.get_many(list(missing))
+            except Exception:  # noqa: BLE001
+                logger.warning("Shared embedding cache is not reachable", exc_info=True)
+                shared = {}
+            for key, embedding in shared.items():
+                self.shared_hits += 1
+                self._memory[key] = embedding
+                found[missing.pop(key)] = embedding
+
+        parsed: dict[str, Embedding] = {}
+        docs = self.nlp.pipe(
+            missing.values(),
+            batch_size=self.batch_size,
+            n_process=self._n_process(len(missing)),
+        )
+        for key, doc in zip(missing, docs, strict=True):
+            self.misses += 1
+            embedding = _embed(doc)
+            self._memory[key] = embedding
+            parsed[key] = embedding
+            found[missing[key]] = embedding
+
+        if parsed and self.shared is not None:
+            try:
+                self.shared.set_many(parsed)
+            except Exception:  # noqa: BLE001
+                logger.warning("Shared embedding cache is not reachable", exc_info=True)
+        return found
+
+    def _n_process(self, count: int) -> int:
+        """To pick the parsing processes: one for a single batch, or inside a daemonic worker."""
+        if self.n_process == 1 or count <= self.batch_size:
+            return 1
+        if multiprocessing.current_process().daemon:
+            # Celery prefork children cannot start processes of their own
+            logger.warning("Parsing in a daemonic process, ignoring n_process=%d", self.n_process)
+            return 1
+        return self.n_process
+
+    def stats(self) -> dict[str, int | str]:
+        """To report the hit and miss counters of the cache."""
+        return {
+            "model": self.model,
+            "memory_hits": self.memory_hits,
+            "shared_hits": self.shared_hits,
+            "misses": self.misses,
+            "memory_size": len(self._memory),
+        }
+
+
+_embedding_caches: weakref.WeakKeyDictionary = weakref.WeakKeyDictionary()
+
+
+def get_embedding_cache(nlp: Any) -> EmbeddingCache:
+    """To get the process-wide embedding cache of a spaCy pipeline."""
+    embedding_cache = _embedding_caches.get(nlp)
+    if embedding_cache is None:
+        try:
+            shared = caches[EMBEDDING_CACHE_ALIAS]
+        except InvalidCacheBackendError:
+            shared = None
+        embedding_cache = EmbeddingCache(
+            nlp,
+            settings.EMBEDDING_CACHE_LRU_SIZE,
+            shared,
+            batch_size=settings.DTTOT_NLP_BATCH_SIZE,
+            n_process=settings.DTTOT_NLP_N_PROCESS,
+        )
+        _embedding_caches[nlp] = embedding_cache
+    return embedding_cache
+
+
+def prefetch_embeddings(
+        nlp: Any,
+        strings: Iterable[object],
+    ) -> None:
+    """To parse every string a scoring run needs in one batched pass, so pairs only look them up."""
+    get_embedding_cache(nlp).get_many(
+        normalized
+        for string in strings
+        if isinstance(string, str) and (normalized := normalize_embedding_string(string))
+    )
+
+
+def log_embedding_cache_stats(nlp: Any, label: str) -> None:
+    """To log the hit and miss counters of the embedding cache of a pipeline."""
+    stats = get_embedding_cache(nlp).stats()
+    logger.info(
+        "Embedding cache after %s (%s): %d memory hits, %d shared hits, %d misses",
+        label,
+        stats["model"],
+        stats["memory_hits"],
+        stats["shared_hits"],
+        stats["misses"],
+    )
+
+
+def token_similarities(
+        nlp: Any,
+        str1: str | None,
+        str2: str | None,
+    ) -> list[float]:
+    """To score every token of one string against every token of another.
+
+    Matches ``Token.similarity`` over the parsed strings, with both strings read
+    from the embedding cache of the pipeline.
+
+    Args:
+    ----
+        nlp (Any): The spaCy pipeline.
+        str1 (str | None): The first string.
+        str2 (str | None): The second string.
+
+    Returns:
+    -------
+        list[float]: The similarity of every token pair, ``[0.0]`` if a string is empty.
+
+    """
+    if not str1 or not str2:
+        return [0.0]
+    str1 = normalize_embedding_string(str1)
+    str2 = normalize_embedding_string(str2)
+    if not str1 or not str2:
+        return [0.0]
+    embeddings = get_embedding_cache(nlp).get_many((str1, str2))
+    orths1, vectors1 = embeddings[str1]
+    orths2, vectors2 = embeddings[str2]
+    return _token_similarity_block(vectors1, orths1, vectors2, orths2).ravel().tolist()
+
+
+class StringEmbeddings:
+    """To hold the token vectors of distinct strings, read through the embedding cache.
+
+    Token vectors are L2-normalized so the cosine similarity of every token pair is a
+    single matrix product. Token orth ids are kept because spaCy scores identical tokens
+    as 1.0 whatever their vectors, and tokens without a vector as 0.0.
+
+    Attributes
+    ----------
+        index (dict[str, int]): The position of every embedded string.
+        vectors (np.ndarray): The normalized token vectors of every string, one row per token.
+        orths (np.ndarray): The orth id of every token row.
+        starts (np.ndarray): The first token row of every string.
+
+    """
+
+    def __init__(
+            self,
+            nlp: Any,
+            strings: Iterable[str | None],
+            embedding_cache: EmbeddingCache | None = None,
+        ) -> None:
+        """To embed every distinct non-empty string once and stack its token vectors."""
+        if embedding_cache is None:
+            embedding_cache = get_embedding_cache(nlp)
+        normalized: dict[str, str] = {}
+        for string in strings:
+            if string and string not in normalized:
+                normalized[string] = normalize_embedding_string(string)
+        embeddings = embedding_cache.get_many(value for value in normalized.values() if value)
+
+        self.index: dict[str, int] = {}
+        vectors: list[np.ndarray] = []
+        orths: list[np.ndarray] = []
+        starts: list[int] = []
+        offset = 0
+        for string, value in normalized.items():
+            if not value or not len(embeddings[value][0]):
+                continue
+            self.index[string] = len(starts)
+            starts.append(offset)
+            orths.append(embeddings[value][0])
+            vectors.append(embeddings[value][1])
+            offset += len(orths[-1])
+
+        self.vectors = np.vstack(vectors).astype(np.float32) if vectors else np.zeros((0, 0), np.float32)
+        self.orths = np.concatenate(orths) if orths else np.zeros(0, dtype=np.uint64)
+        self.starts = np.asarray(starts, dtype=np.int64)
+
+    def __len__(self) -> int:
+        return len(self.starts)
+
+    def select(
+            self,
+            strings: Iterable[str],
+        ) -> StringEmbeddings:
+        """To gather the embeddings of some already embedded strings, in the given order."""
+        selected = StringEmbeddings.__new__(StringEmbeddings)
+        selected.index = {}
+        ends = np.append(self.starts[1:], len(self.orths))
+        rows: list[np.ndarray] = []
+        starts: list[int] = []
+        offset = 0
+        for string in strings:
+            if string in selected.index or string not in self.index:
+                continue
+            position = self.index[string]
+            selected.index[string] = len(starts)
+            starts.append(offset)
+            rows.append(np.arange(self.starts[position], ends[position]))
+            offset += len(rows[-1])
+
+        rows_index = np.concatenate(rows) if rows else np.zeros(0, dtype=np.int64)
+        selected.vectors = self.vectors[rows_index] if rows else self.vectors[:0]
+        selected.orths = self.orths[rows_index]
+        selected.starts = np.asarray(starts, dtype=np.int64)
+        return selected
+
+
+def _token_similarity_block(
+        left_vectors: np.ndarray,
+        left_orths: np.ndarray,
+        right_vectors: np.ndarray,
+        right_orths: np.ndarray,
+    ) -> np.ndarray:
+    """To score every left token against every right token the way ``Token.similarity`` does."""
+    similarity = left_vectors @ right_vectors.T
+    similarity[left_orths[:, None] == right_orths[None, :]] = 1.0
+    return similarity
+
+
+def group_similarity_matrix(
+        left: StringEmbeddings,
+        right: StringEmbeddings,
+        groups: Sequence[Sequence[str]],
+        block_tokens: int = SIMILARITY_BLOCK_TOKENS,
+    ) -> np.ndarray:
+    """To score every left string against every group of right strings.
+
+    The score of a string against one right string is the best similarity of any of
+    their token pairs, and against a group the best score over the group's strings,
+    the same as taking ``max`` over ``calculate_token_similarity`` for each value.
+
+    Args:
+    ----
+        left (StringEmbeddings): The embedded left-hand strings, one result row each.
+        right (StringEmbeddings): The embedded right-hand strings.
+        groups (Sequence[Sequence[str]]): The right-hand strings of every result column.
+        block_tokens (int): Left-hand tokens scored per matrix product, bounding memory.
+
+    Returns:
+    -------
+        np.ndarray: A ``len(left) x len(groups)`` matrix, 0.0 for empty groups.
+
+    """
+    result = np.zeros((len(left), len(groups)), dtype=np.float32)
+    right = right.select(string for group in groups for string in group)
+    if not len(left) or not len(right):
+        return result
+
+    # Every group as a run of its strings' columns, skipping the empty groups
+    members = [[right.index[string] for string in group if string in right.index] for group in groups]
+    filled = [i for i, group in enumerate(members) if group]
+    group_columns = np.asarray([position for i in filled for position in members[i]], dtype=np.int64)
+    group_starts = np.cumsum([0] + [len(members[i]) for i in filled[:-1]])
+
+    left_ends = np.append(left.starts[1:], len(left.orths))
+    first = 0
+    while first < len(left):
+        # Whole strings only, so every block reduces to complete rows
+        last = max(int(np.searchsorted(left.starts, left.starts[first] + block_tokens)), first + 1)
+        rows = slice(left.starts[first], left_ends[last - 1])
+        similarity = _token_similarity_block(
+            left.vectors[rows], left.orths[rows], right.vectors, right.orths,
+        )
+        by_string = np.maximum.reduceat(similarity, right.starts, axis=1)
+        by_group = np.maximum.reduceat(by_string[:, group_columns], group_starts, axis=1)
+        block = np.maximum.reduceat(by_group, left.starts[first:last] - left.starts[first], axis=0)
+        result[first:last, filled] = block
+        first = last
+    return result
+
+
+def entity_similarity_matrix(
+        nlp: Any,
+        entity_strings: Sequence[str | None],
+        dttot_groups: Sequence[Sequence[str | None]],
+        left: StringEmbeddings | None = None,
+        right: StringEmbeddings | None = None,
+    ) -> np.ndarray:
+    """To score the string of every entity against the values of every DTTOT entry for one field.
+
+    Args:
+    ----
+        nlp (Any): The spaCy pipeline used when ``left`` or ``right`` is not given.
+        entity_strings (Sequence[str | None]): The field value of every entity.
+        dttot_groups (Sequence[Sequence[str | None]]): The field values of every DTTOT entry.
+        left (StringEmbeddings | None): Embeddings of every entity string, shared across fields.
+        right (StringEmbeddings | None): Embeddings of every DTTOT value, shared across fields.
+
+    Returns:
+    -------
+        np.ndarray: A ``len(entity_strings) x len(dttot_groups)`` score matrix.
+            Empty entity strings and entries without values score 0.0.
+
+    """
+    groups = [[value for value in group if value] for group in dttot_groups]
+    if left is None:
+        left = StringEmbeddings(nlp, entity_strings)
+    if right is None:
+        right = StringEmbeddings(nlp, (value for group in groups for value in group))
+
+    left = left.select(string for string in entity_strings if string)
+    by_string = group_similarity_matrix(left, right, groups)
+    result = np.zeros((len(entity_strings), len(groups)), dtype=np.float32)
+    for row, string in enumerate(entity_strings):
+        if string in left.index:
+            result[row] = by_string[left.index[string]]
+    return result
@@ -6,3 +6,6 @@ from django.apps import AppConfig  # type: ignore  # noqa: PGH003
 class DsbUserConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "app.dsb_user"
+
+    def ready(self) -> None:
+        import app.dsb_user.tasks  #type: ignore # noqa: PGH003, F401, PLC0415
@@ -38,6 +38,12 @@ class DsbUserCorporate(models.Model):
         related_query_name="updated_dsb_user_corporate",
         null=True,
     )
+    source_hash = models.CharField(  # noqa: DJ001
+        _("Hash of the Synced Columns (from Danasaham Core)"),
+        max_length=64,
+        blank=True,
+        null=True,
+    )
     initial_registration_date = models.DateTimeField(
         _("User Registration Date before Upgrade to Corporate (from Danasaham Core)"),
         blank=True,
@@ -68,6 +74,7 @@ class DsbUserCorporate(models.Model):
     corporate_pengurus_id = models.CharField(  # noqa: DJ001
         _("ID Pengurus of Corporate Investor (from Danasaham Core)"),
         max_length=36,
+        db_index=True,
         blank=True,
         null=True,
     )
@@ -52,6 +52,7 @@ class DsbUserCorporateSerializer(serializers.ModelSerializer):
             "created_date",
             "updated_date",
             "last_update_by",
+            "source_hash",
             "initial_registration_date",
             "user_name",
             "registered_user_email",
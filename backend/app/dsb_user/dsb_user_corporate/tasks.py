@@ -9,9 +9,9 @@ from app.dsb_user.dsb_user_corporate.models import (  #type: ignore # noqa: PGH0
     DsbUserCorporate,
 )
 from app.dsb_user.dsb_user_corporate.utils.utils import (  #type: ignore # noqa: PGH003
-    fetch_data_from_external_db,
-    save_data_to_model,
+    CORPORATE_SYNC,
 )
+from app.dsb_user.utils.sync import sync_dsb_users  #type: ignore # noqa: PGH003
 from app.user.models import User  #type: ignore # noqa: PGH003
 
 logger = logging.getLogger(__name__)
@@ -24,8 +24,8 @@ def process_dsb_user_corporate_document(
     ) -> None:
     """Process DSB User Corporate document.
 
-    This function fetches data from the external database, saves it to the model,
-    and updates the document status.
+    This function fetches the rows changed since the last sync from the external
+    database, with a periodic full sync, and saves them to the model.
 
     Args:
     ----
@@ -54,11 +54,8 @@ def process_dsb_user_corporate_document(
             msg = "User ID not found in context"
             raise ValueError(msg)
 
-        # Fetch data from the external database
-        data_frame = fetch_data_from_external_db()
-
-        # Save data to the model
-        save_data_to_model(data_frame, document_process_dsb_corporate_document, user_process_dsb_user_corporate_document)
+        # Fetch the changed rows from the external database and save them to the model
+        sync_dsb_users(CORPORATE_SYNC, document_process_dsb_corporate_document, user_process_dsb_user_corporate_document)
 
         # Log the processing information
         logger.info("Document %s is being processed.", document_process_dsb_corporate_document.pk)
@@ -38,6 +38,12 @@ class DsbUserPersonal(models.Model):
         related_query_name="user_updated_dsb_user_personal",
         null=True,
     )
+    source_hash = models.CharField(  # noqa: DJ001
+        _("Hash of the Synced Columns (from Danasaham Core)"),
+        max_length=64,
+        blank=True,
+        null=True,
+    )
     initial_registration_date = models.DateTimeField(
         _("User Initial Registration Date (from Danasaham Core)"),
         blank=True,
@@ -46,6 +52,7 @@ class DsbUserPersonal(models.Model):
     coredsb_user_id = models.CharField(  # noqa: DJ001
         _("ID of User From Danasaham Core"),
         max_length=36,
+        db_index=True,
         blank=True,
         null=True,
     )
@@ -60,6 +60,7 @@ class DsbUserPersonalSerializer(serializers.ModelSerializer):
             "created_date",
             "updated_date",
             "last_update_by",
+            "source_hash",
             "initial_registration_date",
             "coredsb_user_id",
             "user_upgrade_to_personal_date",
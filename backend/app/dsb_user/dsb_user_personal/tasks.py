@@ -9,9 +9,9 @@ from app.dsb_user.dsb_user_personal.models import (
     DsbUserPersonal,  #type: ignore # noqa: PGH003
 )
 from app.dsb_user.dsb_user_personal.utils.utils import (  #type: ignore # noqa: PGH003
-    fetch_data_from_external_db,
-    save_data_to_model,
+    PERSONAL_SYNC,
 )
+from app.dsb_user.utils.sync import sync_dsb_users  #type: ignore # noqa: PGH003
 from app.user.models import User  #type: ignore # noqa: PGH003
 
 logger = logging.getLogger(__name__)
@@ -24,8 +24,8 @@ def process_dsb_user_personal_document(
 ) -> None:
     """Process DSB User Personal document.
 
-    This function fetches data from the external database, saves it to the model,
-    and updates the document status.
+    This function fetches the rows changed since the last sync from the external
+    database, with a periodic full sync, and saves them to the model.
 
     Args:
     ----
@@ -54,11 +54,8 @@ def process_dsb_user_personal_document(
             msg = "User ID not found in context"
             raise ValueError(msg)  # noqa: TRY301
 
-        # Fetch data from the external database
-        df = fetch_data_from_external_db()  # noqa: PD901
-
-        # Save data to the model
-        save_data_to_model(df, document_process_dsb_personal_document, user_process_dsb_user_personal_document)
+        # Fetch the changed rows from the external database and save them to the model
+        sync_dsb_users(PERSONAL_SYNC, document_process_dsb_personal_document, user_process_dsb_user_personal_document)
 
         # Log the processing information
         logger.info("Document %s is being processed.", DsbUserPersonal.pk)
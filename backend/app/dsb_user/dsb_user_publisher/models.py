@@ -38,6 +38,12 @@ class DsbUserPublisher(models.Model):
         related_query_name="updated_dsb_user_publisher",
         null=True,
     )
+    source_hash = models.CharField(  # noqa: DJ001
+        _("Hash of the Synced Columns (from Danasaham Core)"),
+        max_length=64,
+        blank=True,
+        null=True,
+    )
     initial_registration_date = models.DateTimeField(
         _("User Initial Registration Date (from Danasaham Core)"),
         auto_now=False,
@@ -149,6 +155,7 @@ class DsbUserPublisher(models.Model):
     publisher_pengurus_id = models.CharField(  # noqa: DJ001
         _("Pengurus ID (from Danasaham Core)"),
         max_length=36,
+        db_index=True,
         null=True,
         blank=True,
     )
@@ -53,6 +53,7 @@ class DsbUserPublisherSerializer(serializers.ModelSerializer):
             "created_date",
             "updated_date",
             "last_update_by",
+            "source_hash",
             "initial_registration_date",
             "coredsb_user_id",
             "user_name",
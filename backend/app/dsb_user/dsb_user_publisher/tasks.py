@@ -9,9 +9,9 @@ from app.dsb_user.dsb_user_publisher.models import (  #type: ignore # noqa: PGH0
     DsbUserPublisher,
 )
 from app.dsb_user.dsb_user_publisher.utils.utils import (  #type: ignore # noqa: PGH003
-    fetch_data_from_external_db,
-    save_data_to_model,
+    PUBLISHER_SYNC,
 )
+from app.dsb_user.utils.sync import sync_dsb_users  #type: ignore # noqa: PGH003
 from app.user.models import User  #type: ignore # noqa: PGH003
 
 logger = logging.getLogger(__name__)
@@ -24,8 +24,8 @@ def process_dsb_user_publisher_document(
 ) -> None:
     """Process DSB User Publisher document.
 
-    This function fetches data from the external database, saves it to the model,
-    and updates the document status.
+    This function fetches the rows changed since the last sync from the external
+    database, with a periodic full sync, and saves them to the model.
 
     Args:
     ----
@@ -53,11 +53,8 @@ def process_dsb_user_publisher_document(
             msg = "User ID not found in context"
             raise ValueError(msg)
 
-        # Fetch data from the external database
-        df = fetch_data_from_external_db()  # noqa: PD901
-
-        # Save data to the model
-        save_data_to_model(df, document_process_dsb_publisher_document, user_process_dsb_user_publisher_document)
+        # Fetch the changed rows from the external database and save them to the model
+        sync_dsb_users(PUBLISHER_SYNC, document_process_dsb_publisher_document, user_process_dsb_user_publisher_document)
 
         # Log the processing information
         logger.info("Document %s is being processed.", DsbUserPublisher.pk)
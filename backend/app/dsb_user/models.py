@@ -0,0 +1,45 @@
+from __future__ import annotations
+
+from django.db import models  #type: ignore   # noqa: PGH003
+from django.utils.translation import gettext_lazy as _  # type: ignore   # noqa: PGH003
+
+from app.documents.models import Document  #type: ignore  # noqa: PGH003
+
+
+class DsbUserSyncState(models.Model):
+    source = models.CharField(
+        _("Danasaham Core Source"),
+        primary_key=True,
+        max_length=20,
+    )
+    document = models.ForeignKey(
+        Document,
+        on_delete=models.SET_NULL,
+        related_name="dsb_user_sync_states",
+        related_query_name="dsb_user_sync_state",
+        null=True,
+    )
+    watermark = models.DateTimeField(
+        _("Latest Last Modified Date Synced (from Danasaham Core)"),
+        blank=True,
+        null=True,
+    )
+    last_sync_date = models.DateTimeField(
+        _("Last Successful Sync Date"),
+        blank=True,
+        null=True,
+    )
+    last_full_sync_date = models.DateTimeField(
+        _("Last Successful Full Sync Date"),
+        blank=True,
+        null=True,
+    )
+    updated_date = models.DateTimeField(_("Entry Update Date"), auto_now=True)
+
+    class Meta:
+        db_table = "dsb_user_sync_state"
+        verbose_name = "DSB User Sync State"
+        verbose_name_plural = "DSB User Sync States"
+
+    def __str__(self) -> str:
+        return f"{self.source} - {self.watermark}"
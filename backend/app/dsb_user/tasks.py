@@ -0,0 +1,65 @@
+from __future__ import annotations
+
+import logging
+
+from celery import shared_task  #type: ignore # noqa: PGH003
+
+from app.documents.models import Document  #type: ignore # noqa: PGH003
+from app.dsb_user.dsb_user_corporate.utils.utils import (  #type: ignore # noqa: PGH003
+    CORPORATE_SYNC,
+)
+from app.dsb_user.dsb_user_personal.utils.utils import (  #type: ignore # noqa: PGH003
+    PERSONAL_SYNC,
+)
+from app.dsb_user.dsb_user_publisher.utils.utils import (  #type: ignore # noqa: PGH003
+    PUBLISHER_SYNC,
+)
+from app.dsb_user.utils.sync import sync_all_dsb_users  #type: ignore # noqa: PGH003
+from app.user.models import User  #type: ignore # noqa: PGH003
+
+logger = logging.getLogger(__name__)
+
+DSB_USER_SYNC_SOURCES = (PERSONAL_SYNC, PUBLISHER_SYNC, CORPORATE_SYNC)
+
+
+@shared_task()
+def process_dsb_user_documents(
+    user_id: str,
+    document_id: str,
+) -> None:
+    """Process the DSB User Personal, Publisher and Corporate documents together.
+
+    This function runs the three source queries at once on separate pooled connections
+    of the external database, then saves the rows of each source to its model.
+
+    Args:
+    ----
+        user_id (str): The ID of the user to process.
+        document_id (str): The ID of the document to process.
+
+    Raises:
+    ------
+        Document.DoesNotExist: If the document does not exist.
+        User.DoesNotExist: If the user does not exist.
+        Exception: If there is an error processing the document.
+
+    """
+    try:
+        document = Document.objects.get(pk=document_id)
+        user = User.objects.get(pk=user_id)
+
+        states = sync_all_dsb_users(DSB_USER_SYNC_SOURCES, document, user)
+
+        logger.info(
+            "Document %s synced the DSB users of %s.", document_id, ", ".join(states),
+        )
+
+    except Document.DoesNotExist:
+        logger.exception("Document with ID %s does not exist", document_id)
+        raise
+    except User.DoesNotExist:
+        logger.exception("User with ID %s does not exist", user_id)
+        raise
+    except Exception as e:
+        logger.exception("Error processing document %s: %s", document_id, str(e))  # noqa: TRY401
+        raise
@@ -0,0 +1,170 @@
+from __future__ import annotations
+
+import logging
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import TYPE_CHECKING, Any, TypeVar
+
+import pandas as pd  #type: ignore # noqa: PGH003
+from django.conf import settings  #type: ignore # noqa: PGH003
+from django.core.exceptions import ImproperlyConfigured  #type: ignore # noqa: PGH003
+from sqlalchemy import create_engine  #type: ignore # noqa: PGH003
+from sqlalchemy.engine import URL  #type: ignore # noqa: PGH003
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator, Mapping
+
+    from sqlalchemy.engine import Engine  #type: ignore # noqa: PGH003
+
+logger = logging.getLogger(__name__)
+
+EXTERNAL_DATABASE_ALIAS = "external"
+
+QueryKey = TypeVar("QueryKey")
+
+_engine_lock = threading.Lock()
+_engine: Engine | None = None
+_engine_pid: int | None = None
+
+
+def external_db_url() -> URL:
+    """To build the SQLAlchemy URL of the Danasaham core database from ``DATABASES["external"]``."""
+    config = settings.DATABASES.get(EXTERNAL_DATABASE_ALIAS)
+    if not config:
+        msg = "DATABASES['external'] is not configured, set the EXTERNAL_DB_* variables."
+        raise ImproperlyConfigured(msg)
+    return URL.create(
+        "postgresql+psycopg2",
+        username=config.get("USER") or None,
+        password=config.get("PASSWORD") or None,
+        host=config.get("HOST") or None,
+        port=int(config["PORT"]) if config.get("PORT") else None,
+        database=config.get("NAME") or None,
+    )
+
+
+def get_external_engine() -> Engine:
+    """To get the pooled engine of the Danasaham core database, one per process.
+
+    Connections are checked with a ping before use and recycled after
+    ``EXTERNAL_DB_POOL_RECYCLE`` seconds, so a connection the server dropped between
+    syncs is replaced instead of failing the query. A forked worker builds its own
+    engine rather than sharing the parent's sockets.
+    """
+    global _engine, _engine_pid  # noqa: PLW0603
+    with _engine_lock:
+        if _engine is None or _engine_pid != os.getpid():
+            if _engine is not None:
+                # Leave the parent's connections to the parent
+                _engine.dispose(close=False)
+            _engine = create_engine(
+                external_db_url(),
+                pool_size=settings.EXTERNAL_DB_POOL_SIZE,
+                max_overflow=settings.EXTERNAL_DB_MAX_OVERFLOW,
+                pool_timeout=settings.EXTERNAL_DB_POOL_TIMEOUT,
+                pool_recycle=settings.EXTERNAL_DB_POOL_RECYCLE,
+                pool_pre_ping=True,
+            )
+            _engine_pid = os.getpid()
+            logger.info(
+                "Created the external database engine with a pool of %d (+%d overflow) connections",
+                settings.EXTERNAL_DB_POOL_SIZE,
+                settings.EXTERNAL_DB_MAX_OVERFLOW,
+            )
+        return _engine
+
+
+def dispose_external_engine() -> None:
+    """To close every pooled connection, e.g. before the database credentials rotate."""
+    global _engine, _engine_pid  # noqa: PLW0603
+    with _engine_lock:
+        if _engine is not None:
+            _engine.dispose()
+        _engine = None
+        _engine_pid = None
+
+
+def read_external_sql(
+        query: str,
+        params: Mapping[str, Any] | None = None,
+    ) -> pd.DataFrame:
+    """To run a query on a pooled connection of the Danasaham core database.
+
+    Args:
+    ----
+        query (str): The query, with ``%(name)s`` parameters.
+        params (Mapping[str, Any] | None): The values of its parameters.
+
+    Returns:
+    -------
+        pd.DataFrame: The rows of the query.
+
+    """
+    with get_external_engine().connect() as connection:
+        if params is None:
+            return pd.read_sql_query(query, connection)
+        return pd.read_sql_query(query, connection, params=dict(params))
+
+
+def stream_external_sql(
+        query: str,
+        params: Mapping[str, Any] | None = None,
+        chunksize: int = 10000,
+    ) -> Iterator[pd.DataFrame]:
+    """To stream the rows of a query in chunks through a server-side cursor.
+
+    ``stream_results`` makes psycopg2 declare a named cursor, so the core database
+    keeps the result set and only ``chunksize`` rows at a time are held here. The
+    pooled connection stays checked out until the chunks are consumed or the
+    iterator is closed.
+
+    Args:
+    ----
+        query (str): The query, with ``%(name)s`` parameters.
+        params (Mapping[str, Any] | None): The values of its parameters.
+        chunksize (int): The rows of every chunk.
+
+    Returns:
+    -------
+        Iterator[pd.DataFrame]: The chunks of rows, at least one even when empty.
+
+    """
+    with get_external_engine().connect() as connection:
+        streaming = connection.execution_options(stream_results=True, max_row_buffer=chunksize)
+        yield from pd.read_sql_query(
+            query,
+            streaming,
+            params=dict(params) if params is not None else None,
+            chunksize=chunksize,
+        )
+
+
+def read_external_sql_many(  # noqa: UP047
+        queries: Mapping[QueryKey, tuple[str, Mapping[str, Any] | None]],
+    ) -> dict[QueryKey, pd.DataFrame]:
+    """To run several queries at once, each on its own pooled connection.
+
+    The queries wait on the core database, not on Python, so one thread per query
+    runs them side by side. The first failing query raises once all have finished.
+
+    Args:
+    ----
+        queries (Mapping[QueryKey, tuple[str, Mapping[str, Any] | None]]): The query
+            and parameters of every key.
+
+    Returns:
+    -------
+        dict[QueryKey, pd.DataFrame]: The rows of every query, by key.
+
+    """
+    if len(queries) <= 1:
+        return {key: read_external_sql(query, params) for key, (query, params) in queries.items()}
+
+    get_external_engine()
+    with ThreadPoolExecutor(max_workers=len(queries), thread_name_prefix="external-db") as executor:
+        futures = {
+            key: executor.submit(read_external_sql, query, params)
+            for key, (query, params) in queries.items()
+        }
+    return {key: future.result() for key, future in futures.items()}
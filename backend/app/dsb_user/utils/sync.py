@@ -0,0 +1,248 @@
+from __future__ import annotations
+
+import logging
+from contextlib import closing
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import TYPE_CHECKING, Any
+
+import pandas as pd  #type: ignore # noqa: PGH003
+from django.conf import settings  #type: ignore # noqa: PGH003
+from django.db import transaction  #type: ignore # noqa: PGH003
+from django.utils import timezone  #type: ignore # noqa: PGH003
+from sqlalchemy.dialects import postgresql  #type: ignore # noqa: PGH003
+
+from app.dsb_user.models import DsbUserSyncState  #type: ignore # noqa: PGH003
+from app.dsb_user.utils.external_db import (  #type: ignore # noqa: PGH003
+    read_external_sql_many,
+    stream_external_sql,
+)
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Iterable, Sequence
+    from pathlib import Path
+
+    from django.db import models  #type: ignore # noqa: PGH003
+
+    from app.documents.models import Document  #type: ignore # noqa: PGH003
+    from app.user.models import User  #type: ignore # noqa: PGH003
+
+logger = logging.getLogger(__name__)
+
+WATERMARK_PARAMETER = "watermark"
+
+
+@dataclass(frozen=True)
+class SyncSource:
+    """To describe how one kind of DSB user is synced from the Danasaham core database.
+
+    Attributes
+    ----------
+        name (str): The key of the source's ``DsbUserSyncState``.
+        model (type[models.Model]): The model the rows are saved to.
+        sql_file (Path): The full source query.
+        watermark_columns (tuple[str, ...]): The last modified date columns of the query.
+            A row is fetched again once any of them moves past the watermark.
+        save (Callable[[pd.DataFrame, Document, User], None]): Saves the fetched rows.
+
+    """
+
+    name: str
+    model: type[models.Model]
+    sql_file: Path
+    watermark_columns: tuple[str, ...]
+    save: Callable[[pd.DataFrame, Document, User], None]
+
+    def query(self, watermark: datetime | None = None) -> tuple[str, dict[str, Any] | None]:
+        """Return the source query and its parameters, only for the rows modified since ``watermark``."""
+        query = self.sql_file.read_text()
+        if watermark is None:
+            return query, None
+        return incremental_query(query, self.watermark_columns), {WATERMARK_PARAMETER: watermark}
+
+
+def incremental_query(
+        query: str,
+        watermark_columns: Sequence[str],
+    ) -> str:
+    """To restrict a source query to the rows modified at or after the watermark.
+
+    The query is wrapped rather than edited, so the ``.sql`` files stay the full
+    queries. Rows at the watermark itself are fetched again, saving them twice is
+    harmless while skipping a row committed in the same instant is not.
+
+    Args:
+    ----
+        query (str): The full source query.
+        watermark_columns (Sequence[str]): The last modified date columns it selects.
+
+    Returns:
+    -------
+        str: The query, taking the watermark as the ``%(watermark)s`` parameter.
+
+    """
+    preparer = postgresql.dialect().identifier_preparer
+    columns = ", ".join(preparer.quote_identifier(column) for column in watermark_columns)
+    # The query is one of the bundled .sql files and the columns are quoted
+    # identifiers, the watermark itself is bound as a parameter
+    return (
+        f"SELECT * FROM (\n{query.strip().rstrip(';')}\n) AS source_rows\n"  # noqa: S608
+        f"WHERE GREATEST({columns}) >= %({WATERMARK_PARAMETER})s"
+    )
+
+
+def source_watermark(
+        df: pd.DataFrame,
+        watermark_columns: Sequence[str],
+        current: datetime | None = None,
+    ) -> datetime | None:
+    """To find the latest last modified date of the fetched rows.
+
+    The watermark comes from the source's own dates, so the clocks of this server
+    and of the core database never have to agree.
+    """
+    latest: Any = current
+    for column in watermark_columns:
+        value = df[column].max() if column in df and len(df) else None
+        if value is not None and not pd.isna(value) and (latest is None or value > latest):
+            latest = value
+    return latest.to_pydatetime() if isinstance(latest, pd.Timestamp) else latest
+
+
+def incremental_watermark(state: DsbUserSyncState) -> datetime | None:
+    """To pick the watermark of the next sync, None when a full sync is due.
+
+    A full sync runs when incremental syncs are turned off, on the first sync, when
+    the document the last sync linked its rows to is gone, and every
+    ``DSB_USER_FULL_SYNC_INTERVAL_HOURS``. The full sync is the safety net for what
+    an incremental one misses: changes that do not touch a last modified date, such
+    as a renamed lookup, and rows committed late with an older date.
+    """
+    if not settings.DSB_USER_INCREMENTAL_SYNC:
+        return None
+    if state.watermark is None or state.document_id is None or state.last_full_sync_date is None:
+        return None
+    if timezone.now() - state.last_full_sync_date >= timedelta(hours=settings.DSB_USER_FULL_SYNC_INTERVAL_HOURS):
+        return None
+    return state.watermark
+
+
+def sync_dsb_users(
+        source: SyncSource,
+        document: Document,
+        user: User,
+    ) -> DsbUserSyncState:
+    """To sync the DSB users of a source, incrementally when its watermark allows it.
+
+    Scoring reads the DSB users linked to the document, so an incremental sync first
+    moves the rows the previous sync linked to the new document in one update, then
+    saves the fetched rows. Every chunk is saved in its own transaction and the
+    watermark only moves once the last one is saved; a full sync clears it until then,
+    so the sync after a failed one is a full sync again.
+
+    Args:
+    ----
+        source (SyncSource): The source to sync.
+        document (Document): The document the synced rows are linked to.
+        user (User): The user the sync runs for.
+
+    Returns:
+    -------
+        DsbUserSyncState: The state of the source after the sync.
+
+    """
+    return sync_all_dsb_users((source,), document, user)[source.name]
+
+
+def sync_all_dsb_users(
+        sources: Sequence[SyncSource],
+        document: Document,
+        user: User,
+    ) -> dict[str, DsbUserSyncState]:
+    """To sync the DSB users of several sources, one transaction per saved chunk.
+
+    With ``DSB_USER_SYNC_CHUNK_SIZE`` set, every source query is streamed through a
+    server-side cursor and each chunk is saved as soon as it arrives, so memory stays
+    flat however many users the core database holds; the sources then run one after
+    the other. At 0 the source queries run side by side on separate pooled
+    connections and their whole results are saved one source at a time.
+
+    Args:
+    ----
+        sources (Sequence[SyncSource]): The sources to sync.
+        document (Document): The document the synced rows are linked to.
+        user (User): The user the sync runs for.
+
+    Returns:
+    -------
+        dict[str, DsbUserSyncState]: The state of every source after the sync, by name.
+
+    """
+    states: dict[str, DsbUserSyncState] = {}
+    watermarks: dict[str, datetime | None] = {}
+    for source in sources:
+        states[source.name], _ = DsbUserSyncState.objects.get_or_create(source=source.name)
+        watermarks[source.name] = incremental_watermark(states[source.name])
+
+    chunk_size = settings.DSB_USER_SYNC_CHUNK_SIZE
+    if chunk_size:
+        for source in sources:
+            query, params = source.query(watermarks[source.name])
+            with closing(stream_external_sql(query, params, chunksize=chunk_size)) as chunks:
+                _save_source(source, chunks, states[source.name], watermarks[source.name], document=document, user=user)
+        return states
+
+    fetched = read_external_sql_many({
+        source.name: source.query(watermarks[source.name]) for source in sources
+    })
+    for source in sources:
+        _save_source(source, (fetched[source.name],), states[source.name], watermarks[source.name], document=document, user=user)
+    return states
+
+
+def _save_source(  # noqa: PLR0913
+        source: SyncSource,
+        chunks: Iterable[pd.DataFrame],
+        state: DsbUserSyncState,
+        watermark: datetime | None,
+        *,
+        document: Document,
+        user: User,
+    ) -> None:
+    relinked = 0
+    with transaction.atomic():
+        if watermark is not None:
+            relinked = source.model.objects.filter(document_id=state.document_id).update(
+                document=document,
+                last_update_by=user,
+            )
+        # Rows move to the document chunk by chunk, so a sync failing part way leaves
+        # the state pointing at it, without a watermark when it was a full sync
+        state.document = document
+        state.watermark = watermark
+        state.save(update_fields=["document", "watermark"])
+
+    fetched = 0
+    latest = watermark
+    for df in chunks:
+        with transaction.atomic():
+            source.save(df, document, user)
+        fetched += len(df)
+        latest = source_watermark(df, source.watermark_columns, latest)
+
+    now = timezone.now()
+    state.watermark = latest
+    state.last_sync_date = now
+    if watermark is None:
+        state.last_full_sync_date = now
+    with transaction.atomic():
+        state.save(update_fields=["watermark", "last_sync_date", "last_full_sync_date"])
+
+    logger.info(
+        "%s sync of DSB user %s: %d rows fetched, %d unchanged rows relinked, watermark %s",
+        "Full" if watermark is None else "Incremental",
+        source.name,
+        fetched,
+        relinked,
+        state.watermark,
+    )
@@ -0,0 +1,209 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import TYPE_CHECKING, Any
+
+import pandas as pd  #type: ignore # noqa: PGH003
+from django.conf import settings  #type: ignore # noqa: PGH003
+from django.db import transaction  #type: ignore # noqa: PGH003
+from django.utils import timezone  #type: ignore # noqa: PGH003
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator, Mapping, Sequence
+
+    from django.db import models  #type: ignore # noqa: PGH003
+
+    from app.documents.models import Document  #type: ignore # noqa: PGH003
+    from app.user.models import User  #type: ignore # noqa: PGH003
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class UpsertSpec:
+    """To describe how the rows of a source query are upserted into a DSB user model.
+
+    Attributes
+    ----------
+        model (type[models.Model]): The model the rows are saved to.
+        key_field (str): The model field identifying a row in the core database.
+        update_fields (tuple[str, ...]): Every other field filled from the query, they
+            are rewritten when the row changes and make up its ``source_hash``.
+        columns (Mapping[str, str]): The query column of every model field not named
+            after it.
+
+    """
+
+    model: type[models.Model]
+    key_field: str
+    update_fields: tuple[str, ...]
+    columns: Mapping[str, str] = field(default_factory=dict)
+
+    @property
+    def fields(self) -> tuple[str, ...]:
+        """Every model field filled from the query."""
+        return tuple(dict.fromkeys((self.key_field, *self.update_fields)))
+
+
+def _python_value(value: Any) -> Any:
+    """To turn the NaN, NaT and Timestamp values of a DataFrame into model values."""
+    if isinstance(value, pd.Timestamp):
+        return value.to_pydatetime()
+    if value is None or (not isinstance(value, str) and pd.isna(value)):
+        return None
+    return value
+
+
+def _hash_value(value: Any) -> Any:
+    # A chunk with a null in an integer column reads it as float, hash 5.0 as 5
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+
+def source_hash(spec: UpsertSpec, record: Mapping[str, Any]) -> str:
+    """To hash every field of a fetched row that is filled from the query.
+
+    Args:
+    ----
+        spec (UpsertSpec): How the rows map onto the model.
+        record (Mapping[str, Any]): The model field values of the row.
+
+    Returns:
+    -------
+        str: The SHA-256 hex digest of the key and the update fields, ``spec.fields``.
+
+    """
+    values = [_hash_value(record[name]) for name in spec.fields]
+    payload = json.dumps(values, default=str, ensure_ascii=False, separators=(",", ":"))
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def source_records(
+        spec: UpsertSpec,
+        df: pd.DataFrame,
+    ) -> dict[Any, dict[str, Any]]:
+    """To read the fetched rows as model field values and hash, keyed by their core ID.
+
+    Rows without a core ID cannot be matched to a stored row and are skipped; the
+    last of several rows with the same ID wins.
+    """
+    names = {spec.columns.get(name, name): name for name in spec.fields}
+    records: dict[Any, dict[str, Any]] = {}
+    skipped = 0
+    for row in df[list(names)].rename(columns=names).to_dict("records"):
+        record = {name: _python_value(value) for name, value in row.items()}
+        if record[spec.key_field] is None:
+            skipped += 1
+            continue
+        record["source_hash"] = source_hash(spec, record)
+        records[record[spec.key_field]] = record
+    if skipped:
+        logger.warning("Skipped %d %s rows without %s", skipped, spec.model.__name__, spec.key_field)
+    return records
+
+
+def _batches(items: Sequence[Any], batch_size: int) -> Iterator[Sequence[Any]]:
+    for start in range(0, len(items), batch_size):
+        yield items[start:start + batch_size]
+
+
+def upsert_dsb_users(
+        spec: UpsertSpec,
+        df: pd.DataFrame,
+        document: Document,
+        user: User,
+        batch_size: int | None = None,
+    ) -> dict[str, int]:
+    """To save the fetched rows of a source with a handful of set-based queries.
+
+    The stored hashes and document links of the fetched core IDs are loaded in
+    batches, so a chunk of a streamed sync only reads its own rows, and compared with
+    the hashes of the fetched rows:
+
+    - new rows are created with ``bulk_create``;
+    - rows whose hash changed get their update fields rewritten with ``bulk_update``;
+    - unchanged rows linked to another document are relinked in one ``UPDATE`` per
+      batch without touching ``updated_date``, those already linked to it (e.g. by an
+      incremental sync) are left alone.
+
+    Args:
+    ----
+        spec (UpsertSpec): How the rows map onto the model.
+        df (pd.DataFrame): The fetched rows.
+        document (Document): The document the rows are linked to.
+        user (User): The user the sync runs for.
+        batch_size (int | None): Rows per statement, ``DSB_USER_SYNC_BATCH_SIZE`` by default.
+
+    Returns:
+    -------
+        dict[str, int]: The number of rows ``created``, ``updated``, ``relinked`` and
+        left ``unchanged``.
+
+    """
+    batch_size = max(batch_size or settings.DSB_USER_SYNC_BATCH_SIZE, 1)
+    model = spec.model
+    records = source_records(spec, df)
+
+    existing: dict[Any, tuple[Any, str | None, Any]] = {}
+    for keys in _batches(list(records), batch_size):
+        existing.update(
+            (key, (pk, stored_hash, document_id))
+            for key, pk, stored_hash, document_id in model.objects.filter(**{f"{spec.key_field}__in": keys})
+            .values_list(spec.key_field, "pk", "source_hash", "document_id")
+        )
+
+    now = timezone.now()
+    to_create: list[models.Model] = []
+    to_update: list[models.Model] = []
+    to_relink: list[Any] = []
+    unchanged = 0
+    for key, record in records.items():
+        if key not in existing:
+            to_create.append(model(**record, document=document, last_update_by=None))
+            continue
+
+        pk, stored_hash, document_id = existing[key]
+        if stored_hash == record["source_hash"]:
+            if str(document_id) == str(document.pk):
+                unchanged += 1
+            else:
+                to_relink.append(pk)
+            continue
+        instance = model(pk=pk, document=document, last_update_by=user, updated_date=now)
+        for name in (*spec.update_fields, "source_hash"):
+            setattr(instance, name, record[name])
+        to_update.append(instance)
+
+    with transaction.atomic():
+        model.objects.bulk_create(to_create, batch_size=batch_size)
+        model.objects.bulk_update(
+            to_update,
+            ["document", "last_update_by", "updated_date", *spec.update_fields, "source_hash"],
+            batch_size=batch_size,
+        )
+        for pks in _batches(to_relink, batch_size):
+            # Leave updated_date alone, scoring reads it as the last change of the row
+            model.objects.filter(pk__in=pks).update(document=document, last_update_by=user)
+
+    summary = {
+        "created": len(to_create),
+        "updated": len(to_update),
+        "relinked": len(to_relink),
+        "unchanged": unchanged,
+    }
+    logger.info(
+        "Upserted %s rows: %d created, %d updated, %d relinked, %d unchanged",
+        model.__name__,
+        summary["created"],
+        summary["updated"],
+        summary["relinked"],
+        summary["unchanged"],
+    )
+    return summary
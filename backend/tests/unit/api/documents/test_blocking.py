@@ -0,0 +1,99 @@
+from __future__ import annotations
+
+from django.test import SimpleTestCase  #type: ignore # noqa: PGH003
+
+from app.documents.utils.blocking import (  #type: ignore # noqa: PGH003
+    BlockingKeys,
+    CandidateBlocker,
+    blocking_summary,
+    combine_blocking_summaries,
+    normalize_identifier,
+    phonetic_key,
+    sample_pruned_pairs,
+)
+
+
+class PhoneticKeyTestCase(SimpleTestCase):
+
+    def test_spelling_variants_share_a_key(self) -> None:
+        for variants in (
+            ("Muhammad", "Mohamad", "Muhamad"),
+            ("Soeharto", "Suharto"),
+            ("Djoko", "Joko", "Yoko"),
+            ("Achmad", "Ahmad"),
+            ("Jusuf", "Yusuf"),
+        ):
+            assert len({phonetic_key(variant) for variant in variants}) == 1, variants  # noqa: S101
+
+    def test_different_names_do_not_share_a_key(self) -> None:
+        assert phonetic_key("Budi") != phonetic_key("Siti")  # noqa: S101
+        assert phonetic_key("A") == ""  # noqa: S101
+
+    def test_identifiers_are_normalized(self) -> None:
+        assert normalize_identifier(" 3174-0912 3456 ") == "317409123456"  # noqa: S101
+        assert normalize_identifier("-") == ""  # noqa: S101
+        assert normalize_identifier(None) == ""  # noqa: S101
+
+
+class CandidateBlockerTestCase(SimpleTestCase):
+
+    def setUp(self) -> None:
+        self.blocker = CandidateBlocker([
+            BlockingKeys(names=["Budi Santoso"], identifiers=["3174091234560001"], birth_dates=["1980-05-01"]),
+            BlockingKeys(names=["Muhamad Yusuf"], birth_dates=["1975-02-11"]),
+            BlockingKeys(names=["Muhammad Jusuf"], birth_dates=["1990-02-11"]),
+            BlockingKeys(names=["Siti Aminah"]),
+            BlockingKeys(names=["Abubakar"]),
+        ])
+
+    def test_identifier_hit_ignores_names_and_years(self) -> None:
+        keys = BlockingKeys(names=["Unrelated"], identifiers=["3174 0912 3456 0001"], birth_dates=["1950"])
+        assert self.blocker.candidates(keys) == [0]  # noqa: S101
+
+    def test_name_hits_are_limited_by_birth_year_window(self) -> None:
+        keys = BlockingKeys(names=["Mohammad Yoesoef"], birth_dates=["12/03/1976"])
+        assert self.blocker.candidates(keys) == [1]  # noqa: S101
+
+    def test_name_hits_without_birth_years(self) -> None:
+        assert self.blocker.candidates(BlockingKeys(names=["Mohammad Yoesoef"])) == [1, 2]  # noqa: S101
+        assert self.blocker.candidates(BlockingKeys(names=["Abu Bakar Ba'asyir"])) == [4]  # noqa: S101
+        assert self.blocker.candidates(BlockingKeys(names=["Dewi Lestari"])) == []  # noqa: S101
+
+
+class BlockingSummaryTestCase(SimpleTestCase):
+
+    def test_sample_only_draws_pruned_pairs(self) -> None:
+        candidates = [[0, 1], [], [2]]
+
+        every_pruned = sample_pruned_pairs(candidates, entity_count=3, sample_size=100)
+        assert len(every_pruned) == 6  # noqa: S101
+        sampled = sample_pruned_pairs(candidates, entity_count=3, sample_size=4, seed=1)
+        assert len(sampled) == 4  # noqa: S101
+        assert all(entity not in candidates[dttot] for entity, dttot in sampled)  # noqa: S101
+
+    def test_recall_is_estimated_from_the_sample(self) -> None:
+        summary = blocking_summary(
+            total_pairs=1000,
+            candidate_pairs=100,
+            candidate_matches=9,
+            sampled_pairs=100,
+            sampled_matches=1,
+        )
+
+        assert summary["pruned_pairs"] == 900  # noqa: S101
+        assert summary["pruning_ratio"] == 0.9  # noqa: S101
+        assert summary["recall"] == 0.5  # noqa: S101
+
+    def test_shard_summaries_are_added_up(self) -> None:
+        first = blocking_summary(
+            total_pairs=500, candidate_pairs=50, candidate_matches=4, sampled_pairs=50, sampled_matches=0,
+        )
+        second = blocking_summary(
+            total_pairs=500, candidate_pairs=50, candidate_matches=5, sampled_pairs=50, sampled_matches=1,
+        )
+
+        summary = combine_blocking_summaries([first, second])
+
+        assert summary["total_pairs"] == 1000  # noqa: S101
+        assert summary["candidate_matches"] == 9  # noqa: S101
+        assert summary["recall"] == 0.5  # noqa: S101
@@ -13,6 +13,7 @@ from app.documents.utils.data_preparation import (  #type: ignore # noqa: PGH003
     DTTOTDocumentProcessing,
     ExtractNIKandPassportNumber,
     FormattingColumn,
+    NationalityResolver,
 )
 
 # Ensure that openpyxl is used for handling Excel files
@@ -41,6 +42,15 @@ Jane Smith,Guru Honorer,Orang"""
         expected_columns = ["Nama", "Deskripsi", "Terduga"]
         assert list(df.columns) == expected_columns  # noqa: S101
 
+    def test_import_document_chunks_csv(self) -> None:
+        """Test streaming a CSV document in fixed-size chunks."""
+        chunks = list(self.processing.import_document_chunks(self.csv_file_path, "CSV", 1))
+        assert [len(chunk) for chunk in chunks] == [1, 1]  # noqa: S101
+        pd.testing.assert_frame_equal(
+            pd.concat(chunks),
+            self.processing.import_document(self.csv_file_path, "CSV"),
+        )
+
 def test_extract_aliases_from_names(self) -> None:  # noqa: ANN001, ARG001
         """Test extracting aliases from names based on ' Alias ' keyword."""
         # Instantiate the processing class
@@ -151,6 +161,18 @@ class DTTOTDocumentProcessingXLSTests(TestCase):
         assert list(df.columns) == expected_columns  # noqa: S101
         assert not df.empty  # noqa: S101
 
+    def test_import_document_chunks_xlsx(self) -> None:
+        """Test streaming an XLSX document in fixed-size chunks through read-only openpyxl.
+        The concatenated chunks must match the DataFrame returned by ``import_document``.
+        """  # noqa: D205
+        chunks = list(self.processing.import_document_chunks(self.xls_file_path, "XLSX", 1))
+        assert [len(chunk) for chunk in chunks] == [1, 1]  # noqa: S101
+        pd.testing.assert_frame_equal(
+            pd.concat(chunks),
+            self.processing.import_document(self.xls_file_path, "XLSX"),
+            check_index_type=False,
+        )
+
     def test_extract_aliases_from_names(self) -> None:
         """Test the extraction of aliases from full names within the imported document. This test
         checks whether the extraction and separation of names and aliases are performed accurately,
@@ -339,6 +361,46 @@ class DTTOTDocumentProcessingXLSTests(TestCase):
             check_dtype=False,
         )
 
+    def test_extract_every_idNumber_and_Paspor_match(self) -> None:  # noqa: N802
+        """Test that every NIK and passport number in a cell is extracted and stripped,
+        and that a NIK is never reported as a passport number.
+        """  # noqa: D205
+        input_df = pd.DataFrame(
+            {
+                "description_1": [
+                    "- NIK 1234567898765432 dan 6543210987654321;",
+                    "- NIK 1232546589765954",
+                    None,
+                ],
+                "description_2": [
+                    "- paspor A0987654; B 5438675",
+                    "- pekerjaan: Karyawan Swasta",
+                    "- paspor PA6574873",
+                ],
+            },
+        )
+
+        processed_df = self.processing_extract.extract_nik_and_passport_number(input_df)
+
+        assert processed_df["description_1"].tolist() == ["- NIK  dan ;", "- NIK", None]  # noqa: S101
+        assert processed_df["description_2"].tolist() == [  # noqa: S101
+            "- paspor ;",
+            "- pekerjaan: Karyawan Swasta",
+            "- paspor",
+        ]
+        assert processed_df["idNumber"].tolist() == ["1234567898765432", "1232546589765954", ""]  # noqa: S101
+        assert processed_df["passport_number"].tolist() == ["A0987654", "", "PA6574873"]  # noqa: S101
+        assert processed_df["id_numbers"].tolist() == [  # noqa: S101
+            ["1234567898765432", "6543210987654321"],
+            ["1232546589765954"],
+            [],
+        ]
+        assert processed_df["passport_numbers"].tolist() == [  # noqa: S101
+            ["A0987654", "B 5438675"],
+            [],
+            ["PA6574873"],
+        ]
+
     def test_separating_description(self) -> None:
         """Test separating per bulletpoint in `Deskripsi` column to sequennce of
         description column (description_{number of sequence}).
@@ -412,10 +474,10 @@ class DTTOTDocumentProcessingXLSTests(TestCase):
             "description_1": [
                 "'- NIK nomor: 1234567898765432",
                 "'- NIK 1232546589765954;",
-                "- NIK 9087654536287512;",
-                "- didirikan pada tahun 1940 oleh Indriyana Nurhayati;",
-                "1. NIK 7765484598234123;",
-                "- NIK 6654786328764102",
+                "NIK 9087654536287512;",
+                "didirikan pada tahun 1940 oleh Indriyana Nurhayati;",
+                "NIK 7765484598234123;",
+                "NIK 6654786328764102",
                 "'- Terafiliasi dengan madagascar;",
             ],
             "description_2": [
@@ -423,7 +485,7 @@ class DTTOTDocumentProcessingXLSTests(TestCase):
                 "'- paspor PA6574873",
                 "'- paspor 7865473 (dikeluarkan oleh madagascar);",
                 "beberapa anggota terbutki secara sah melakukan penipuan",
-                "2. no. paspor A 4876576",
+                "no. paspor A 4876576",
                 "Pendidikan SLTA/Sederajat",
                 "'- NIK 2234574598760954;",
             ],
@@ -437,13 +499,13 @@ class DTTOTDocumentProcessingXLSTests(TestCase):
                 "'- Badut banget sih;",
             ],
             "description_4": [
-                "",
+                None,
                 "'- relawan The SintoSintoBule",
-                "",
-                "",
-                "",
-                "- paspor B 5438675;",
-                "",
+                None,
+                None,
+                None,
+                "paspor B 5438675;",
+                None,
             ],
         }
 
@@ -492,6 +554,27 @@ class DTTOTDocumentProcessingXLSTests(TestCase):
                 )
                 assert processed_non_empty <= expected_non_empty, f"Column {column_name} has more non-empty entries than expected."  # noqa: S101
 
+    def test_separating_description_counts_overflow_rows(self) -> None:
+        """Test that descriptions are capped at nine columns and overflowing rows are counted."""
+        input_df = pd.DataFrame(
+            {
+                "Deskripsi": [
+                    "\n".join(f"- keterangan {i};" for i in range(1, 12)),
+                    "- NIK 6654786328764102",
+                    None,
+                ],
+            },
+        )
+
+        processing_separating = CleaningSeparatingDeskripsi()
+        processed_df = processing_separating.separating_cleaning_deskripsi(input_df)
+
+        assert list(processed_df.columns) == [f"description_{i}" for i in range(1, 10)]  # noqa: S101
+        assert processed_df.loc[0, "description_9"] == "keterangan 9;"  # noqa: S101
+        assert processed_df.loc[1, "description_1"] == "NIK 6654786328764102"  # noqa: S101
+        assert processed_df.loc[2].isna().all()  # noqa: S101
+        assert processing_separating.overflow_rows == 1  # noqa: S101
+
     def test_birth_date_formatting(self) -> None:
         """Test formatting value from `Tgl lahir` column thas has different formatting style for each row.."""
         # Given input DataFrame with different formatting style in `Tgl lahir` column
@@ -696,3 +779,13 @@ class DTTOTDocumentProcessingXLSTests(TestCase):
             check_like=True,
             check_dtype=False,
         )
+
+    def test_nationality_resolver_matches_exact_and_similar_names(self) -> None:
+        """Test that the nationality resolver answers exact, similar and unknown names."""
+        resolver = NationalityResolver(self.processing_formatting.country_dict)
+
+        assert resolver.resolve("INDONESIA") == "Indonesia"  # noqa: S101
+        assert resolver.resolve("Etiopia") == "Ethiopia"  # noqa: S101
+        assert resolver.resolve("banglades") == "Bangladesh"  # noqa: S101
+        assert resolver.resolve("Negara Antah Berantah") == "Negara Antah Berantah"  # noqa: S101
+        assert resolver.resolve("Etiopia") == "Ethiopia"  # noqa: S101
@@ -0,0 +1,61 @@
+from __future__ import annotations
+
+import numpy as np  #type: ignore # noqa: PGH003
+from django.test import SimpleTestCase  #type: ignore # noqa: PGH003
+
+from app.documents.utils.identifiers import (  #type: ignore # noqa: PGH003
+    IDENTIFIER_NEAR_MATCH_SCORE,
+    IdentifierIndex,
+    identifier_score,
+    identifier_similarity,
+    identifier_similarity_matrix,
+    within_one_edit,
+)
+
+
+class IdentifierScoreTestCase(SimpleTestCase):
+
+    def test_within_one_edit(self) -> None:
+        assert within_one_edit("3174091234", "3174091234")  # noqa: S101
+        assert within_one_edit("3174091234", "3174191234")  # noqa: S101
+        assert within_one_edit("3174091234", "317409234")  # noqa: S101
+        assert within_one_edit("317409234", "3174091234")  # noqa: S101
+        assert not within_one_edit("3174091234", "3147091234")  # noqa: S101
+        assert not within_one_edit("3174091234", "31740912")  # noqa: S101
+
+    def test_identifier_score_normalizes_values(self) -> None:
+        assert identifier_score("3174-0912-3456", "3174 0912 3456") == 1.0  # noqa: S101
+        assert identifier_score("a1234567", "A1234568") == IDENTIFIER_NEAR_MATCH_SCORE  # noqa: S101
+        assert identifier_score("A1234567", "B7654321") == 0.0  # noqa: S101
+        assert identifier_score("-", "-") == 0.0  # noqa: S101
+        assert identifier_similarity(None, ["A1234567", None, "3174091234"]) == [0.0, 0.0]  # noqa: S101
+
+
+class IdentifierIndexTestCase(SimpleTestCase):
+
+    def test_match_finds_exact_and_one_edit_entries(self) -> None:
+        index = IdentifierIndex([
+            ["3174091234560001", "A1234567"],
+            ["3174091234560002", None],
+            ["317409123456001"],
+            ["9999999999999999"],
+            ["3174091234560010"],
+        ])
+
+        assert index.match("3174 0912 3456 0001") == {  # noqa: S101
+            0: 1.0,
+            1: IDENTIFIER_NEAR_MATCH_SCORE,
+            2: IDENTIFIER_NEAR_MATCH_SCORE,
+        }
+        assert index.match("A1234567") == {0: 1.0}  # noqa: S101
+        assert index.match("0000") == {}  # noqa: S101
+
+    def test_matrix_matches_pairwise_scores(self) -> None:
+        values = ["3174091234560001", None, "A1234568", "B0000000"]
+        groups = [["3174091234560001", "A1234567"], [], ["A1234568", None], ["3174091234560011"]]
+
+        expected = np.array([
+            [max(identifier_similarity(value, group), default=0.0) for group in groups]
+            for value in values
+        ])
+        np.testing.assert_allclose(identifier_similarity_matrix(values, groups), expected)
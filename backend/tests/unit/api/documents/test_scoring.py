@@ -0,0 +1,140 @@
+from __future__ import annotations
+
+import tempfile
+import uuid
+from types import SimpleNamespace
+
+import numpy as np  #type: ignore # noqa: PGH003
+import pytest  #type: ignore # noqa: PGH003
+import spacy  #type: ignore # noqa: PGH003
+from django.core.cache import caches  #type: ignore # noqa: PGH003
+from django.test import TestCase  #type: ignore # noqa: PGH003
+
+from app.documents.utils.scoring import (  #type: ignore # noqa: PGH003
+    PAIR_SCORE_CACHE_ALIAS,
+    FieldSpec,
+    PairScoreCache,
+    ScoringEngine,
+    get_similarity_pipeline,
+    invalidate_pair_scores,
+)
+
+TEST_SCORE_FIELDS = [
+    FieldSpec("user_name_scores", ["dttot_first_name", "dttot_alias_name_1"], 0.5),
+    FieldSpec("personal_nik_scores", ["dttot_nik_ktp", "dttot_passport_number"], 0.3, identifier=True),
+    FieldSpec("personal_birth_place_scores", ["dttot_birth_place"], 0.2),
+]
+
+
+@pytest.mark.usefixtures("disable_mock_atomic")
+class ScoringEngineTestCase(TestCase):
+
+    @classmethod
+    def setUpClass(cls) -> None:
+        super().setUpClass()
+        nlp = spacy.blank("xx")
+        nlp.add_pipe("tok2vec")
+        nlp.initialize()
+        nlp.meta["name"] = f"test_{uuid.uuid4().hex}"
+        cls.model_dir = tempfile.TemporaryDirectory()
+        nlp.to_disk(cls.model_dir.name)
+        cls.engine = ScoringEngine(TEST_SCORE_FIELDS, model=cls.model_dir.name)
+
+    @classmethod
+    def tearDownClass(cls) -> None:
+        get_similarity_pipeline.cache_clear()
+        cls.model_dir.cleanup()
+        super().tearDownClass()
+
+    def test_field_specs(self) -> None:
+        assert TEST_SCORE_FIELDS[0].source == "user_name"  # noqa: S101
+        assert self.engine.weights["personal_nik_scores"] == 0.3  # noqa: S101
+        assert self.engine.identifier_fields == frozenset({"personal_nik_scores"})  # noqa: S101
+        assert self.engine.nlp is get_similarity_pipeline(self.model_dir.name)  # noqa: S101
+
+    def test_score_matches_aggregated_pairwise_scores(self) -> None:
+        entities = [
+            {"user_name": "Abu Bakar", "personal_nik": "3174091234560001", "personal_birth_place": "Jakarta"},
+            {"user_name": "John Doe", "personal_nik": None, "personal_birth_place": None},
+            {"user_name": None, "personal_nik": "3174091234560002", "personal_birth_place": "Solo"},
+        ]
+        dttots = [
+            SimpleNamespace(
+                dttot_first_name="Abu Bakar Ba'asyir", dttot_alias_name_1="Abu",
+                dttot_nik_ktp="3174091234560001", dttot_passport_number=None, dttot_birth_place="Jombang",
+            ),
+            SimpleNamespace(
+                dttot_first_name="Jane Doe", dttot_alias_name_1=None,
+                dttot_nik_ktp=None, dttot_passport_number=None, dttot_birth_place=None,
+            ),
+        ]
+
+        self.engine.prefetch(entities, dttots)
+        expected = np.array([
+            [self.engine.aggregate(self.engine.similarity_scores(entity, dttot)) for dttot in dttots]
+            for entity in entities
+        ])
+        np.testing.assert_allclose(self.engine.score(entities, dttots), expected, atol=1e-5)
+
+    def test_hashes_only_change_with_scored_values(self) -> None:
+        entity = {"user_name": "Abu  Bakar", "personal_nik": "3174-0912-3456-0001", "other": "x"}
+        same = {"user_name": "Abu Bakar", "personal_nik": "3174091234560001", "other": "y"}
+        changed = {"user_name": "Abu Bakr", "personal_nik": "3174091234560001"}
+
+        assert self.engine.entity_hash(entity) == self.engine.entity_hash(same)  # noqa: S101
+        assert self.engine.entity_hash(entity) != self.engine.entity_hash(changed)  # noqa: S101
+        reweighted = ScoringEngine(
+            [FieldSpec(spec.key, spec.dttot_fields, 0.1, spec.identifier) for spec in TEST_SCORE_FIELDS],
+            model=self.model_dir.name,
+        )
+        assert reweighted.fingerprint != self.engine.fingerprint  # noqa: S101
+
+    def test_pair_scores_are_cached_until_invalidated(self) -> None:
+        pair_cache = PairScoreCache(self.engine, caches[PAIR_SCORE_CACHE_ALIAS])
+        pair_cache.set_many({("dttot-1", "entity-1"): 0.75})
+
+        found = pair_cache.get_many({"a": ("dttot-1", "entity-1"), "b": ("dttot-1", "entity-2")})
+        assert found == {"a": 0.75}  # noqa: S101
+        assert (pair_cache.hits, pair_cache.misses) == (1, 1)  # noqa: S101
+
+        invalidate_pair_scores(self.model_dir.name)
+        pair_cache = PairScoreCache(self.engine, caches[PAIR_SCORE_CACHE_ALIAS])
+        assert pair_cache.get_many({"a": ("dttot-1", "entity-1")}) == {}  # noqa: S101
+
+    def test_generation_is_read_once_per_cache(self) -> None:
+        pair_cache = PairScoreCache(self.engine, caches[PAIR_SCORE_CACHE_ALIAS])
+        with self.assertNumQueries(1):
+            pair_cache.set_many({("dttot-1", "entity-1"): 0.75})
+            pair_cache.set_many({("dttot-2", "entity-1"): 0.5})
+            pair_cache.get_many({"a": ("dttot-1", "entity-1")})
+
+    def test_invalidation_survives_a_cleared_cache(self) -> None:
+        shared = caches[PAIR_SCORE_CACHE_ALIAS]
+        pair_cache = PairScoreCache(self.engine, shared)
+        stale_key = f"{pair_cache.prefix}:dttot-1:entity-1"
+
+        assert invalidate_pair_scores(self.model_dir.name) == 1  # noqa: S101
+        shared.clear()
+        shared.set(stale_key, 0.75)
+
+        assert PairScoreCache(self.engine, shared).get_many({"a": ("dttot-1", "entity-1")}) == {}  # noqa: S101
+        assert invalidate_pair_scores(self.model_dir.name) == 2  # noqa: S101, PLR2004
+
+    def test_floor_abandons_pairs_that_cannot_reach_it(self) -> None:
+        entities = [
+            {"user_name": "Abu Bakar", "personal_nik": "3174091234560001", "personal_birth_place": "Jombang"},
+            {"user_name": "John Doe", "personal_nik": "9999999999999999", "personal_birth_place": "Solo"},
+        ]
+        dttots = [
+            SimpleNamespace(
+                dttot_first_name="Abu Bakar", dttot_alias_name_1=None,
+                dttot_nik_ktp="3174091234560001", dttot_passport_number=None, dttot_birth_place="Jombang",
+            ),
+        ]
+
+        unfloored = self.engine.score(entities, dttots)
+        floored = self.engine.score(entities, dttots, floor=0.8)
+        assert floored[0, 0] == unfloored[0, 0]  # noqa: S101
+        assert np.isnan(floored[1, 0])  # noqa: S101
+        assert self.engine.score_pair(entities[0], dttots[0], floor=0.8) == pytest.approx(unfloored[0, 0], abs=1e-5)  # noqa: S101
+        assert np.isnan(self.engine.score_pair(entities[1], dttots[0], floor=0.8))  # noqa: S101
@@ -0,0 +1,132 @@
+from __future__ import annotations
+
+import tempfile
+import uuid
+import warnings
+
+import numpy as np  #type: ignore # noqa: PGH003
+import spacy  #type: ignore # noqa: PGH003
+from django.core.cache.backends.locmem import LocMemCache  #type: ignore # noqa: PGH003
+from django.test import SimpleTestCase  #type: ignore # noqa: PGH003
+
+from app.documents.utils.similarity import (  #type: ignore # noqa: PGH003
+    EmbeddingCache,
+    StringEmbeddings,
+    entity_similarity_matrix,
+    group_similarity_matrix,
+    load_similarity_pipeline,
+    token_similarities,
+)
+
+
+def build_pipeline() -> spacy.Language:
+    """To build a small pipeline whose token vectors come from the tensor, like the scoring model."""
+    nlp = spacy.blank("xx")
+    nlp.add_pipe("tok2vec")
+    nlp.initialize()
+    # Randomly initialized, so it must not share cached embeddings with other pipelines
+    nlp.meta["name"] = f"test_{uuid.uuid4().hex}"
+    return nlp
+
+
+class EntitySimilarityMatrixTestCase(SimpleTestCase):
+
+    @classmethod
+    def setUpClass(cls) -> None:
+        super().setUpClass()
+        cls.nlp = build_pipeline()
+
+    def token_similarity(self, str1: str | None, str2: str) -> float:
+        if not str1:
+            return 0.0
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore")
+            return max(token1.similarity(token2) for token1 in self.nlp(str1) for token2 in self.nlp(str2))
+
+    def test_matrix_matches_pairwise_token_similarity(self) -> None:
+        entity_strings = ["Abu Bakar", None, "John Doe", "Abu Bakar", "Siti"]
+        dttot_groups = [
+            ["Abu Bakar Ba'asyir", None, "Abu"],
+            [],
+            ["Jane Doe", "Muhammad Yusuf"],
+        ]
+
+        scores = entity_similarity_matrix(self.nlp, entity_strings, dttot_groups)
+
+        expected = np.array([
+            [max([self.token_similarity(string, value) for value in group if value], default=0.0) for group in dttot_groups]
+            for string in entity_strings
+        ])
+        np.testing.assert_allclose(scores, expected, atol=1e-5)
+        assert scores[0, 0] == 1.0  # noqa: S101
+        assert not scores[1].any()  # noqa: S101
+        assert not scores[:, 1].any()  # noqa: S101
+
+    def test_block_size_does_not_change_scores(self) -> None:
+        left = StringEmbeddings(self.nlp, ["Abu Bakar", "John Doe", "Siti Aisyah binti Abdul"])
+        groups = [["Abu Bakar Ba'asyir"], ["Jane Doe", "Muhammad Yusuf"]]
+        right = StringEmbeddings(self.nlp, [value for group in groups for value in group])
+
+        np.testing.assert_allclose(
+            group_similarity_matrix(left, right, groups, block_tokens=1),
+            group_similarity_matrix(left, right, groups),
+            atol=1e-6,
+        )
+
+
+class EmbeddingCacheTestCase(SimpleTestCase):
+
+    @classmethod
+    def setUpClass(cls) -> None:
+        super().setUpClass()
+        cls.nlp = build_pipeline()
+
+    def test_token_similarities_match_spacy(self) -> None:
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore")
+            expected = [
+                token1.similarity(token2)
+                for token1 in self.nlp("Abu Bakar")
+                for token2 in self.nlp("Abu Bakar Ba'asyir")
+            ]
+
+        np.testing.assert_allclose(
+            token_similarities(self.nlp, "Abu  Bakar", "Abu Bakar Ba'asyir"), expected, atol=1e-5,
+        )
+        assert token_similarities(self.nlp, "Abu Bakar", None) == [0.0]  # noqa: S101
+        assert token_similarities(self.nlp, " ", "Abu Bakar") == [0.0]  # noqa: S101
+
+    def test_strings_are_parsed_once_across_tiers(self) -> None:
+        shared = LocMemCache(f"embeddings-{uuid.uuid4().hex}", {})
+        cache = EmbeddingCache(self.nlp, maxsize=10, shared=shared)
+
+        first = cache.get_many(["Abu Bakar", "John Doe", "Abu Bakar"])
+        cache.get_many(["Abu Bakar"])
+        assert cache.stats()["misses"] == 2  # noqa: S101
+        assert cache.stats()["memory_hits"] == 1  # noqa: S101
+
+        # A fresh process only has the shared tier
+        restarted = EmbeddingCache(self.nlp, maxsize=10, shared=shared)
+        second = restarted.get_many(["John Doe"])
+        assert restarted.stats()["shared_hits"] == 1  # noqa: S101
+        assert restarted.stats()["misses"] == 0  # noqa: S101
+        np.testing.assert_array_equal(second["John Doe"][1], first["John Doe"][1])
+
+    def test_batch_size_does_not_change_embeddings(self) -> None:
+        strings = ["Abu Bakar", "John Doe", "Siti Aisyah binti Abdul"]
+
+        batched = EmbeddingCache(self.nlp, maxsize=10, batch_size=2).get_many(strings)
+        single = EmbeddingCache(self.nlp, maxsize=10, batch_size=1).get_many(strings)
+        for string in strings:
+            np.testing.assert_array_equal(batched[string][0], single[string][0])
+            np.testing.assert_allclose(batched[string][1], single[string][1], atol=1e-6)
+
+    def test_pipeline_only_keeps_vector_components(self) -> None:
+        nlp = build_pipeline()
+        nlp.add_pipe("sentencizer")
+        with tempfile.TemporaryDirectory() as path:
+            nlp.to_disk(path)
+            loaded = load_similarity_pipeline(path)
+
+        assert loaded.pipe_names == ["tok2vec"]  # noqa: S101
+        assert loaded.disabled == ["sentencizer"]  # noqa: S101
@@ -0,0 +1,216 @@
+from __future__ import annotations
+
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import TYPE_CHECKING
+from unittest import mock
+
+import pandas as pd  #type: ignore # noqa: PGH003
+import pytest  #type: ignore # noqa: PGH003
+from django.test import SimpleTestCase, TestCase, override_settings  #type: ignore # noqa: PGH003
+from django.utils import timezone as django_timezone  #type: ignore # noqa: PGH003
+
+from app.documents.models import Document  #type: ignore # noqa: PGH003
+from app.dsb_user.dsb_user_personal.models import DsbUserPersonal  #type: ignore # noqa: PGH003
+from app.dsb_user.models import DsbUserSyncState  #type: ignore # noqa: PGH003
+from app.dsb_user.utils.sync import (  #type: ignore # noqa: PGH003
+    SyncSource,
+    incremental_query,
+    source_watermark,
+    sync_all_dsb_users,
+    sync_dsb_users,
+)
+from app.user.models import User  #type: ignore # noqa: PGH003
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator
+
+TEST_USER_PASSWORD = "testpassword"  # noqa: S105
+WATERMARK_COLUMNS = ("users_last_modified_date", "personal_last_modified_date")
+PERSONAL_SQL = (
+    Path(__file__).parents[4] / "app" / "dsb_user" / "dsb_user_personal" / "utils" / "dsb_user_personal.sql"
+)
+
+
+class SyncQueryTestCase(SimpleTestCase):
+
+    def test_incremental_query_wraps_the_full_query(self) -> None:
+        query = incremental_query("SELECT 1 AS a;\n", WATERMARK_COLUMNS)
+
+        assert query.startswith("SELECT * FROM (\nSELECT 1 AS a\n) AS source_rows")  # noqa: S101
+        assert query.endswith(  # noqa: S101
+            'WHERE GREATEST("users_last_modified_date", "personal_last_modified_date") >= %(watermark)s',
+        )
+
+    def test_source_watermark_is_the_latest_date(self) -> None:
+        df = pd.DataFrame({  # noqa: PD901
+            "users_last_modified_date": pd.to_datetime(["2024-01-01", None]),
+            "personal_last_modified_date": pd.to_datetime(["2024-03-01", "2024-02-01"]),
+        })
+
+        assert source_watermark(df, WATERMARK_COLUMNS) == datetime(2024, 3, 1)  # noqa: DTZ001, S101
+        assert source_watermark(df, WATERMARK_COLUMNS, datetime(2024, 4, 1)) == datetime(2024, 4, 1)  # noqa: DTZ001, S101
+        assert source_watermark(df.iloc[:0], WATERMARK_COLUMNS) is None  # noqa: S101
+
+
+class SyncDsbUsersTestCase(TestCase):
+
+    def setUp(self) -> None:
+        self.user = User.objects.create_user(
+            email="test@example.com",
+            username="testuser",
+            password=TEST_USER_PASSWORD,
+        )
+        self.fetched: list[datetime | None] = []
+        self.rows = pd.DataFrame({
+            "user_id": ["core-1"],
+            "users_last_modified_date": [datetime(2024, 3, 1, tzinfo=timezone.utc)],
+            "personal_last_modified_date": [None],
+        })
+        self.source = SyncSource(
+            name="personal",
+            model=DsbUserPersonal,
+            sql_file=PERSONAL_SQL,
+            watermark_columns=WATERMARK_COLUMNS,
+            save=self.save,
+        )
+        for name, side_effect in (("read_external_sql_many", self.read), ("stream_external_sql", self.stream)):
+            patcher = mock.patch(f"app.dsb_user.utils.sync.{name}", side_effect=side_effect)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def fetch(self, query: str, params: dict | None) -> None:
+        watermark = params["watermark"] if params else None
+        assert ("AS source_rows" in query) == (watermark is not None)  # noqa: S101
+        self.fetched.append(watermark)
+
+    def read(self, queries: dict) -> dict[str, pd.DataFrame]:
+        for query, params in queries.values():
+            self.fetch(query, params)
+        return dict.fromkeys(queries, self.rows)
+
+    def stream(self, query: str, params: dict | None, chunksize: int) -> Iterator[pd.DataFrame]:
+        self.fetch(query, params)
+        for start in range(0, max(len(self.rows), 1), chunksize):
+            yield self.rows.iloc[start:start + chunksize]
+
+    @staticmethod
+    def save(df: pd.DataFrame, document: Document, user: User) -> None:
+        for user_id in df["user_id"]:
+            DsbUserPersonal.objects.update_or_create(
+                coredsb_user_id=user_id,
+                defaults={"document": document, "last_update_by": user},
+            )
+
+    def create_document(self) -> Document:
+        return Document.objects.create(
+            document_type="DTTOT Report",
+            document_name="test",
+            document_file_type="XLSX",
+        )
+
+    def test_first_sync_is_full_then_incremental(self) -> None:
+        first = self.create_document()
+        state = sync_dsb_users(self.source, first, self.user)
+
+        assert self.fetched == [None]  # noqa: S101
+        assert state.watermark == datetime(2024, 3, 1, tzinfo=timezone.utc)  # noqa: S101
+        assert state.last_full_sync_date is not None  # noqa: S101
+
+        DsbUserPersonal.objects.create(coredsb_user_id="core-2", document=first)
+        self.rows = self.rows.iloc[:0]
+        second = self.create_document()
+        sync_dsb_users(self.source, second, self.user)
+
+        assert self.fetched == [None, datetime(2024, 3, 1, tzinfo=timezone.utc)]  # noqa: S101
+        # Unchanged rows of the previous sync are linked to the new document
+        assert DsbUserPersonal.objects.filter(document=second).count() == 2  # noqa: S101
+        assert DsbUserSyncState.objects.get(source="personal").watermark == datetime(  # noqa: S101
+            2024, 3, 1, tzinfo=timezone.utc,
+        )
+
+    def test_full_sync_runs_again_after_the_interval(self) -> None:
+        sync_dsb_users(self.source, self.create_document(), self.user)
+        DsbUserSyncState.objects.filter(source="personal").update(
+            last_full_sync_date=django_timezone.now() - timedelta(hours=25),
+        )
+
+        with override_settings(DSB_USER_FULL_SYNC_INTERVAL_HOURS=24):
+            sync_dsb_users(self.source, self.create_document(), self.user)
+        with override_settings(DSB_USER_INCREMENTAL_SYNC=False):
+            sync_dsb_users(self.source, self.create_document(), self.user)
+
+        assert self.fetched == [None, None, None]  # noqa: S101
+
+    @override_settings(DSB_USER_SYNC_CHUNK_SIZE=2)
+    def test_streamed_rows_are_saved_in_chunks(self) -> None:
+        self.rows = pd.DataFrame({
+            "user_id": ["core-1", "core-2", "core-3"],
+            "users_last_modified_date": [datetime(2024, 3, d, tzinfo=timezone.utc) for d in (1, 5, 2)],
+            "personal_last_modified_date": [None, None, None],
+        })
+        saved: list[int] = []
+        source = SyncSource(
+            name="personal",
+            model=DsbUserPersonal,
+            sql_file=PERSONAL_SQL,
+            watermark_columns=WATERMARK_COLUMNS,
+            save=lambda df, document, user: saved.append(len(df)),  # noqa: ARG005
+        )
+
+        state = sync_dsb_users(source, self.create_document(), self.user)
+
+        assert saved == [2, 1]  # noqa: S101
+        # The watermark is the latest date of every chunk
+        assert state.watermark == datetime(2024, 3, 5, tzinfo=timezone.utc)  # noqa: S101
+
+    @override_settings(DSB_USER_SYNC_CHUNK_SIZE=1)
+    def test_failed_sync_keeps_saved_chunks_and_runs_full_again(self) -> None:
+        self.rows = pd.DataFrame({
+            "user_id": ["core-1", "core-2"],
+            "users_last_modified_date": [datetime(2024, 3, 1, tzinfo=timezone.utc)] * 2,
+            "personal_last_modified_date": [None, None],
+        })
+
+        def save(df: pd.DataFrame, document: Document, user: User) -> None:
+            if "core-2" in set(df["user_id"]):
+                msg = "Core database went away"
+                raise ConnectionError(msg)
+            self.save(df, document, user)
+
+        source = SyncSource(
+            name="personal",
+            model=DsbUserPersonal,
+            sql_file=PERSONAL_SQL,
+            watermark_columns=WATERMARK_COLUMNS,
+            save=save,
+        )
+        document = self.create_document()
+        with pytest.raises(ConnectionError):
+            sync_dsb_users(source, document, self.user)
+
+        # The first chunk stays saved, the state points at its document without a watermark
+        assert DsbUserPersonal.objects.filter(document=document).count() == 1  # noqa: S101
+        state = DsbUserSyncState.objects.get(source="personal")
+        assert str(state.document_id) == str(document.pk)  # noqa: S101
+        assert (state.watermark, state.last_sync_date) == (None, None)  # noqa: S101
+
+        sync_dsb_users(self.source, self.create_document(), self.user)
+        assert self.fetched == [None, None]  # noqa: S101
+
+    @override_settings(DSB_USER_SYNC_CHUNK_SIZE=0)
+    def test_sources_are_fetched_together(self) -> None:
+        corporate = SyncSource(
+            name="corporate",
+            model=DsbUserPersonal,
+            sql_file=PERSONAL_SQL,
+            watermark_columns=WATERMARK_COLUMNS,
+            save=lambda df, document, user: None,  # noqa: ARG005
+        )
+
+        states = sync_all_dsb_users((self.source, corporate), self.create_document(), self.user)
+
+        assert list(states) == ["personal", "corporate"]  # noqa: S101
+        # One call fetching both sources
+        assert self.fetched == [None, None]  # noqa: S101
+        assert DsbUserSyncState.objects.count() == 2  # noqa: S101, PLR2004
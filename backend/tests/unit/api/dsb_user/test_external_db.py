@@ -0,0 +1,71 @@
+from __future__ import annotations
+
+import threading
+from unittest import mock
+
+import pandas as pd  #type: ignore # noqa: PGH003
+import pytest  #type: ignore # noqa: PGH003
+from django.core.exceptions import ImproperlyConfigured  #type: ignore # noqa: PGH003
+from django.test import SimpleTestCase, override_settings  #type: ignore # noqa: PGH003
+
+from app.dsb_user.utils import external_db  #type: ignore # noqa: PGH003
+
+EXTERNAL_DATABASE = {
+    "ENGINE": "django.db.backends.postgresql",
+    "NAME": "core",
+    "USER": "reader",
+    "PASSWORD": "p@ss:word/1",  # noqa: S105
+    "HOST": "core-db",
+    "PORT": "5432",
+}
+
+
+class ExternalDbTestCase(SimpleTestCase):
+
+    def tearDown(self) -> None:
+        external_db.dispose_external_engine()
+
+    def test_url_is_built_from_the_external_database(self) -> None:
+        with override_settings(DATABASES={"default": {}, "external": EXTERNAL_DATABASE}):
+            url = external_db.external_db_url()
+
+        assert (url.host, url.port, url.database, url.username) == ("core-db", 5432, "core", "reader")  # noqa: S101
+        assert url.password == EXTERNAL_DATABASE["PASSWORD"]  # noqa: S101
+
+    def test_url_requires_the_external_database(self) -> None:
+        with override_settings(DATABASES={"default": {}}), pytest.raises(ImproperlyConfigured):
+            external_db.external_db_url()
+
+    def test_engine_is_shared_and_pooled(self) -> None:
+        with override_settings(
+            DATABASES={"default": {}, "external": EXTERNAL_DATABASE},
+            EXTERNAL_DB_POOL_SIZE=4,
+        ):
+            engine = external_db.get_external_engine()
+
+            assert external_db.get_external_engine() is engine  # noqa: S101
+            assert engine.pool.size() == 4  # noqa: S101, PLR2004
+
+    def test_queries_run_on_separate_threads(self) -> None:
+        barrier = threading.Barrier(3, timeout=5)
+
+        def read(query: str, params: dict | None) -> pd.DataFrame:
+            # Every query waits for the others, so they only finish when run side by side
+            barrier.wait()
+            return pd.DataFrame({"query": [query], "params": [params]})
+
+        with (
+            override_settings(DATABASES={"default": {}, "external": EXTERNAL_DATABASE}),
+            mock.patch.object(external_db, "read_external_sql", side_effect=read),
+        ):
+            fetched = external_db.read_external_sql_many({
+                "personal": ("SELECT 1", None),
+                "publisher": ("SELECT 2", None),
+                "corporate": ("SELECT 3", {"watermark": 1}),
+            })
+
+        assert {name: df["query"][0] for name, df in fetched.items()} == {  # noqa: S101
+            "personal": "SELECT 1",
+            "publisher": "SELECT 2",
+            "corporate": "SELECT 3",
+        }
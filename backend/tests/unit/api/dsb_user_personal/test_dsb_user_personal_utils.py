@@ -0,0 +1,136 @@
+from __future__ import annotations
+
+from datetime import datetime, timezone
+
+import pandas as pd  #type: ignore # noqa: PGH003
+from django.test import TestCase  #type: ignore # noqa: PGH003
+
+from app.documents.models import Document  #type: ignore # noqa: PGH003
+from app.dsb_user.dsb_user_personal.models import DsbUserPersonal  #type: ignore # noqa: PGH003
+from app.dsb_user.dsb_user_personal.utils.utils import (  #type: ignore # noqa: PGH003
+    PERSONAL_UPSERT,
+    save_data_to_model,
+)
+from app.dsb_user.utils.upsert import (  #type: ignore # noqa: PGH003
+    source_hash,
+    source_records,
+    upsert_dsb_users,
+)
+from app.user.models import User  #type: ignore # noqa: PGH003
+
+TEST_USER_PASSWORD = "Testp@ss!23"  # noqa: S105
+OLD_DATE = datetime(2024, 1, 1, tzinfo=timezone.utc)
+NEW_DATE = datetime(2024, 2, 1, tzinfo=timezone.utc)
+
+
+def personal_row(user_id: str, name: str, users_date: datetime, personal_date: datetime) -> dict:
+    return {
+        "user_id": user_id,
+        "initial_registration_date": OLD_DATE,
+        "user_name": name,
+        "users_email_registered": f"{user_id}@example.com",
+        "users_last_modified_date": users_date,
+        "user_upgrade_to_personal_date": OLD_DATE,
+        "personal_name": name,
+        "personal_phone_number": "0812345678",
+        "personal_gender": "M",
+        "personal_nik": "3174091234560001",
+        "personal_birth_date": None,
+        "personal_ksei_sre": None,
+        "personal_ksei_sid": None,
+        "personal_spouse_name": None,
+        "personal_mother_name": "Siti",
+        "personal_last_modified_date": personal_date,
+        "personal_domicile_address": "Jakarta",
+        "personal_domicile_address_postalcode": "10110",
+        "personal_investment_goals": None,
+        "personal_marital_status": None,
+        "personal_birth_place": "Jakarta",
+        "personal_nationality": "Indonesia",
+        "personal_source_of_fund": None,
+    }
+
+
+class SaveDataToModelTestCase(TestCase):
+
+    def setUp(self) -> None:
+        self.user = User.objects.create_user(
+            email="test@example.com",
+            username="testuser",
+            password=TEST_USER_PASSWORD,
+        )
+        self.document = Document.objects.create(
+            document_type="DTTOT Report",
+            document_name="test",
+            document_file_type="XLSX",
+        )
+
+    def test_source_records_map_columns_and_skip_rows_without_id(self) -> None:
+        df = pd.DataFrame([  # noqa: PD901
+            personal_row("core-1", "John", OLD_DATE, OLD_DATE),
+            personal_row(None, "Nobody", OLD_DATE, OLD_DATE),
+        ])
+
+        records = source_records(PERSONAL_UPSERT, df)
+
+        assert list(records) == ["core-1"]  # noqa: S101
+        assert records["core-1"]["coredsb_user_id"] == "core-1"  # noqa: S101
+        assert records["core-1"]["personal_legal_last_modified_date"] == OLD_DATE  # noqa: S101
+        assert records["core-1"]["personal_birth_date"] is None  # noqa: S101
+
+    def test_rows_are_created_updated_and_relinked(self) -> None:
+        save_data_to_model(pd.DataFrame([
+            personal_row("core-1", "John", OLD_DATE, OLD_DATE),
+            personal_row("core-2", "Jane", OLD_DATE, OLD_DATE),
+            personal_row("core-3", "Ali", OLD_DATE, OLD_DATE),
+        ]), self.document, self.user)
+        assert DsbUserPersonal.objects.filter(document=self.document).count() == 3  # noqa: S101, PLR2004
+
+        new_document = Document.objects.create(
+            document_type="DTTOT Report",
+            document_name="test 2",
+            document_file_type="XLSX",
+        )
+        summary = upsert_dsb_users(PERSONAL_UPSERT, pd.DataFrame([
+            personal_row("core-1", "Johnny", NEW_DATE, OLD_DATE),
+            # Changed without a new last modified date, the hash still catches it
+            personal_row("core-2", "Janet", OLD_DATE, OLD_DATE),
+            personal_row("core-3", "Ali", OLD_DATE, OLD_DATE),
+            personal_row("core-4", "Budi", OLD_DATE, OLD_DATE),
+        ]), new_document, self.user)
+
+        assert summary == {"created": 1, "updated": 2, "relinked": 1, "unchanged": 0}  # noqa: S101
+        rows = {row.coredsb_user_id: row for row in DsbUserPersonal.objects.all()}
+        assert len(rows) == 4  # noqa: S101, PLR2004
+        assert all(row.document_id == str(new_document.pk) for row in rows.values())  # noqa: S101
+        assert (rows["core-1"].user_name, rows["core-1"].personal_name) == ("Johnny", "Johnny")  # noqa: S101
+        assert (rows["core-2"].user_name, rows["core-2"].personal_name) == ("Janet", "Janet")  # noqa: S101
+        assert rows["core-3"].last_update_by_id == str(self.user.pk)  # noqa: S101
+        assert rows["core-4"].last_update_by_id is None  # noqa: S101
+
+    def test_unchanged_rows_already_linked_are_not_written(self) -> None:
+        df = pd.DataFrame([personal_row("core-1", "John", OLD_DATE, OLD_DATE)])  # noqa: PD901
+        save_data_to_model(df, self.document, self.user)
+
+        with self.assertNumQueries(1):
+            summary = upsert_dsb_users(PERSONAL_UPSERT, df, self.document, self.user)
+
+        assert summary == {"created": 0, "updated": 0, "relinked": 0, "unchanged": 1}  # noqa: S101
+
+    def test_every_mapped_column_is_hashed_and_rewritten(self) -> None:
+        save_data_to_model(pd.DataFrame([personal_row("core-1", "John", OLD_DATE, OLD_DATE)]), self.document, self.user)
+
+        summary = upsert_dsb_users(PERSONAL_UPSERT, pd.DataFrame([
+            {**personal_row("core-1", "John", OLD_DATE, OLD_DATE), "initial_registration_date": NEW_DATE},
+        ]), self.document, self.user)
+
+        assert summary["updated"] == 1  # noqa: S101
+        assert DsbUserPersonal.objects.get().initial_registration_date == NEW_DATE  # noqa: S101
+
+    def test_source_hash_ignores_integral_floats(self) -> None:
+        record = source_records(PERSONAL_UPSERT, pd.DataFrame([personal_row("core-1", "John", OLD_DATE, OLD_DATE)]))
+        floats = {**record["core-1"], "personal_ksei_sid": 5.0}
+        ints = {**record["core-1"], "personal_ksei_sid": 5}
+
+        assert source_hash(PERSONAL_UPSERT, floats) == source_hash(PERSONAL_UPSERT, ints)  # noqa: S101
+        assert source_hash(PERSONAL_UPSERT, ints) != record["core-1"]["source_hash"]  # noqa: S101
@@ -0,0 +1,48 @@
+from __future__ import annotations  # noqa: N999
+
+from unittest import mock
+
+from django.test import TestCase, override_settings  #type: ignore # noqa: PGH003
+
+from app.documents.dttotDoc.dttotDocReport.models import (  #type: ignore # noqa: PGH003
+    DttotDocReport,
+)
+from app.documents.dttotDoc.dttotDocReport.tasks import (  #type: ignore # noqa: PGH003
+    mark_dttot_scoring_failed,
+)
+from app.documents.dttotDoc.models import DttotDoc  #type: ignore # noqa: PGH003
+from app.documents.dttotDoc.tasks import dispatch_dttot_scoring  #type: ignore # noqa: PGH003
+from app.documents.dttotDoc.utils import previous_dttot_report  #type: ignore # noqa: PGH003
+from app.documents.models import Document  #type: ignore # noqa: PGH003
+
+
+class ScoringChordTestCase(TestCase):
+
+    def setUp(self) -> None:
+        self.document = Document.objects.create(
+            document_type="DTTOT Report",
+            document_name="test",
+            document_file_type="XLSX",
+        )
+        self.report = DttotDocReport.objects.create(document=self.document, status_doc="Initialized")
+        DttotDoc.objects.create(document=self.document, dttot_kode_densus="EDD-013")
+
+    @override_settings(DTTOT_SCORING_SHARD_SIZE=10)
+    def test_chord_marks_the_report_failed_on_error(self) -> None:
+        with mock.patch("app.documents.dttotDoc.tasks.chord") as chord:
+            assert dispatch_dttot_scoring(self.document.pk) == 3  # noqa: S101, PLR2004
+
+        body = chord.return_value.call_args.args[0]
+        assert body.options["link_error"] == [mark_dttot_scoring_failed.si(self.document.pk)]  # noqa: S101
+
+    def test_failed_scoring_is_not_a_previous_report(self) -> None:
+        mark_dttot_scoring_failed(self.document.pk)
+
+        self.report.refresh_from_db()
+        assert self.report.status_doc == "ERROR"  # noqa: S101
+        next_document = Document.objects.create(
+            document_type="DTTOT Report",
+            document_name="next",
+            document_file_type="XLSX",
+        )
+        assert previous_dttot_report(next_document.pk) is None  # noqa: S101
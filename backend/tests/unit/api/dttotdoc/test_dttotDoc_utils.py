@@ -0,0 +1,416 @@
+from __future__ import annotations  # noqa: N999
+
+from datetime import timedelta
+
+import pandas as pd  #type: ignore # noqa: PGH003
+from django.test import SimpleTestCase, TestCase  #type: ignore # noqa: PGH003
+
+from app.documents.dttotDoc.dttotDocReport.models import (  #type: ignore # noqa: PGH003
+    DttotDocReport,
+)
+from app.documents.dttotDoc.dttotDocReport.tasks import (  #type: ignore # noqa: PGH003
+    update_dttotdoc_report_score,
+)
+from app.documents.dttotDoc.dttotDocReportPersonal.models import (  #type: ignore # noqa: PGH003
+    DttotDocReportPersonal,
+)
+from app.documents.dttotDoc.models import DttotDoc  #type: ignore # noqa: PGH003
+from app.documents.dttotDoc.utils import (  #type: ignore # noqa: PGH003
+    KodeDensusIndex,
+    ReportRowWriter,
+    bulk_handle_dttot_documents,
+    carry_over_report_rows,
+    dttot_scoring_batches,
+    find_reusable_dttot_document,
+    previous_dttot_report,
+    reuse_dttot_document_results,
+    save_scored_rows,
+    save_scored_shard_rows,
+    shard_dttot_ids,
+    split_dttot_docs_to_score,
+)
+from app.documents.models import Document  #type: ignore # noqa: PGH003
+from app.dsb_user.dsb_user_personal.models import (  #type: ignore # noqa: PGH003
+    DsbUserPersonal,
+)
+from app.user.models import User  #type: ignore # noqa: PGH003
+
+TEST_USER_PASSWORD = "Testp@ss!23"  # noqa: S105
+
+
+class KodeDensusIndexTestCase(SimpleTestCase):
+
+    def test_find_returns_exact_and_near_duplicates(self) -> None:
+        index = KodeDensusIndex(["EDD-013", "EDD-014", "TERRORIST-LIST-2024-ENTRY-0001"])
+
+        assert index.find("EDD-013") == "EDD-013"  # noqa: S101
+        assert index.find("EDD-015") is None  # noqa: S101
+        assert index.find("TERRORIST-LIST-2024-ENTRY-001") == "TERRORIST-LIST-2024-ENTRY-0001"  # noqa: S101
+        assert index.find(None) is None  # noqa: S101
+
+    def test_add_and_discard_update_the_index(self) -> None:
+        index = KodeDensusIndex()
+        index.add("TERRORIST-LIST-2024-ENTRY-0002")
+        assert index.find("TERRORIST-LIST-2024-ENTRY-002") == "TERRORIST-LIST-2024-ENTRY-0002"  # noqa: S101
+
+        index.discard("TERRORIST-LIST-2024-ENTRY-0002")
+        assert len(index) == 0  # noqa: S101
+        assert index.find("TERRORIST-LIST-2024-ENTRY-002") is None  # noqa: S101
+
+
+class ScoringShardsTestCase(SimpleTestCase):
+
+    def test_shard_dttot_ids_splits_in_blocks(self) -> None:
+        assert shard_dttot_ids(["a", "b", "c", "d", "e"], 2) == [["a", "b"], ["c", "d"], ["e"]]  # noqa: S101
+        assert shard_dttot_ids(["a", "b"], 0) == [["a"], ["b"]]  # noqa: S101
+        assert shard_dttot_ids([], 100) == []  # noqa: S101
+
+
+class ReportRowWriterTestCase(TestCase):
+
+    def setUp(self) -> None:
+        self.document = Document.objects.create(
+            document_type="DTTOT Report",
+            document_name="test",
+            document_file_type="XLSX",
+        )
+        self.report = DttotDocReport.objects.create(document=self.document, status_doc="Initialized")
+
+    def test_rows_are_saved_with_the_kode_densus_of_their_entry(self) -> None:
+        first = DttotDoc.objects.create(document=self.document, dttot_kode_densus="EDD-013")
+        second = DttotDoc.objects.create(document=self.document, dttot_kode_densus="EDD-014")
+
+        saved = save_scored_rows(
+            self.report,
+            [["user-1", str(first.dttot_id), 0.91], ["user-2", str(second.dttot_id), 0.2]],
+            "personal",
+        )
+
+        assert saved == 2  # noqa: S101
+        rows = DttotDocReportPersonal.objects.filter(dttotdoc_report=self.report).order_by("dsb_user_personal")
+        assert [(row.dsb_user_personal, row.kode_densus_personal) for row in rows] == [  # noqa: S101
+            ("user-1", "EDD-013"),
+            ("user-2", "EDD-014"),
+        ]
+
+    def test_already_reported_pairs_are_skipped(self) -> None:
+        DttotDocReportPersonal.objects.create(
+            dttotdoc_report=self.report,
+            dsb_user_personal="user-1",
+            kode_densus_personal="TERRORIST-0001",
+            score_match_similarity=0.9,
+        )
+
+        with self.assertNumQueries(3):
+            writer = ReportRowWriter(self.report, "personal", batch_size=2)
+            assert not writer.add("user-1", 0.9, "TERRORIST-001")  # noqa: S101
+            assert writer.add("user-2", 0.9, "TERRORIST-0001")  # noqa: S101
+            assert not writer.add("user-2", 0.8, "TERRORIST-0001")  # noqa: S101
+            assert writer.add("user-1", 0.7, "EDD-013")  # noqa: S101
+            assert writer.add("user-3", 0.7, "EDD-013")  # noqa: S101
+            writer.flush()
+
+        assert (writer.created, writer.skipped) == (3, 2)  # noqa: S101
+        assert DttotDocReportPersonal.objects.filter(dttotdoc_report=self.report).count() == 4  # noqa: S101, PLR2004
+
+    def test_shard_rows_skip_pairs_an_earlier_shard_saved(self) -> None:
+        first = DttotDoc.objects.create(document=self.document, dttot_kode_densus="TERRORIST-0001")
+        second = DttotDoc.objects.create(document=self.document, dttot_kode_densus="TERRORIST-001")
+
+        assert save_scored_shard_rows(self.document.pk, [["user-1", str(first.dttot_id), 0.9]], "personal") == 1  # noqa: S101
+        assert save_scored_shard_rows(self.document.pk, [["user-1", str(second.dttot_id), 0.9]], "personal") == 0  # noqa: S101
+        assert DttotDocReportPersonal.objects.filter(dttotdoc_report=self.report).count() == 1  # noqa: S101
+
+
+class BulkHandleDttotDocumentsTestCase(TestCase):
+
+    def setUp(self) -> None:
+        self.user = User.objects.create_user(
+            email="test@example.com",
+            username="testuser",
+            password=TEST_USER_PASSWORD,
+        )
+        self.document = Document.objects.create(
+            document_type="DTTOT Report",
+            document_name="test",
+            document_file_type="XLSX",
+        )
+
+    @staticmethod
+    def build_data_frame() -> pd.DataFrame:
+        return pd.DataFrame({
+            "first_name": ["John", "Jane", "Ali", "Jane"],
+            "last_name": ["Doe", None, "Baba", None],
+            "Terduga": ["Orang", "Orang", "Orang", "Orang"],
+            "Kode Densus": ["EDD-013", "EDD-014", "EDD-015", "EDD-014"],
+            "birth_date_1": ["1973/01/04", None, float("nan"), None],
+            "passport_number": [" A0987654", None, None, None],
+        })
+
+    def test_bulk_creates_rows_in_chunks(self) -> None:
+        summary = bulk_handle_dttot_documents(
+            document=self.document,
+            data_frame=self.build_data_frame(),
+            user_data=self.user.pk,
+            chunk_size=2,
+        )
+
+        assert summary["rows"] == 4  # noqa: S101, PLR2004
+        assert summary["created"] == 3  # noqa: S101, PLR2004
+        assert summary["failed_chunks"] == []  # noqa: S101
+        assert [chunk["status"] for chunk in summary["chunks"]] == ["success", "success"]  # noqa: S101
+        assert DttotDoc.objects.filter(document=self.document).count() == 3  # noqa: S101, PLR2004
+
+        dttot_doc = DttotDoc.objects.get(dttot_kode_densus="EDD-013")
+        assert dttot_doc.dttot_first_name == "John"  # noqa: S101
+        assert dttot_doc.dttot_passport_number == "A0987654"  # noqa: S101
+        assert dttot_doc.last_update_by_id == str(self.user.pk)  # noqa: S101
+        assert DttotDoc.objects.get(dttot_kode_densus="EDD-015").dttot_birth_date_1 is None  # noqa: S101
+
+    def test_bulk_updates_existing_kode_densus(self) -> None:
+        existing = DttotDoc.objects.create(dttot_kode_densus="EDD-013", dttot_first_name="John")
+        new_document = Document.objects.create(
+            document_type="DTTOT Report",
+            document_name="test 2",
+            document_file_type="XLSX",
+        )
+
+        summary = bulk_handle_dttot_documents(
+            document=new_document,
+            data_frame=self.build_data_frame().head(1),
+            user_data=self.user.pk,
+        )
+
+        existing.refresh_from_db()
+        assert summary["created"] == 0  # noqa: S101
+        assert summary["updated"] == 1  # noqa: S101
+        assert existing.document_id == str(new_document.pk)  # noqa: S101
+        assert DttotDoc.objects.count() == 1  # noqa: S101
+
+    def test_bulk_classifies_entries_against_previous_list(self) -> None:
+        DttotDoc.objects.create(
+            dttot_kode_densus="EDD-013",
+            dttot_first_name="john ",
+            dttot_last_name="Doe",
+            dttot_type="Orang",
+            dttot_birth_date_1="1973/01/04",
+            dttot_passport_number="A0987654",
+        )
+        DttotDoc.objects.create(dttot_kode_densus="EDD-014", dttot_first_name="Janet")
+        DttotDoc.objects.create(dttot_kode_densus="EDD-099", dttot_first_name="Gone")
+
+        summary = bulk_handle_dttot_documents(
+            document=self.document,
+            data_frame=self.build_data_frame(),
+            user_data=self.user.pk,
+        )
+
+        assert (summary["created"], summary["changed"], summary["unchanged"], summary["removed"]) == (1, 1, 1, 1)  # noqa: S101
+        statuses = dict(DttotDoc.objects.values_list("dttot_kode_densus", "dttot_change_status"))
+        assert statuses == {  # noqa: S101
+            "EDD-013": "unchanged",
+            "EDD-014": "changed",
+            "EDD-015": "added",
+            "EDD-099": "removed",
+        }
+        assert DttotDoc.objects.get(dttot_kode_densus="EDD-014").dttot_first_name == "Jane"  # noqa: S101
+        to_score, unchanged = split_dttot_docs_to_score(
+            DttotDoc.objects.filter(document=self.document),
+            DttotDocReport(status_doc="DONE"),
+        )
+        assert sorted(to_score.values_list("dttot_kode_densus", flat=True)) == ["EDD-014", "EDD-015"]  # noqa: S101
+        assert list(unchanged.values_list("dttot_kode_densus", flat=True)) == ["EDD-013"]  # noqa: S101
+
+    def test_bulk_adds_removed_entries_again(self) -> None:
+        DttotDoc.objects.create(
+            dttot_kode_densus="EDD-013",
+            dttot_first_name="John",
+            dttot_last_name="Doe",
+            dttot_type="Orang",
+            dttot_birth_date_1="1973/01/04",
+            dttot_passport_number="A0987654",
+            dttot_change_status="removed",
+        )
+
+        summary = bulk_handle_dttot_documents(
+            document=self.document,
+            data_frame=self.build_data_frame().head(1),
+            user_data=self.user.pk,
+        )
+
+        assert (summary["created"], summary["unchanged"]) == (0, 0)  # noqa: S101
+        assert DttotDoc.objects.get(dttot_kode_densus="EDD-013").dttot_change_status == "added"  # noqa: S101
+
+
+class ReuseDttotDocumentResultsTestCase(TestCase):
+
+    def setUp(self) -> None:
+        self.user = User.objects.create_user(
+            email="test@example.com",
+            username="testuser",
+            password=TEST_USER_PASSWORD,
+        )
+        self.previous_document = Document.objects.create(
+            document_type="DTTOT Report",
+            document_name="list",
+            document_file_type="XLSX",
+            content_hash="a" * 64,
+        )
+        DttotDoc.objects.create(
+            document=self.previous_document,
+            dttot_kode_densus="EDD-013",
+            dttot_first_name="John",
+        )
+        self.previous_report = DttotDocReport.objects.create(
+            document=self.previous_document,
+            status_doc="DONE",
+        )
+        DttotDocReportPersonal.objects.create(
+            dttotdoc_report=self.previous_report,
+            dsb_user_personal="user-1",
+            kode_densus_personal="EDD-013",
+            score_match_similarity=0.9,
+        )
+
+    def create_document(self, content_hash: str) -> Document:
+        return Document.objects.create(
+            document_type="DTTOT Report",
+            document_name="list again",
+            document_file_type="XLSX",
+            content_hash=content_hash,
+        )
+
+    def test_find_reusable_document_requires_same_contents(self) -> None:
+        reusable = find_reusable_dttot_document(self.create_document("a" * 64))
+        assert reusable.pk == str(self.previous_document.pk)  # noqa: S101
+        assert find_reusable_dttot_document(self.create_document("b" * 64)) is None  # noqa: S101
+
+    def test_find_reusable_document_requires_finished_scoring(self) -> None:
+        self.previous_report.status_doc = "Initialized"
+        self.previous_report.save()
+
+        assert find_reusable_dttot_document(self.create_document("a" * 64)) is None  # noqa: S101
+
+    def test_reuse_moves_rows_as_unchanged_entries(self) -> None:
+        document = self.create_document("a" * 64)
+
+        summary = reuse_dttot_document_results(self.previous_document, document, self.user.pk)
+
+        assert summary["rows"] == 1  # noqa: S101
+        moved = DttotDoc.objects.get(dttot_kode_densus="EDD-013")
+        assert moved.document_id == str(document.pk)  # noqa: S101
+        assert moved.dttot_change_status == "unchanged"  # noqa: S101
+
+    def test_reused_upload_scores_changed_users_and_keeps_the_other_rows(self) -> None:
+        document = self.create_document("a" * 64)
+        unchanged_user = DsbUserPersonal.objects.create(coredsb_user_id="core-1", document=document)
+        DsbUserPersonal.objects.filter(pk=unchanged_user.pk).update(
+            updated_date=self.previous_report.created_date - timedelta(hours=1),
+        )
+        DsbUserPersonal.objects.create(coredsb_user_id="core-2", document=document)
+        reported = DttotDocReportPersonal.objects.create(
+            dttotdoc_report=self.previous_report,
+            dsb_user_personal=unchanged_user.pk,
+            kode_densus_personal="EDD-013",
+            score_match_similarity=0.9,
+        )
+        reported_date = self.previous_report.created_date - timedelta(days=30)
+        DttotDocReportPersonal.objects.filter(pk=reported.pk).update(created_date=reported_date)
+
+        reuse_dttot_document_results(self.previous_document, document, self.user.pk)
+        report = DttotDocReport.objects.create(document=document, status_doc="Initialized")
+        batches = dttot_scoring_batches(
+            DsbUserPersonal.objects.filter(document=document),
+            DttotDoc.objects.filter(document=document),
+            previous_dttot_report(document.pk),
+        )
+        update_dttotdoc_report_score(document.pk)
+
+        # Only the user changed since the earlier upload is scored again
+        assert [  # noqa: S101
+            ([user.coredsb_user_id for user in users], [doc.dttot_kode_densus for doc in docs])
+            for users, docs in batches
+        ] == [(["core-2"], ["EDD-013"])]
+        copied = DttotDocReportPersonal.objects.get(dttotdoc_report=report)
+        assert copied.dsb_user_personal == str(unchanged_user.pk)  # noqa: S101
+        assert copied.created_date == reported_date  # noqa: S101
+        report.refresh_from_db()
+        assert report.status_doc == "DONE"  # noqa: S101
+
+
+class CarryOverReportRowsTestCase(TestCase):
+
+    def setUp(self) -> None:
+        self.previous_document = Document.objects.create(
+            document_type="DTTOT Report",
+            document_name="list",
+            document_file_type="XLSX",
+        )
+        self.previous_report = DttotDocReport.objects.create(
+            document=self.previous_document,
+            status_doc="DONE",
+        )
+        self.document = Document.objects.create(
+            document_type="DTTOT Report",
+            document_name="next list",
+            document_file_type="XLSX",
+        )
+        self.report = DttotDocReport.objects.create(document=self.document, status_doc="Initialized")
+        DttotDoc.objects.create(
+            document=self.document,
+            dttot_kode_densus="EDD-013",
+            dttot_first_name="John",
+            dttot_change_status="unchanged",
+        )
+        DttotDoc.objects.create(
+            document=self.document,
+            dttot_kode_densus="EDD-014",
+            dttot_first_name="Jane",
+            dttot_change_status="changed",
+        )
+        self.unchanged_user = DsbUserPersonal.objects.create(coredsb_user_id="core-1", document=self.document)
+        DsbUserPersonal.objects.filter(pk=self.unchanged_user.pk).update(
+            updated_date=self.previous_report.created_date - timedelta(hours=1),
+        )
+        self.changed_user = DsbUserPersonal.objects.create(coredsb_user_id="core-2", document=self.document)
+        for user_id, kode_densus in (
+            (self.unchanged_user.pk, "EDD-013"),
+            (self.changed_user.pk, "EDD-013"),
+            (self.unchanged_user.pk, "EDD-014"),
+        ):
+            DttotDocReportPersonal.objects.create(
+                dttotdoc_report=self.previous_report,
+                dsb_user_personal=user_id,
+                kode_densus_personal=kode_densus,
+                score_match_similarity=0.9,
+            )
+
+    def test_scoring_batches_score_unchanged_entries_against_changed_users(self) -> None:
+        batches = dttot_scoring_batches(
+            DsbUserPersonal.objects.filter(document=self.document),
+            DttotDoc.objects.filter(document=self.document),
+            self.previous_report,
+        )
+
+        assert [  # noqa: S101
+            (
+                sorted(user.coredsb_user_id for user in users),
+                [dttot_doc.dttot_kode_densus for dttot_doc in dttot_docs],
+            )
+            for users, dttot_docs in batches
+        ] == [(["core-1", "core-2"], ["EDD-014"]), (["core-2"], ["EDD-013"])]
+
+    def test_carry_over_copies_rows_of_unchanged_pairs_once(self) -> None:
+        assert carry_over_report_rows(self.report) == {"personal": 1, "corporate": 0, "publisher": 0}  # noqa: S101
+        assert carry_over_report_rows(self.report)["personal"] == 1  # noqa: S101
+
+        copied = DttotDocReportPersonal.objects.get(dttotdoc_report=self.report)
+        assert copied.dsb_user_personal == str(self.unchanged_user.pk)  # noqa: S101
+        assert copied.kode_densus_personal == "EDD-013"  # noqa: S101
+
+    def test_report_status_counts_carried_over_rows(self) -> None:
+        update_dttotdoc_report_score(self.document.pk)
+
+        self.report.refresh_from_db()
+        assert self.report.status_doc == "DONE"  # noqa: S101
+
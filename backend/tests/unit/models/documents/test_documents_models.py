@@ -0,0 +1,32 @@
+from __future__ import annotations
+
+import hashlib
+
+from django.core.files.uploadedfile import (  #type: ignore # noqa: PGH003
+    SimpleUploadedFile,
+)
+from django.test import SimpleTestCase  #type: ignore # noqa: PGH003
+
+from app.documents.models import (  #type: ignore # noqa: PGH003
+    compute_content_hash,
+    encrypt_filename,
+)
+
+
+class ComputeContentHashTestCase(SimpleTestCase):
+
+    def test_hash_depends_on_contents_not_filename(self) -> None:
+        content = b"Nama,Terduga\nJohn Doe,Orang\n" * 1000
+        first = SimpleUploadedFile("list.csv", content)
+        second = SimpleUploadedFile("renamed.csv", content)
+
+        assert compute_content_hash(first, chunk_size=64) == hashlib.sha256(content).hexdigest()  # noqa: S101
+        assert compute_content_hash(first) == compute_content_hash(second)  # noqa: S101
+        assert encrypt_filename("list.csv") != encrypt_filename("renamed.csv")  # noqa: S101
+
+    def test_file_is_readable_after_hashing(self) -> None:
+        uploaded_file = SimpleUploadedFile("list.csv", b"Nama,Terduga\n")
+
+        compute_content_hash(uploaded_file)
+
+        assert uploaded_file.read() == b"Nama,Terduga\n"  # noqa: S101